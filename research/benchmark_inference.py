@@ -0,0 +1,96 @@
+import os
+import sys
+import time
+import json
+import argparse
+import numpy as np
+import pandas as pd
+import joblib
+import warnings
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from models import ModelSimulator, get_model_path
+from inference import NativePredictor
+
+warnings.filterwarnings('ignore')
+
+ARTIFACTS = {
+    'pyrite': ('v1_pyrite.pkl', None),
+    'diamond': ('v2_diamond.pkl', None),
+    'obsidian': ('v3_obsidian.pkl', None),
+    'quartz': ('v4_quartz.pkl', 'v4_quartz_config.json'),
+}
+
+def load_feature_frame(cache_path='data/picks_cache.parquet'):
+    """Real engineered features when the local data lake exists, else None."""
+    if not os.path.exists(cache_path): return None
+    from pipeline import FeatureEngineer
+    return FeatureEngineer(pd.read_parquet(cache_path)).process()
+
+def build_matrix(feats, rows, base=None, seed=42):
+    if base is not None and all(f in base.columns for f in feats):
+        X = base[feats].to_numpy(dtype=float)
+        reps = int(np.ceil(rows / max(len(X), 1)))
+        return pd.DataFrame(np.tile(X, (reps, 1))[:rows], columns=feats)
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.normal(0.5, 0.25, size=(rows, len(feats))), columns=feats)
+
+def time_call(fn, repeats):
+    best = np.inf
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+def run_benchmark(rows=200_000, repeats=3, n_threads=None):
+    print(f"⚡ Inference Benchmark ({rows:,} rows, best of {repeats}, threads={n_threads or 'auto'})...")
+    sim = ModelSimulator(pd.DataFrame({'pick_date': pd.to_datetime([])}))
+    base = load_feature_frame()
+    results = []
+
+    for name, (artifact, config_name) in ARTIFACTS.items():
+        m_path = get_model_path(artifact)
+        if not os.path.exists(m_path):
+            print(f"  - {name.upper()}: artifact missing ({m_path}), skipped.")
+            continue
+        model = joblib.load(m_path)
+        feats = sim._get_feature_list(model)
+        if config_name and os.path.exists(get_model_path(config_name)):
+            with open(get_model_path(config_name)) as f:
+                feats = json.load(f).get('features', feats)
+
+        X = build_matrix(feats, rows, base)
+        predictor = NativePredictor(model, n_threads=n_threads)
+
+        t_sk, p_sk = time_call(lambda: model.predict_proba(X)[:, 1], repeats)
+        t_nat, p_nat = time_call(lambda: predictor.predict_positive(X), repeats)
+
+        results.append({
+            'model': name,
+            'estimator': type(model).__name__,
+            'native': predictor.is_native,
+            'sklearn_rows_s': round(rows / t_sk),
+            'native_rows_s': round(rows / t_nat),
+            'speedup': round(t_sk / t_nat, 2),
+            'max_abs_diff': float(np.max(np.abs(p_sk - p_nat))),
+        })
+
+    if not results:
+        print("❌ No model artifacts found.")
+        return pd.DataFrame()
+
+    res_df = pd.DataFrame(results)
+    print("\n📊 ROWS / SECOND:")
+    print(res_df.to_string(index=False))
+    return res_df
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="predict_proba vs native booster scoring throughput")
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--threads', type=int, default=None)
+    args = parser.parse_args()
+    run_benchmark(rows=args.rows, repeats=args.repeats, n_threads=args.threads)
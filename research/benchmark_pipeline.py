@@ -0,0 +1,209 @@
+"""End-to-end pipeline benchmark on synthetic picks (src/synthetic.py) at growing sizes.
+
+    python research/benchmark_pipeline.py --sizes 10k,100k
+    python research/benchmark_pipeline.py --sizes 1m --save-baseline
+    python research/benchmark_pipeline.py --sizes 50m --stages generate,ingest
+
+Each stage records wall/CPU time, throughput and peak RSS (sampled, so attributable to the
+stage) into a JSON results file, and is compared with a stored baseline: a stage is flagged
+when it is REGRESSION_FACTOR x slower (or its memory delta that much larger) than the
+baseline at the same size. Baselines are machine-specific; save one per runner.
+"""
+import os
+import gc
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import warnings
+from datetime import datetime, timezone
+
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from synthetic import write_synthetic_lake
+from instrumentation import RssSampler, REGRESSION_FACTOR
+from build_graph import partition_hashes, library_versions
+from ledger import MODEL_ARTIFACTS
+from models import ModelSimulator, get_model_path
+from runner import SIMULATIONS
+
+warnings.filterwarnings('ignore')
+
+STAGES = ['generate', 'ingest', 'features', 'simulate', 'stats', 'monte_carlo']
+RESULTS_PATH = os.path.join('data', 'benchmarks', 'pipeline_results.json')
+BASELINE_PATH = os.path.join('data', 'benchmarks', 'pipeline_baseline.json')
+NOISE_SECONDS = 0.05    # Slowdowns smaller than this are timer noise, never flagged
+NOISE_MB = 50.0         # Same for memory deltas
+
+def parse_size(text):
+    text = text.strip().lower()
+    scale = {'k': 1_000, 'm': 1_000_000}.get(text[-1], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+def measure(stage, rows, fn):
+    """Run fn once; returns (record, output)."""
+    gc.collect()
+    with RssSampler() as mem:
+        t0, c0 = time.perf_counter(), time.process_time()
+        out = fn()
+        wall, cpu = time.perf_counter() - t0, time.process_time() - c0
+    record = {
+        'stage': stage, 'rows': rows, 'wall_s': round(wall, 4), 'cpu_s': round(cpu, 4),
+        'rows_per_s': round(rows / wall) if wall > 0 else None,
+        'peak_rss_mb': round(mem.peak_mb, 1), 'rss_delta_mb': round(mem.peak_mb - mem.start_mb, 1),
+    }
+    print(f"  {stage:<18} {wall:>9.3f}s {record['rows_per_s'] or 0:>12,} rows/s {record['rss_delta_mb']:>9.1f} MB")
+    return record, out
+
+def has_artifacts(name):
+    # Calibration tables are optional (the simulator falls back to its fixed shift)
+    slots = [slot for slot in MODEL_ARTIFACTS[name] if not slot[0].endswith('_calibration.json')]
+    return all(any(os.path.exists(get_model_path(f)) for f in slot) for slot in slots)
+
+def flat_bets(features):
+    """Every settled synthetic pick as a bet at its posted unit (stand-in ledger for stats / Monte Carlo)."""
+    bets = features[features['settled']]
+    return pd.DataFrame({'pick_date': bets['pick_date'].to_numpy(), 'outcome': bets['outcome'].to_numpy(),
+                         'profit_actual': bets['profit_units'].to_numpy(dtype=float),
+                         'wager_unit': bets['unit'].to_numpy(dtype=float), 'market_drift': bets['market_drift'].to_numpy()})
+
+def run_stats(bets):
+    from metrics import summarize
+    from risk import RiskAccumulator
+    return summarize({'synthetic': bets}), RiskAccumulator().add_frame(bets).summary()
+
+def run_size(n, stages, seed=42, chunk_rows=1_000_000, mc_paths=1000, workdir=None):
+    print(f"\n⚡ {n:,} synthetic picks")
+    results = []
+    lake = os.path.join(workdir, f'picks_{n}')
+    needs_frame = any(s in stages for s in STAGES[1:])
+
+    if 'generate' in stages or needs_frame:
+        rec, _ = measure('generate', n, lambda: write_synthetic_lake(lake, n, seed=seed, chunk_rows=chunk_rows))
+        if 'generate' in stages: results.append(rec)
+    if not needs_frame: return results
+
+    def ingest():
+        # What the picks cache sync does: load, dedupe on id, order, then hash partitions for the build graph
+        raw = pd.read_parquet(lake).drop_duplicates(subset=['id'], keep='last').sort_values('pick_date')
+        partition_hashes(raw)
+        return raw
+    rec, raw = measure('ingest', n, ingest)
+    if 'ingest' in stages: results.append(rec)
+    if not any(s in stages for s in STAGES[2:]): return results
+
+    from pipeline import FeatureEngineer
+    rec, features = measure('features', n, lambda: FeatureEngineer(raw).process())
+    if 'features' in stages: results.append(rec)
+    del raw
+
+    if 'simulate' in stages:
+        sim = ModelSimulator(features)
+        for name, method in SIMULATIONS.items():
+            if not has_artifacts(name):
+                print(f"  simulate_{name:<9} artifacts missing, skipped.")
+                continue
+            rec, res = measure(f'simulate_{name}', n, getattr(sim, method))
+            results.append({**rec, 'bets': len(res)})
+        del sim
+
+    bets = flat_bets(features)
+    del features
+    if 'stats' in stages:
+        rec, _ = measure('stats', len(bets), lambda: run_stats(bets))
+        results.append(rec)
+    if 'monte_carlo' in stages:
+        from monte_carlo import MonteCarloEngine
+        # Throughput in bet-steps: every path walks all bets
+        rec, _ = measure('monte_carlo', len(bets) * mc_paths,
+                         lambda: MonteCarloEngine(bets['profit_actual'].to_numpy(), seed=seed, workers=1).run(paths=mc_paths))
+        results.append({**rec, 'bets': len(bets), 'paths': mc_paths})
+    return results
+
+def compare(results, baseline):
+    """Per-stage ratios against the baseline run at the same size; regression flags."""
+    base = {(r['stage'], r['rows']): r for r in (baseline or {}).get('results', [])}
+    out = []
+    for r in results:
+        b = base.get((r['stage'], r['rows']))
+        if b is None: continue
+        time_ratio = r['wall_s'] / b['wall_s'] if b['wall_s'] > 0 else None
+        mem_ratio = r['rss_delta_mb'] / b['rss_delta_mb'] if b['rss_delta_mb'] > 0 else None
+        slow = time_ratio is not None and time_ratio > REGRESSION_FACTOR and r['wall_s'] - b['wall_s'] > NOISE_SECONDS
+        heavy = mem_ratio is not None and mem_ratio > REGRESSION_FACTOR and r['rss_delta_mb'] - b['rss_delta_mb'] > NOISE_MB
+        out.append({'stage': r['stage'], 'rows': r['rows'], 'baseline_wall_s': b['wall_s'], 'wall_ratio': round(time_ratio, 3) if time_ratio else None,
+                    'baseline_rss_delta_mb': b['rss_delta_mb'], 'rss_ratio': round(mem_ratio, 3) if mem_ratio else None,
+                    'regression': bool(slow or heavy)})
+    return out
+
+def load_json(path):
+    if not path or not os.path.exists(path): return None
+    with open(path) as f:
+        return json.load(f)
+
+def write_json(path, payload):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp, path)
+
+def run_benchmark(sizes, stages=STAGES, seed=42, chunk_rows=1_000_000, mc_paths=1000,
+                  results_path=RESULTS_PATH, baseline_path=BASELINE_PATH, save_baseline=False):
+    print(f"⚡ Pipeline Benchmark (sizes {', '.join(f'{n:,}' for n in sizes)}; stages {', '.join(stages)})")
+    results = []
+    with tempfile.TemporaryDirectory(prefix='quarry_bench_') as workdir:
+        for n in sizes:
+            results.extend(run_size(n, stages, seed, chunk_rows, mc_paths, workdir))
+
+    payload = {
+        'meta': {'created': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'seed': seed,
+                 'python': platform.python_version(), 'machine': platform.machine(), 'cpus': os.cpu_count(),
+                 'libraries': library_versions()},
+        'results': results,
+    }
+    baseline = load_json(baseline_path)
+    payload['comparison'] = compare(results, baseline)
+    write_json(results_path, payload)
+    print(f"\n💾 Results: {results_path}")
+
+    if payload['comparison']:
+        cmp_df = pd.DataFrame(payload['comparison'])
+        print(f"\n📊 VS BASELINE ({baseline_path}, {baseline['meta'].get('created')}):")
+        print(cmp_df[['stage', 'rows', 'baseline_wall_s', 'wall_ratio', 'rss_ratio', 'regression']].to_string(index=False))
+        flagged = cmp_df[cmp_df['regression']]
+        if not flagged.empty:
+            print(f"⚠️ {len(flagged)} stage(s) regressed beyond {REGRESSION_FACTOR}x the baseline.")
+    elif baseline is None:
+        print(f"No baseline at {baseline_path} (save one with --save-baseline).")
+    if save_baseline:
+        write_json(baseline_path, {k: payload[k] for k in ('meta', 'results')})
+        print(f"💾 Baseline saved: {baseline_path}")
+    return payload
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time, throughput and peak memory of every pipeline stage on synthetic picks")
+    parser.add_argument('--sizes', default='10k,100k', help="Comma-separated pick counts, e.g. 10k,1m,50m")
+    parser.add_argument('--stages', default=','.join(STAGES), help=f"Subset of {','.join(STAGES)}")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000, help="Generator chunk (bounds generation memory)")
+    parser.add_argument('--mc-paths', type=int, default=1000)
+    parser.add_argument('--out', default=RESULTS_PATH)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Exit 1 when any stage regressed")
+    args = parser.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(',') if s.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    payload = run_benchmark([parse_size(s) for s in args.sizes.split(',')], stages, args.seed, args.chunk_rows,
+                            args.mc_paths, args.out, args.baseline, args.save_baseline)
+    if args.fail_on_regression and any(c['regression'] for c in payload['comparison']):
+        sys.exit(1)
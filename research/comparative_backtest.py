@@ -12,6 +12,7 @@ if root_dir not in sys.path:
 
 from src.pipeline import SportsDataPipeline, FeatureEngineer
 from src.models import ModelSimulator
+from src.metrics import summarize
 
 def main():
     print("📊 Running Head-to-Head Model Comparison...")
@@ -38,37 +39,18 @@ def main():
     print("🟣 Simulating V3 Obsidian (New)...")
     v3 = sim.run_v3_obsidian()
     
-    # 3. Calculate Stats
+    # 3. Calculate Stats (settled bets; the recent window ends at the newest pick in the data)
+    summary = summarize({'V1 Pyrite': v1, 'V2 Diamond': v2, 'V3 Obsidian': v3}, as_of=df['pick_date'].max())
     results = []
     
-    for name, data in [('V1 Pyrite', v1), ('V2 Diamond', v2), ('V3 Obsidian', v3)]:
-        if data.empty:
-            results.append([name, 0, 0, "0%", 0, "0%"])
-            continue
-            
-        # Filter for settled bets for stats
-        settled = data[data['outcome'].notna()].copy()
-        
-        total_bets = len(settled)
-        wins = settled['outcome'].sum()
-        wr = (wins / total_bets * 100) if total_bets > 0 else 0
-        
-        # PnL & ROI
-        profit = settled['profit_actual'].sum()
-        risk = settled['wager_unit'].sum()
-        roi = (profit / risk * 100) if risk > 0 else 0
-        
-        # Daily Volume
-        days = settled['pick_date'].nunique()
-        vol = total_bets / days if days > 0 else 0
-        
+    for name, m in summary.iterrows():
         results.append([
             name, 
-            total_bets, 
-            f"{vol:.1f}", 
-            f"{wr:.1f}%", 
-            f"{profit:+.2f}u", 
-            f"{roi:+.1f}%"
+            int(m['bets'] - m['pending']), 
+            f"{m['bets_per_active_day']:.1f}", 
+            f"{m['win_rate']:.1f}%", 
+            f"{m['net']:+.2f}u", 
+            f"{m['roi']:+.1f}%"
         ])
         
     print("\n🏆 Head-to-Head Results (All-Time Available Data):")
@@ -78,22 +60,12 @@ def main():
     # Recent Performance (Last 30 Days)
     print("\n📅 Recent Performance (Last 30 Days):")
     recent_results = []
-    cutoff = df['pick_date'].max() - pd.Timedelta(days=30)
     
-    for name, data in [('V1 Pyrite', v1), ('V2 Diamond', v2), ('V3 Obsidian', v3)]:
-        if data.empty: continue
-        recent = data[data['pick_date'] >= cutoff].copy()
-        settled = recent[recent['outcome'].notna()]
-        
-        total_bets = len(settled)
-        wins = settled['outcome'].sum()
-        wr = (wins / total_bets * 100) if total_bets > 0 else 0
-        profit = settled['profit_actual'].sum()
-        risk = settled['wager_unit'].sum()
-        roi = (profit / risk * 100) if risk > 0 else 0
-        
+    for name, m in summary.iterrows():
+        if m['bets'] == 0: continue
         recent_results.append([
-            name, total_bets, f"{wr:.1f}%", f"{profit:+.2f}u", f"{roi:+.1f}%"
+            name, int(m['recent_wins'] + m['recent_losses'] + m['recent_pushes']), f"{m['recent_win_rate']:.1f}%",
+            f"{m['recent_net']:+.2f}u", f"{m['recent_roi']:+.1f}%"
         ])
         
     print(tabulate(recent_results, headers=["Model", "Bets", "Win Rate", "Profit", "ROI"], tablefmt="github"))
@@ -0,0 +1,94 @@
+import os
+import sys
+import argparse
+import warnings
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from pipeline import SportsDataPipeline, FeatureEngineer
+from models import ModelSimulator, get_model_path
+from calibration import fit_calibrator
+from model_versions import ModelVersions
+
+warnings.filterwarnings('ignore')
+
+# CLI name -> artifact stem (the table is saved as <stem>_calibration.json next to it)
+ARTIFACTS = {'quartz': 'v4_quartz', 'obsidian': 'v3_obsidian'}
+
+def quartz_oos(df, args):
+    """Shipped-Quartz scores on picks that artifact was never trained on.
+
+    The table is applied to the shipped artifact's scores, so it is fit on them; walk-forward
+    or CV fold models have their own (differently shrunk) score distributions. Training rows
+    are excluded by id via the newest versioned manifest, else everything up to its release.
+    """
+    sim = ModelSimulator(df)
+    m_path = get_model_path('v4_quartz.pkl')
+    if not os.path.exists(m_path):
+        m_path = get_model_path('v4_quantum_sniper.pkl')
+    model = sim._load_model(m_path)
+    feats = sim.load_v4_config(model).get('features', sim._get_feature_list(model))
+    versions = ModelVersions()
+    latest = versions.latest()
+    if latest is not None:
+        seen = versions.load(latest['version'])[3]
+        temp, source = df[~df['id'].isin(seen)], f"shipped_oos:{latest['version']}"
+    else:
+        temp, source = df[df['pick_date'] > pd.to_datetime(sim.V4_RELEASE)], "post_release"
+    temp = temp.dropna(subset=feats)
+    if temp.empty:
+        raise SystemExit("❌ No settled picks outside the shipped Quartz training set yet.")
+    probs = sim._predict(model, temp[feats])
+    return pd.DataFrame({'raw_prob': probs, 'league_name': temp['league_name'].values, 'outcome': temp['outcome'].values}), source
+
+def obsidian_oos(df, args):
+    """Post-release Obsidian scores: the shipped model never saw rows after its release."""
+    sim = ModelSimulator(df)
+    model = sim._load_model(get_model_path('v3_obsidian.pkl'))
+    temp, probs = sim.score_v3(model, sim._get_feature_list(model))
+    if probs is None:
+        raise SystemExit("❌ The Obsidian artifact cannot score this frame.")
+    return pd.DataFrame({'raw_prob': probs, 'league_name': temp['league_name'].values, 'outcome': temp['outcome'].values}), "post_release"
+
+def reliability(p, y, bins=10):
+    """Decile table of mean predicted vs. realized win rate."""
+    q = pd.qcut(p, bins, labels=False, duplicates='drop')
+    return pd.DataFrame({'p': p, 'y': y, 'bin': q}).groupby('bin').agg(rows=('y', 'size'), predicted=('p', 'mean'), realized=('y', 'mean')).round(4)
+
+def main(args):
+    raw_df = SportsDataPipeline().fetch_data_cached()
+    df = FeatureEngineer(raw_df).process()
+    # Pending picks are stored with outcome 0; only settled ones calibrate
+    if 'settled' in df.columns:
+        df = df[df['settled'].astype(bool)]
+
+    preds, source = (quartz_oos if args.model == 'quartz' else obsidian_oos)(df, args)
+    preds = preds[preds['outcome'].isin([0.0, 1.0]) & preds['raw_prob'].notna()]
+    print(f"🎯 Fitting {args.method} calibration for {args.model} on {len(preds)} out-of-sample picks ({source})...")
+
+    cal = fit_calibrator(preds['raw_prob'].values, preds['outcome'].values, method=args.method,
+                         leagues=preds['league_name'].values if args.per_league else None,
+                         min_league_rows=args.min_league_rows, meta={"source": source, "model": args.model})
+    calibrated = cal.apply(preds['raw_prob'].values, preds['league_name'].values)
+    y = preds['outcome'].values
+    legacy = preds['raw_prob'].values * 0.95 + 0.02 if args.model == 'quartz' else preds['raw_prob'].values + 0.05
+    print(f"   Brier: raw {np.mean((preds['raw_prob'] - y) ** 2):.5f} | legacy shift {np.mean((legacy - y) ** 2):.5f} "
+          f"| calibrated {np.mean((calibrated - y) ** 2):.5f} (in-sample)")
+    print(f"   Tables: {', '.join(f'{k} ({len(x)} knots)' for k, (x, _) in cal.tables.items())}")
+    print(reliability(calibrated, y).to_string())
+
+    path = args.out or os.path.join(os.path.dirname(get_model_path(f"{ARTIFACTS[args.model]}.pkl")), f"{ARTIFACTS[args.model]}_calibration.json")
+    cal.save(path)
+    print(f"📁 Calibration saved to {path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit a per-model probability calibration table on out-of-sample predictions")
+    parser.add_argument('--model', choices=list(ARTIFACTS), default='quartz')
+    parser.add_argument('--method', choices=['isotonic', 'platt'], default='isotonic')
+    parser.add_argument('--per-league', action='store_true', help="Separate tables for leagues with enough rows")
+    parser.add_argument('--min-league-rows', type=int, default=300)
+    parser.add_argument('--out', default=None)
+    main(parser.parse_args())
@@ -10,9 +10,101 @@ from datetime import datetime
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 from pipeline import SportsDataPipeline, FeatureEngineer
 from models import ModelSimulator
+from charts import FigureSpec, render_figures
+from results_store import ResultsStore, CURVE_COLUMNS
 
-def generate_comparison_chart(models=None):
+# Series colors of the comparison charts
+COLORS = {
+    'v1 Pyrite': '#ffdd00',      # Gold/Pyrite
+    'v2 Diamond': '#00f0ff',     # Ice/Diamond
+    'v3 Obsidian': '#7c3aed',    # Purple/Obsidian
+    'v4 Quartz': '#f8fafc'       # White/Quartz
+}
+
+def draw_focus_chart(bench, focus_label):
+    """Full-bleed cumulative profit chart of every model, with focus_label highlighted."""
+    # --- PANAVISION RATIO: 16x10 for symmetrical dashboard parity ---
+    fig, ax = plt.subplots(figsize=(16, 10), facecolor='none')
+    ax.set_facecolor('none')
+
+    # Enforce absolute full-bleed
+    ax.set_position([0, 0, 1, 1])
+
+    # --- INSTITUTIONAL SCAFFOLDING ---
+    # Subtle dotted grid for structural grounding
+    ax.grid(True, linestyle=':', color='#222222', alpha=0.3, zorder=0)
+    ax.axhline(0, color='#333333', linewidth=0.8, alpha=0.5, zorder=1)
+
+    # --- ELITE FOCUS STYLING ---
+    for col in bench.columns:
+        series_name = str(col)
+        is_focus = (series_name == focus_label)
+
+        curr_series = bench[col].dropna()
+        if curr_series.empty: continue
+
+        color = COLORS.get(series_name, '#ffffff')
+        if not is_focus:
+            alpha = 0.35 # Enhanced visibility for background models
+            lw = 1.0
+            zorder = 5
+        else:
+            alpha = 1.0
+            lw = 4.0 # Slightly thicker for 16x7
+            zorder = 100
+
+        smooth_values = curr_series.rolling(window=3, min_periods=1).mean()
+
+        # 1. Background / Comparison Line
+        ax.plot(curr_series.index, smooth_values, color=color, linewidth=lw, alpha=alpha, zorder=zorder)
+
+        if is_focus:
+            # 2. Institutional Aura (Fill-Under)
+            # Layered alpha fills for a 'fintech' volume feel
+            ax.fill_between(curr_series.index, smooth_values, -200, color=color, alpha=0.03, zorder=zorder-5)
+            ax.fill_between(curr_series.index, smooth_values, -200, color=color, alpha=0.015, zorder=zorder-6)
+
+            # 3. Outer Glow Layers
+            for i in range(1, 4): 
+                ax.plot(curr_series.index, smooth_values, color=color, linewidth=lw + i*3, alpha=0.01, zorder=zorder-1)
+
+            # 4. Neon Termination Orb (The 'Live' Point)
+            last_time = curr_series.index[-1]
+            last_val = smooth_values.iloc[-1]
+
+            # Glowing Scatter Point
+            ax.scatter(last_time, last_val, color='#ffffff', s=100, zorder=zorder+10, edgecolors=color, linewidths=2.5)
+            ax.scatter(last_time, last_val, color=color, s=350, zorder=zorder+5, alpha=0.3) # Core glow
+            ax.scatter(last_time, last_val, color=color, s=800, zorder=zorder+4, alpha=0.1) # Outer glow
+
+    # --- DYNAMIC HEADROOM (Absolute Collision Avoidance) ---
+    focus_series = bench[focus_label].dropna()
+    if focus_series.empty:
+        ax.set_ylim(-5, 15)
+    else:
+        f_min, f_max = focus_series.min(), focus_series.max()
+        delta = f_max - f_min
+
+        # Institutional Spacing: 
+        # 25% top margin (harmonized for 16x7). 10% bottom for floor stability.
+        if delta < 10:
+            ax.set_ylim(f_min - 5, f_max + 25)
+        else:
+            ax.set_ylim(f_min - delta*0.1, f_max + delta*0.25)
+
+    # --- FULL BLEED FORMATTING ---
+    ax.set_axis_off() 
+    for spine in ax.spines.values(): spine.set_visible(False) 
+    plt.subplots_adjust(left=0, right=1, top=1, bottom=0)
+
+def generate_comparison_chart(models=None, context=None):
     print("🚀 Generating Comparative Alpha Graphs...")
+    if models is None and context is not None:
+        models = context.models
+    if models is None:
+        # Results of the last daily run, if current: curves need only three columns
+        models = ResultsStore(os.path.join(os.path.dirname(__file__), '..', 'data', 'results')).read_all(
+            ['quartz', 'obsidian', 'diamond', 'pyrite'], columns=CURVE_COLUMNS)
     
     if models is None:
         # Initialize Pipeline & Hydrate Features
@@ -85,15 +177,6 @@ def generate_comparison_chart(models=None):
         val = bench[col].dropna().iloc[-1] if not bench[col].dropna().empty else 0
         print(f"  {col}: {val:.2f}u")
     
-    colors = {
-        'v1 Pyrite': '#ffdd00',      # Gold/Pyrite
-        'v2 Diamond': '#00f0ff',     # Ice/Diamond
-        'v3 Obsidian': '#7c3aed',    # Purple/Obsidian
-        'v4 Quartz': '#f8fafc'       # White/Quartz
-    }
-
-    plt.style.use('dark_background')
-
     # --- GENERATE 4 FOCUSED VERSIONS ---
     focus_models = [
         ('pyrite', 'v1 Pyrite'),
@@ -101,88 +184,13 @@ def generate_comparison_chart(models=None):
         ('obsidian', 'v3 Obsidian'),
         ('quartz', 'v4 Quartz')
     ]
-
-    for page_id, focus_label in focus_models:
-        # --- PANAVISION RATIO: 16x10 for symmetrical dashboard parity ---
-        fig, ax = plt.subplots(figsize=(16, 10), facecolor='none')
-        ax.set_facecolor('none')
-        
-        # Enforce absolute full-bleed
-        ax.set_position([0, 0, 1, 1])
-        
-        # --- INSTITUTIONAL SCAFFOLDING ---
-        # Subtle dotted grid for structural grounding
-        ax.grid(True, linestyle=':', color='#222222', alpha=0.3, zorder=0)
-        ax.axhline(0, color='#333333', linewidth=0.8, alpha=0.5, zorder=1)
-
-        # --- ELITE FOCUS STYLING ---
-        for col in bench.columns:
-            series_name = str(col)
-            is_focus = (series_name == focus_label)
-            
-            curr_series = bench[col].dropna()
-            if curr_series.empty: continue
-
-            color = colors.get(series_name, '#ffffff')
-            if not is_focus:
-                alpha = 0.35 # Enhanced visibility for background models
-                lw = 1.0
-                zorder = 5
-            else:
-                alpha = 1.0
-                lw = 4.0 # Slightly thicker for 16x7
-                zorder = 100
-            
-            smooth_values = curr_series.rolling(window=3, min_periods=1).mean()
-            
-            # 1. Background / Comparison Line
-            ax.plot(curr_series.index, smooth_values, color=color, linewidth=lw, alpha=alpha, zorder=zorder)
-            
-            if is_focus:
-                # 2. Institutional Aura (Fill-Under)
-                # Layered alpha fills for a 'fintech' volume feel
-                ax.fill_between(curr_series.index, smooth_values, -200, color=color, alpha=0.03, zorder=zorder-5)
-                ax.fill_between(curr_series.index, smooth_values, -200, color=color, alpha=0.015, zorder=zorder-6)
-                
-                # 3. Outer Glow Layers
-                for i in range(1, 4): 
-                    ax.plot(curr_series.index, smooth_values, color=color, linewidth=lw + i*3, alpha=0.01, zorder=zorder-1)
-                
-                # 4. Neon Termination Orb (The 'Live' Point)
-                last_time = curr_series.index[-1]
-                last_val = smooth_values.iloc[-1]
-                
-                # Glowing Scatter Point
-                ax.scatter(last_time, last_val, color='#ffffff', s=100, zorder=zorder+10, edgecolors=color, linewidths=2.5)
-                ax.scatter(last_time, last_val, color=color, s=350, zorder=zorder+5, alpha=0.3) # Core glow
-                ax.scatter(last_time, last_val, color=color, s=800, zorder=zorder+4, alpha=0.1) # Outer glow
-
-        # --- DYNAMIC HEADROOM (Absolute Collision Avoidance) ---
-        focus_series = bench[focus_label].dropna()
-        if focus_series.empty:
-            ax.set_ylim(-5, 15)
-        else:
-            f_min, f_max = focus_series.min(), focus_series.max()
-            delta = f_max - f_min
-            
-            # Institutional Spacing: 
-            # 25% top margin (harmonized for 16x7). 10% bottom for floor stability.
-            if delta < 10:
-                ax.set_ylim(f_min - 5, f_max + 25)
-            else:
-                ax.set_ylim(f_min - delta*0.1, f_max + delta*0.25)
-
-        # --- FULL BLEED FORMATTING ---
-        ax.set_axis_off() 
-        for spine in ax.spines.values(): spine.set_visible(False) 
-        plt.subplots_adjust(left=0, right=1, top=1, bottom=0)
-        
-        out_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'docs', f'comparison_{page_id}.png'))
-        
-        # Save with Ultra-DPI for crispness in 1200px+ containers
-        plt.savefig(out_path, dpi=400, transparent=True)
-        plt.close(fig)
-        print(f"✅ Full-Bleed PNG saved: {out_path}")
+    docs_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'docs'))
+    # Save with Ultra-DPI for crispness in 1200px+ containers
+    render_figures([
+        FigureSpec(f'comparison_{page_id}', draw_focus_chart, {'bench': bench, 'focus_label': focus_label},
+                   [os.path.join(docs_dir, f'comparison_{page_id}.png')], dpi=400, transparent=True)
+        for page_id, focus_label in focus_models
+    ])
 
 if __name__ == "__main__":
     generate_comparison_chart()
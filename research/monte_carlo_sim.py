@@ -4,82 +4,94 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import os
 import sys
+import time
+import argparse
 
 # Add src to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
 from pipeline import SportsDataPipeline, FeatureEngineer
 from models import ModelSimulator
+from runner import SIMULATIONS
+from monte_carlo import MonteCarloEngine
+from ledger import BetLedger
 
-def run_monte_carlo(iterations=1000):
-    print(f"🎲 Beginning v5 Monte Carlo Stress-Test ({iterations} iterations)...")
-    
-    # 1. Get Base v5 Results
+def load_results(model):
+    """Bets from the model's ledger (daily pipeline output); simulated from scratch if no ledger exists."""
+    ledger = BetLedger(model).load()
+    if not ledger.empty:
+        print(f"📒 Using {len(ledger)} bets from the {model} ledger.")
+        return ledger
     pipeline = SportsDataPipeline()
     raw_df = pipeline.fetch_data_cached()
     engineer = FeatureEngineer(raw_df)
     processed = engineer.process()
     simulator = ModelSimulator(processed)
-    
-    v5_results = simulator.run_v4_quantum_sniper()
-    if v5_results.empty:
-        print("❌ Error: No v5 results to simulate.")
+    return getattr(simulator, SIMULATIONS[model])()
+
+def run_monte_carlo(iterations=1000, model='quartz', seed=42, workers=None, mode='iid', block_days=1):
+    label = "i.i.d. bets" if mode == 'iid' else f"{block_days}-day blocks"
+    print(f"🎲 Beginning {model.title()} Monte Carlo Stress-Test ({iterations} iterations, {label})...")
+
+    # 1. Get Base Results
+    results = load_results(model)
+    if results.empty:
+        print(f"❌ Error: No {model} results to simulate.")
         return
 
-    # 2. Extract Outcomes (P&L per bet)
-    pnl = v5_results['profit_actual'].values
+    # 2. Extract Outcomes (P&L per bet, in ledger order)
+    results = results.sort_values('pick_date', kind='stable')
+    pnl = results['profit_actual'].values
     initial_bankroll = 100.0 # Starting units
-    
-    all_curves = []
-    max_drawdowns = []
-    
-    for i in range(iterations):
-        # Shuffle outcomes (Random Walk)
-        sim_pnl = np.random.choice(pnl, size=len(pnl), replace=True)
-        curve = initial_bankroll + np.cumsum(sim_pnl)
-        all_curves.append(curve)
-        
-        # Calculate Drawdown
-        rolling_max = np.maximum.accumulate(curve)
-        drawdown = (rolling_max - curve)
-        max_drawdowns.append(np.max(drawdown))
-        
-        if (i+1) % 250 == 0: print(f"  Processed {i+1} sims...")
 
-    # 3. Statistical Analysis
-    curves_df = pd.DataFrame(all_curves).T
-    mean_curve = curves_df.mean(axis=1)
-    p5 = curves_df.quantile(0.05, axis=1) # 5th Percentile (Pessimistic)
-    p95 = curves_df.quantile(0.95, axis=1) # 95th Percentile (Optimistic)
-    
-    avg_mdd = np.mean(max_drawdowns)
-    p95_mdd = np.percentile(max_drawdowns, 95) # "Worst Case" MDD
-    
+    # 3. Chunked, seeded simulation (bounded memory at any path count)
+    t0 = time.perf_counter()
+    engine = MonteCarloEngine(pnl, initial_bankroll=initial_bankroll, seed=seed, workers=workers,
+                              mode=mode, days=results['pick_date'].values, block_days=block_days)
+    res = engine.run(paths=iterations)
+    elapsed = time.perf_counter() - t0
+
+    mean_curve = res['mean_curve']
+    p5, p95 = res['bands'][0.05], res['bands'][0.95]
+
     print("\n📊 STRESS-TEST RESULTS:")
-    print(f"Total Bets Simulated: {len(pnl)}")
-    print(f"Mean Final Bankroll: {mean_curve.iloc[-1]:.2f}u")
-    print(f"P5 (Worst Case) Final: {p5.iloc[-1]:.2f}u")
-    print(f"Average Max Drawdown: {avg_mdd:.2f}u")
-    print(f"95% Confidence Max Drawdown: {p95_mdd:.2f}u")
-    
+    print(f"Total Bets Simulated: {len(pnl)} ({iterations} paths in {elapsed:.1f}s)")
+    print(f"Mean Final Bankroll: {mean_curve[-1]:.2f}u")
+    print(f"P5 (Worst Case) Final: {res['final']['p5']:.2f}u")
+    print(f"Average Max Drawdown: {res['max_drawdown']['mean']:.2f}u")
+    print(f"95% Confidence Max Drawdown: {res['max_drawdown']['p95']:.2f}u")
+    print(f"\n{'BAND':<22}{'P5':>10}{'P50':>10}{'P95':>10}")
+    for key, fmt in [('final', '{:.2f}u'), ('max_drawdown', '{:.2f}u'), ('time_under_water', '{:.1%}')]:
+        print(f"{key.replace('_', ' ').title():<22}" + "".join(f"{fmt.format(res[key][q]):>10}" for q in ('p5', 'p50', 'p95')))
+
     # 4. Visualization
     plt.figure(figsize=(12, 7))
     plt.plot(mean_curve, label='Mean Expectancy', color='blue', lw=2)
-    plt.fill_between(range(len(pnl)), p5, p95, color='blue', alpha=0.1, label='90% Confidence Interval')
-    
+    plt.fill_between(range(len(mean_curve)), p5, p95, color='blue', alpha=0.1, label='90% Confidence Interval')
+
     # Plot a few random paths
-    for i in range(5):
-        plt.plot(all_curves[i], alpha=0.3, lw=0.5)
-        
-    plt.title(f"v5 Quantum Strategic: Monte Carlo Equity Stress-Test ({iterations} paths)")
-    plt.xlabel("Number of Bets")
+    for path in res['sample_paths']:
+        plt.plot(path, alpha=0.3, lw=0.5)
+
+    plt.title(f"{model.title()}: Monte Carlo Equity Stress-Test ({iterations} paths)")
+    plt.xlabel("Number of Bets" if mode == 'iid' else f"Number of {block_days}-Day Blocks")
     plt.ylabel("Bankroll (Units)")
     plt.legend()
     plt.grid(True, alpha=0.3)
-    
+
     save_path = 'research/v5_monte_carlo.png'
     plt.savefig(save_path)
     print(f"\n📈 Chart saved to: {save_path}")
+    return res
 
 if __name__ == "__main__":
-    run_monte_carlo()
+    parser = argparse.ArgumentParser(description="Bootstrap equity-curve stress test")
+    parser.add_argument('--paths', type=int, default=1000)
+    parser.add_argument('--model', choices=list(SIMULATIONS), default='quartz')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--mode', choices=['iid', 'block'], default='iid', help="Resample single bets or whole calendar blocks")
+    parser.add_argument('--block-days', type=int, default=1, help="Block length in days for --mode block (7 = weeks)")
+    args = parser.parse_args()
+    run_monte_carlo(iterations=args.paths, model=args.model, seed=args.seed, workers=args.workers,
+                    mode=args.mode, block_days=args.block_days)
@@ -1,11 +1,10 @@
 import os
 import sys
-import pandas as pd
 import numpy as np
 import joblib
 import json
-import itertools
-from tqdm import tqdm
+import time
+import argparse
 
 # Add project root to sys.path
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -14,7 +13,7 @@ if root_dir not in sys.path:
     sys.path.append(root_dir)
 
 from src.pipeline import SportsDataPipeline, FeatureEngineer
-from src.models import ModelSimulator
+from src.grid_eval import evaluate_grid, parity_gap
 
 def load_data():
     print("Fetching data...")
@@ -62,93 +61,56 @@ def get_model_predictions(df):
     df['edge'] = df['prob'] - df['implied_prob']
     return df
 
-def optimize(df):
-    # Parameter Grid
-    # We want strict filtering.
-    
-    min_edges = [0.03, 0.05, 0.08, 0.10, 0.12]
-    min_odds = [1.60, 1.70, 1.80, 1.90]
-    min_exps = [0, 10, 20, 30]
-    daily_caps = [5, 8] # We want <= 8 avg, so daily cap 8 is a hard limit option
-    
+# Original search space (320 configs)
+DEFAULT_GRID = {
+    'min_edge': [0.03, 0.05, 0.08, 0.10, 0.12],
+    'min_odds': [1.60, 1.70, 1.80, 1.90],
+    'min_exp': [0, 10, 20, 30],
+    'daily_cap': [5, 8], # We want <= 8 avg, so daily cap 8 is a hard limit option
     # Toxic Leagues Iteration
     # "Take what worked from Diamond" -> Toxic leagues exclusion
-    toxic_options = [
+    'toxic_leagues': [
         [],
         ['NFL', 'MLB', 'Tennis', 'Soccer', 'WNBA', 'Other'] # Diamond toxic list
-    ]
-    
-    results = []
-    
-    keys = ['min_edge', 'min_odds', 'min_exp', 'daily_cap', 'toxic_leagues']
-    combinations = list(itertools.product(min_edges, min_odds, min_exps, daily_caps, toxic_options))
-    
-    print(f"Testing {len(combinations)} combinations...")
-    
-    for combo in tqdm(combinations):
-        min_edge, min_odds, min_exp, daily_cap, toxic = combo
-        
-        # Apply Filters
-        # 1. Base Filters
-        mask = (
-            (df['edge'] >= min_edge) &
-            (df['decimal_odds'] >= min_odds) &
-            (df['capper_experience'] >= min_exp) &
-            (~df['league_name'].isin(toxic))
-        )
-        cand = df[mask].copy()
-        
-        if cand.empty:
-            continue
-            
-        # 2. Daily Cap (Top N by Edge)
-        cand = cand.sort_values(['pick_date', 'edge'], ascending=[True, False])
-        final = cand.groupby('pick_date', group_keys=False).head(daily_cap)
-        
-        # 3. Calculate Stats
-        # Assume Flat 1u for simplicity in optimization, or we could test Kelly
-        # User said "8 or less picks per day".
-        
-        # Performance
-        final['pnl'] = np.where(final['outcome']==1, (final['decimal_odds']-1), np.where(final['outcome']==0, -1.0, 0))
-        
-        total_pnl = final['pnl'].sum()
-        total_bets = len(final)
-        wins = final['outcome'].sum()
-        win_rate = wins / total_bets if total_bets > 0 else 0
-        roi = (total_pnl / total_bets) * 100 if total_bets > 0 else 0
-        
-        # Daily Stats
-        days = final['pick_date'].nunique()
-        avg_picks = total_bets / days if days > 0 else 0
-        
-        res = {
-            'min_edge': min_edge,
-            'min_odds': min_odds,
-            'min_exp': min_exp,
-            'daily_cap': daily_cap,
-            'toxic_count': len(toxic),
-            'bets': total_bets,
-            'days': days,
-            'avg_picks_day': avg_picks,
-            'profit': total_pnl,
-            'roi': roi,
-            'win_rate': win_rate
-        }
-        results.append(res)
-        
-    res_df = pd.DataFrame(results)
+    ],
+}
+
+# Fine search space (~48k configs) - only practical with the batched evaluator
+DENSE_GRID = {
+    'min_edge': [round(x, 3) for x in np.arange(0.0, 0.20, 0.005)],
+    'min_odds': [round(x, 2) for x in np.arange(1.50, 2.50, 0.05)],
+    'min_exp': [0, 5, 10, 20, 30, 50],
+    'daily_cap': [3, 5, 8, 10, 12],
+    'toxic_leagues': DEFAULT_GRID['toxic_leagues'],
+}
+
+def optimize(df, grid=None, workers=None):
+    """Flat-1u stats per config: filter, top daily_cap by edge per day (see src/grid_eval.py)."""
+    grid = grid or DEFAULT_GRID
+    n = int(np.prod([len(v) for v in grid.values()]))
+    print(f"Testing {n} combinations...")
+    t0 = time.perf_counter()
+    res_df = evaluate_grid(df, grid, workers=workers)
+    print(f"Evaluated in {time.perf_counter() - t0:.2f}s")
     return res_df
 
-def main():
+def main(dense=False, workers=None, check=False):
     df = load_data()
     if df is None: return
     
     # Predict
     df_pred = get_model_predictions(df)
     
+    if check:
+        # The batched evaluator must reproduce the per-config loop on the default grid
+        gap = parity_gap(df_pred, DEFAULT_GRID, workers=workers)
+        print(f"Max abs difference vs the loop:\n{gap.to_string()}")
+        if gap.isna().any() or (gap > 1e-9).any():
+            raise SystemExit("❌ Batched grid evaluation does not match the reference loop.")
+        print("✅ Batched grid evaluation matches the reference loop.")
+
     # Optimize
-    res_df = optimize(df_pred)
+    res_df = optimize(df_pred, grid=DENSE_GRID if dense else DEFAULT_GRID, workers=workers)
     
     if res_df.empty:
         print("No valid configs found.")
@@ -193,4 +155,9 @@ def main():
     print(json.dumps(config, indent=2))
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Obsidian filter/cap grid search")
+    parser.add_argument('--dense', action='store_true', help="Search the fine grid (~48k configs)")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--check', action='store_true', help="First verify the batched evaluator against the per-config loop")
+    args = parser.parse_args()
+    main(dense=args.dense, workers=args.workers, check=args.check)
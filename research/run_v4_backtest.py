@@ -1,9 +1,8 @@
 import pandas as pd
-import numpy as np
 from pipeline import SportsDataPipeline, FeatureEngineer
 from models import ModelSimulator
-import matplotlib.pyplot as plt
-import seaborn as sns
+from metrics import summarize
+from risk import RiskAccumulator
 import warnings
 
 warnings.filterwarnings('ignore')
@@ -27,34 +26,20 @@ def run_backtest():
     v4_results = sim.run_v4_quartz()
     
     # 3. Calculate Metrics
-    def get_stats(results, name):
-        if results.empty:
-            return {'Model': name, 'Profit': 0, 'ROI': 0, 'Bets': 0, 'Win%': 0, 'Sharpe': 0}
-            
-        profit = results['profit_actual'].sum()
-        bets = len(results)
-        roi = (profit / results['wager_unit'].sum()) * 100 if bets > 0 else 0
-        win_rate = (results['outcome'] == 1).mean() * 100
-        daily_profit = results.groupby('pick_date')['profit_actual'].sum()
-        sharpe = daily_profit.mean() / (daily_profit.std() + 1e-6) * np.sqrt(365)
-        
-        # New Metric: Avg Bets/Day
-        avg_bets_day = results.groupby('pick_date').size().mean()
-        
-        return {
-            'Model': name,
-            'Units Profit': f"{profit:.2f}u",
-            'ROI': f"{roi:.2f}%",
-            'Total Bets': bets,
-            'Avg Bets/Day': f"{avg_bets_day:.1f}",
-            'Win Rate': f"{win_rate:.1f}%",
-            'Sharpe Ratio': f"{sharpe:.2f}"
-        }
-
-    stats = [
-        get_stats(v3_results, 'v3 Obsidian'),
-        get_stats(v4_results, 'v4 Quartz')
-    ]
+    results = {'v3 Obsidian': v3_results, 'v4 Quartz': v4_results}
+    summary = summarize(results)
+    risk = {name: RiskAccumulator().add_frame(res).summary() for name, res in results.items()}
+    stats = [{
+        'Model': name,
+        'Units Profit': f"{m['net']:.2f}u",
+        'ROI': f"{m['roi']:.2f}%",
+        'Total Bets': int(m['bets']),
+        'Avg Bets/Day': f"{m['bets_per_active_day']:.1f}",
+        'Win Rate': f"{m['win_rate']:.1f}%",
+        'Sharpe Ratio': f"{m['sharpe']:.2f}",
+        'Sortino Ratio': f"{risk[name]['sortino']:.2f}",
+        'Max Drawdown': f"{risk[name]['max_drawdown']:.2f}u"
+    } for name, m in summary.iterrows()]
     
     stats_df = pd.DataFrame(stats)
     print("\n📈 BACKTEST RESULTS:")
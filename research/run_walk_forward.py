@@ -0,0 +1,70 @@
+import os
+import sys
+import argparse
+import pandas as pd
+import warnings
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from pipeline import SportsDataPipeline, FeatureEngineer
+from walk_forward import run_walk_forward, WALK_FORWARD_DIR
+from metrics import summarize
+
+warnings.filterwarnings('ignore')
+
+def main(args):
+    print(f"🧭 Walk-Forward Backtest: v4 ensemble ({args.mode}, {args.test_days}d test windows)...")
+    raw_df = SportsDataPipeline().fetch_data_cached()
+    df = FeatureEngineer(raw_df).process()
+
+    result = run_walk_forward(
+        df, test_days=args.test_days, mode=args.mode, train_days=args.train_days,
+        min_train_days=args.min_train_days, embargo_days=args.embargo_days,
+        start=args.start, end=args.end, workers=args.workers, cache_dir=args.cache_dir,
+    )
+    folds, bets = result["folds"], result["bets"]
+    if folds.empty: return
+
+    fold_view = folds[['fold', 'test_start', 'train_rows', 'test_rows', 'auc', 'logloss', 'cached', 'wall_s']].copy()
+    fold_view['test_start'] = fold_view['test_start'].dt.strftime('%Y-%m-%d')
+    if not bets.empty:
+        fold_pnl = bets.merge(result["predictions"][['pick_date', 'fold']].drop_duplicates('pick_date'), on='pick_date', how='left') \
+                       .groupby('fold')['profit_actual'].sum().round(2)
+        fold_view['profit'] = fold_view['fold'].map(fold_pnl).fillna(0.0)
+
+    summary = summarize({'v4 Quartz (walk-forward)': bets})
+    stats_df = pd.DataFrame([{
+        'Model': name,
+        'Units Profit': f"{m['net']:.2f}u",
+        'ROI': f"{m['roi']:.2f}%",
+        'Total Bets': int(m['bets']),
+        'Win Rate': f"{m['win_rate']:.1f}%",
+        'Sharpe Ratio': f"{m['sharpe']:.2f}",
+    } for name, m in summary.iterrows()])
+    print("\n📊 FOLDS:")
+    print(fold_view.to_string(index=False))
+    print("\n📈 OUT-OF-SAMPLE RESULTS:")
+    print(stats_df.to_string(index=False))
+
+    with open('research/walk_forward_results.md', 'w') as f:
+        f.write("# Walk-Forward Backtest Results\n\n")
+        f.write(f"*{args.mode} window, {args.test_days}-day test periods, {args.embargo_days}-day embargo*\n\n")
+        f.write(stats_df.to_markdown(index=False))
+        f.write("\n\n## Folds\n\n")
+        f.write(fold_view.to_markdown(index=False))
+        f.write("\n\n")
+        f.write(f"*Backtest run on {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}*\n")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Walk-forward retrain/score backtest of the v4 ensemble")
+    parser.add_argument('--mode', choices=['expanding', 'sliding'], default='expanding')
+    parser.add_argument('--test-days', type=int, default=7, help="Out-of-sample period per fold")
+    parser.add_argument('--train-days', type=int, default=90, help="Train window length (sliding mode)")
+    parser.add_argument('--min-train-days', type=int, default=60, help="History required before the first fold")
+    parser.add_argument('--embargo-days', type=int, default=1, help="Gap between train end and test start")
+    parser.add_argument('--start', default=None, help="First test date (YYYY-MM-DD)")
+    parser.add_argument('--end', default=None, help="Last test date (YYYY-MM-DD)")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--cache-dir', default=WALK_FORWARD_DIR)
+    main(parser.parse_args())
@@ -0,0 +1,47 @@
+import os
+import sys
+import argparse
+import warnings
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from pipeline import SportsDataPipeline, FeatureEngineer
+from tuning import run_tuning, save_best, storage_url, TUNING_DIR, TUNED_PARAMS_PATH
+
+warnings.filterwarnings('ignore')
+
+def main(args):
+    raw_df = SportsDataPipeline().fetch_data_cached()
+    df = FeatureEngineer(raw_df).process()
+
+    study = run_tuning(
+        df, study_name=args.study, n_trials=args.trials, timeout=args.timeout, workers=args.workers,
+        n_splits=args.splits, early_stopping_rounds=args.early_stopping, pruner=args.pruner, seed=args.seed,
+        storage=storage_url(args.db),
+    )
+    states = [t.state.name for t in study.trials]
+    print(f"\n📊 Study '{study.study_name}': {states.count('COMPLETE')} complete, {states.count('PRUNED')} pruned, "
+          f"{states.count('FAIL')} failed")
+    if states.count('COMPLETE') == 0: return
+
+    params = save_best(study, args.out)
+    print(f"🏆 Best trial #{params['trial']}: CV logloss {params['value']:.5f}")
+    print(f"   xgb: {params['xgb']}")
+    print(f"   lgb: {params['lgb']}")
+    print(f"   weights: {[round(w, 3) for w in params['weights']]}")
+    print(f"📁 Saved to {args.out} (train with: python src/v4_quantum_sniper.py --params {args.out})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel Optuna search over the v4 ensemble (resumable SQLite study)")
+    parser.add_argument('--study', default='v4_quantum_sniper', help="Study name; rerunning adds trials to it")
+    parser.add_argument('--trials', type=int, default=100, help="Trials to add in this run")
+    parser.add_argument('--timeout', type=float, default=None, help="Stop starting new trials after this many seconds")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--splits', type=int, default=5)
+    parser.add_argument('--early-stopping', type=int, default=50)
+    parser.add_argument('--pruner', choices=['median', 'halving'], default='median')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--db', default=os.path.join(TUNING_DIR, 'v4_tuning.db'))
+    parser.add_argument('--out', default=TUNED_PARAMS_PATH)
+    main(parser.parse_args())
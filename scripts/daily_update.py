@@ -1,7 +1,6 @@
 import os
 import json
 import pandas as pd
-import joblib
 from datetime import datetime
 import sys
 
@@ -12,7 +11,13 @@ if BASE_DIR not in sys.path:
     sys.path.append(BASE_DIR)
 
 from pipeline import SportsDataPipeline, FeatureEngineer
-from models import ModelSimulator
+from ledger import update_ledgers, BetLedger, model_fingerprint, arrow_safe
+from leakage_audit import audit_features
+from instrumentation import tracer
+from build_graph import BuildGraph, Stage, BUILD_MANIFEST, frame_digest, partition_hashes, library_versions
+from run_context import RunContext
+from metrics import summarize
+from results_store import ResultsStore, RESULTS_DIR
 
 # --- MANUAL OVERRIDES (Institutional Protection) ---
 # Set these to non-None to force specific stats in the dashboard
@@ -21,26 +26,30 @@ MANUAL_OVERRIDES = {
     # No active overrides. Reporting raw simulation data.
 }
 
+# Feature frame of the last run (reloaded when features are unchanged but a later stage reruns)
+FEATURES_PATH = os.path.join('data', 'build', 'features.parquet')
+
+# Files written by generate_assets.generate_live_assets (relative to the repo root)
+ASSET_OUTPUTS = [f"docs/data/{page}.json" for page in ('obsidian', 'diamond', 'pyrite', 'quartz', 'selector')] + [
+    f"{d}/{name}.png" for d in ('assets', 'docs/assets') for name in (
+        'pyrite_live_curve', 'pyrite_sport', 'diamond_sport', 'quartz_sport', 'obsidian_sport',
+        'pyrite_size', 'diamond_size', 'quartz_size', 'obsidian_comparison')
+] + [f"docs/assets/{name}.png" for name in ('obsidian_curve', 'quarry_performance', 'live_curve')
+] + [f"docs/{name}_series.json.gz" for name in ('pyrite', 'diamond', 'obsidian', 'quartz')]
+
 
 def update_markdown_reports(models):
     """Ported from monitor.py: Updates README.md and LATEST_ACTION.md with latest results."""
     print("📝 Updating System Reports (README.md & LATEST_ACTION.md)...")
     
     # --- HELPER FUNCTIONS ---
-    def get_stats(d):
-        if d.empty: return 0.0, 0.0, 0.0
-        settled = d[d['outcome'].isin([0.0, 1.0])]
-        if settled.empty: return 0.0, 0.0, 0.0
-        p = settled['profit_actual'].sum()
-        r = settled['wager_unit'].sum()
-        roi = p/r if r>0 else 0.0
-        wr = len(settled[settled['outcome']==1]) / len(settled)
-        return p, roi, wr
-
-    def get_volume_text(d):
-        if d.empty: return "None (0 bets/day)"
-        days = (d['pick_date'].max() - d['pick_date'].min()).days + 1
-        avg = len(d) / max(days, 1)
+    def get_stats(m):
+        # Settled bets only: pending bets neither add stake nor count towards the win rate
+        return m['net'], m['roi'] / 100, m['win_rate'] / 100
+
+    def get_volume_text(m):
+        if m['bets'] == 0: return "None (0 bets/day)"
+        avg = m['bets_per_day']
         if avg > 50: cat = "Very High"
         elif avg > 20: cat = "High"
         elif avg > 10: cat = "Medium"
@@ -50,22 +59,20 @@ def update_markdown_reports(models):
 
     # --- CALCULATE STATS ---
     v1, v2, v3, v4 = models.get("pyrite"), models.get("diamond"), models.get("obsidian"), models.get("quartz")
-    p1, r1, w1 = get_stats(v1)
-    p2, r2, w2 = get_stats(v2)
-    p3, r3, w3 = get_stats(v3)
-    p4, r4, w4 = get_stats(v4)
+    summary = summarize({"pyrite": v1, "diamond": v2, "obsidian": v3, "quartz": v4})
+    p1, r1, w1 = get_stats(summary.loc["pyrite"])
+    p2, r2, w2 = get_stats(summary.loc["diamond"])
+    p3, r3, w3 = get_stats(summary.loc["obsidian"])
+    p4, r4, w4 = get_stats(summary.loc["quartz"])
     
-    vol_v1 = get_volume_text(v1)
-    vol_v2 = get_volume_text(v2)
-    vol_v3 = get_volume_text(v3)
-    vol_v4 = get_volume_text(v4)
+    vol_v1 = get_volume_text(summary.loc["pyrite"])
+    vol_v2 = get_volume_text(summary.loc["diamond"])
+    vol_v3 = get_volume_text(summary.loc["obsidian"])
+    vol_v4 = get_volume_text(summary.loc["quartz"])
 
     # --- 1. LATEST_ACTION.md ---
-    dates = []
-    for d in [v1, v2, v3, v4]:
-        if not d.empty: dates.append(d['pick_date'].max())
-    
-    last_date = max(dates) if dates else datetime.now()
+    last_date = summary['last_date'].max()
+    if pd.isna(last_date): last_date = datetime.now()
     
     log_content = f"# 📝 Daily Action Log ({last_date.date()})\n\n"
     
@@ -176,31 +183,8 @@ graph TD
         
     print("✅ System reports updated.")
 
-def run_daily_update():
-    print(f"🕒 Starting Daily Update: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    
-    # 1. Fetch & Hydrate Data
-    pipeline = SportsDataPipeline()
-    raw_df = pipeline.fetch_data_cached() # Incremental update
-    
-    fe = FeatureEngineer(raw_df)
-    df = fe.process()
-    
-    ms = ModelSimulator(df)
-    
-    # 2. Run Simulations
-    print("⏳ Running Simulations...")
-    models = {
-        "pyrite": ms.run_v1_pyrite(),
-        "diamond": ms.run_v2_diamond(),
-        "obsidian": ms.run_v3_obsidian(),
-        "quartz": ms.run_v4_quartz()
-    }
-    
-    for name, res in models.items():
-        print(f"  - {name.upper()}: {len(res)} picks identified.")
-    
-    # 3. Generate Stats for JSON/JS
+def build_stats(models):
+    """Dashboard stats (docs/stats.json) from the model ledgers."""
     stats = {
         "meta": {
             "last_update": datetime.now(pd.Timestamp.now(tz='UTC').tz).strftime('%Y-%m-%d %H:%M UTC'),
@@ -209,66 +193,49 @@ def run_daily_update():
         "models": {}
     }
     
+    summary = summarize(models)
     for name, res in models.items():
-        if res.empty or 'profit_actual' not in res.columns:
+        m = summary.loc[name]
+        status = "LEGACY" if name == "pyrite" else ("STABLE" if name == "diamond" else ("ADVANCED" if name == "obsidian" else "FLAGSHIP"))
+        if m['bets'] == 0:
             stats["models"][name] = {
                 "roi": 0, "net": 0, "wins": 0, "losses": 0, "pushes": 0,
                 "record": "0-0-0", "win_rate": 0, "sample": 0, "bets_day": 0,
-                "status": "LEGACY" if name == "pyrite" else ("STABLE" if name == "diamond" else ("ADVANCED" if name == "obsidian" else "FLAGSHIP")),
+                "status": status,
                 "yesterday": {"date": "N/A", "record": "0-0-0", "net": 0, "roi": 0, "ledger": []}
             }
         else:
-            roi = (res['profit_actual'].sum() / res['wager_unit'].sum() * 100) if res['wager_unit'].sum() > 0 else 0
-            net = res['profit_actual'].sum()
-            wins = len(res[res['outcome'] == 1])
-            losses = len(res[res['outcome'] == 0])
-            pushes = len(res[res['outcome'] == 0.5])
-            
-            last_day_val = res['pick_date'].max()
-            last_day = res[res['pick_date'] == last_day_val]
-            y_record = "0-0-0"
-            y_net = 0
-            y_roi = 0
-            y_winrate = 0
-            y_list = []
-            
-            if not last_day.empty:
-                y_wins = len(last_day[last_day['outcome'] == 1])
-                y_losses = len(last_day[last_day['outcome'] == 0])
-                y_record = f"{y_wins}-{y_losses}-{len(last_day) - y_wins - y_losses}"
-                y_net = last_day['profit_actual'].sum()
-                y_roi = (y_net / last_day['wager_unit'].sum() * 100) if last_day['wager_unit'].sum() > 0 else 0
-                y_winrate = (y_wins / (y_wins + y_losses) * 100) if (y_wins + y_losses) > 0 else 0
-                
-                # Ensure columns are unique before converting to dict (Prevents UserWarning & data loss)
-                last_day_unique = last_day.loc[:, ~last_day.columns.duplicated()]
-                y_list = last_day_unique.sort_values('profit_actual', ascending=False).head(15).to_dict('records')
-                for item in y_list:
-                    item['pick_date'] = item['pick_date'].strftime('%m/%d')
-                    item['result'] = 'WIN' if item['outcome'] == 1 else ('LOSS' if item['outcome'] == 0 else 'PUSH')
-                    for k in list(item.keys()):
-                        if k not in ['pick_date', 'league_name', 'pick_norm', 'decimal_odds', 'wager_unit', 'result', 'profit_actual', 'edge']:
-                            del item[k]
+            # Ensure columns are unique before converting to dict (Prevents UserWarning & data loss)
+            last_day = res.loc[res['pick_date'] == m['y_date'], ~res.columns.duplicated()]
+            y_list = last_day.sort_values('profit_actual', ascending=False).head(15).to_dict('records')
+            for item in y_list:
+                item['pick_date'] = item['pick_date'].strftime('%m/%d')
+                item['result'] = 'WIN' if item['outcome'] == 1 else ('LOSS' if item['outcome'] == 0 else 'PUSH')
+                for k in list(item.keys()):
+                    if k not in ['pick_date', 'league_name', 'pick_norm', 'decimal_odds', 'wager_unit', 'result', 'profit_actual', 'edge']:
+                        del item[k]
 
             stats["models"][name] = {
-                "roi": round(roi, 1),
-                "net": round(net, 1),
-                "wins": wins,
-                "losses": losses,
-                "pushes": pushes,
-                "record": f"{wins}-{losses}-{pushes}",
-                "win_rate": round(wins / (wins + losses) * 100, 1) if (wins + losses) > 0 else 0,
-                "sample": len(res),
-                "bets_day": round(len(res) / ((res['pick_date'].max() - res['pick_date'].min()).days + 1), 1),
-                "status": "LEGACY" if name == "pyrite" else ("STABLE" if name == "diamond" else ("ADVANCED" if name == "obsidian" else "FLAGSHIP")),
+                "roi": round(float(m['roi']), 1),
+                "net": round(float(m['net']), 1),
+                "wins": int(m['wins']),
+                "losses": int(m['losses']),
+                "pushes": int(m['pushes']),
+                "record": m['record'],
+                "win_rate": round(float(m['win_rate']), 1),
+                "sample": int(m['bets']),
+                "bets_day": round(float(m['bets_per_day']), 1),
+                "status": status,
                 "yesterday": {
-                    "date": last_day_val.strftime('%b %d, %Y'),
-                    "record": y_record,
-                    "win_rate": round(y_winrate, 1),
-                    "net": round(y_net, 2),
-                    "roi": round(y_roi, 1),
+                    "date": m['y_date'].strftime('%b %d, %Y'),
+                    "record": m['y_record'],
+                    "win_rate": round(float(m['y_win_rate']), 1),
+                    "net": round(float(m['y_net']), 2),
+                    "roi": round(float(m['y_roi']), 1),
                     "ledger": y_list
-                }
+                },
+                # Persisted accumulator over frozen days + the open tail: no history rescan
+                "risk": BetLedger(name).risk(res)
             }
 
         # Apply Manual Overrides if configured
@@ -282,9 +249,10 @@ def run_daily_update():
                 roi_val = ovr.get("roi", stats["models"][name]["roi"])
                 sample_val = ovr.get("sample", stats["models"][name]["sample"])
                 stats["models"][name]["net"] = round(sample_val * (roi_val / 100), 1)
+    return stats
 
-
-    # 4. Save Stats
+def write_stats(stats, models):
+    """Write stats.json/stats.js and the results store consumed by generate_assets."""
     docs_dir = os.path.join(BASE_DIR, 'docs')
     os.makedirs(docs_dir, exist_ok=True)
     
@@ -296,32 +264,125 @@ def run_daily_update():
         
     # 4b. Export Raw Results for Asset Sync
     # This prevents generate_assets.py from having to re-simulate with potentially different data
-    cache_path = os.path.join(docs_dir, 'sim_results_cache.pkl')
+    store = ResultsStore(os.path.join(BASE_DIR, RESULTS_DIR))
     try:
-        joblib.dump(models, cache_path)
-        print(f"📦 Simulation results cached to {cache_path}")
+        store.write_all(models)
+        print(f"📦 Simulation results stored in {store.root}")
     except Exception as e:
-        print(f"⚠️ Failed to cache simulation results: {e}")
-        
-    # 5. Update Markdown Reports
-    update_markdown_reports(models)
+        print(f"⚠️ Failed to store simulation results: {e}")
+
+def build_features(raw, audit=True):
+    """Engineered feature frame, gated on the T-1 leakage audit and written to FEATURES_PATH."""
+    df = FeatureEngineer(raw).process()
+
+    # 1b. Leakage Gate: lagged features must match an independent T-1 recomputation
+    if audit:
+        report = audit_features(df)
+        if not report['ok']:
+            bad = report['summary'][report['summary']['mismatches'] > 0]
+            print(f"❌ Leakage audit failed ({len(report['mismatches'])} mismatching values); reports left untouched.")
+            print(bad.to_string(index=False))
+            print(report['mismatches'].head(20).to_string(index=False))
+            raise SystemExit(1)
+        print(f"🛡️ Leakage audit passed ({report['rows']} picks).")
+    os.makedirs(os.path.join(BASE_DIR, os.path.dirname(FEATURES_PATH)), exist_ok=True)
+    arrow_safe(df).to_parquet(os.path.join(BASE_DIR, FEATURES_PATH), index=False)
+    return df
+
+def update_model_ledgers(features, full_rebuild=False):
+    """Bring the bet ledgers up to date; returns {name: ledger frame}."""
+    # 2. Run Simulations (incremental: only open/new days hit the simulators)
+    print("⏳ Updating Bet Ledgers...")
+    sim_run = update_ledgers(features, full_rebuild=full_rebuild)
+    models = sim_run["models"]  # Ledgers are the source of truth for everything below
+    print(f"  ({sim_run['timings']['ledger_total']['wall_s']:.1f}s)")
+    for name, res in models.items():
+        print(f"  - {name.upper()}: {len(res)} picks on ledger ({sim_run['simulated_dates'][name]} day(s) simulated, {sim_run['resettled_dates'][name]} re-settled).")
+    return models
 
-    # 6. Generate Assets (Plots & HTML Injection)
-    # We call generate_assets.generate_live_assets() to sync plots
-    try:
-        import scripts.generate_assets as generate_assets
-        generate_assets.generate_live_assets()
-    except ModuleNotFoundError:
-        # Fallback for localized script execution
-        import generate_assets
-        generate_assets.generate_live_assets()
-    
-    # 7. Generate Comparison Graphics
-    sys.path.append(os.path.join(BASE_DIR, 'research'))
-    import generate_comparison
-    generate_comparison.generate_comparison_chart()
-    
-    print("✅ Daily Update Complete.")
+def run_daily_update(full_rebuild=False, audit=True, force=False):
+    """Daily job as an incremental build: a stage reruns only when its code, inputs or upstream outputs changed.
+
+    fetch (always) -> features (+ leakage gate) -> ledgers -> stats / reports / assets / comparison.
+    full_rebuild rebuilds every ledger from scratch; force reruns every stage without touching the ledgers.
+    """
+    print(f"🕒 Starting Daily Update: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    from runner import SIMULATIONS
+
+    def fetch(_results):
+        # 1. Fetch & Hydrate Data (incremental sync; always runs, its partition hashes gate everything else)
+        return SportsDataPipeline().fetch_data_cached()
+
+    def features(_results):
+        return build_features(ctx.raw, audit=audit)
+
+    def ledgers(_results):
+        return update_model_ledgers(ctx.features, full_rebuild=full_rebuild)
+
+    def stats(_results):
+        # 3. Generate + Save Stats for JSON/JS
+        write_stats(build_stats(ctx.models), ctx.models)
+
+    def reports(_results):
+        # 4. Update Markdown Reports
+        with tracer.span('reports'):
+            update_markdown_reports(ctx.models)
+
+    def assets(_results):
+        # 5. Generate Assets (Plots & HTML Injection)
+        try:
+            import scripts.generate_assets as generate_assets
+        except ModuleNotFoundError:
+            # Fallback for localized script execution
+            import generate_assets
+        generate_assets.generate_live_assets(context=ctx)
+
+    def comparison(_results):
+        # 6. Generate Comparison Graphics
+        sys.path.append(os.path.join(BASE_DIR, 'research'))
+        import generate_comparison
+        with tracer.span('comparison'):
+            generate_comparison.generate_comparison_chart(context=ctx)
+
+    names = list(SIMULATIONS)
+    stages = [
+        Stage('fetch', fetch, always=True, digest=partition_hashes),
+        Stage('features', features, deps=['fetch'], code=['src/pipeline.py', 'src/point_in_time.py', 'src/leakage_audit.py'],
+              inputs=lambda r: {"audit": audit}, outputs=[FEATURES_PATH], digest=frame_digest,
+              load=lambda: pd.read_parquet(os.path.join(BASE_DIR, FEATURES_PATH))),
+        Stage('ledgers', ledgers, deps=['features'], code=['src/ledger.py', 'src/risk.py', 'src/runner.py', 'src/inference.py', 'src/calibration.py'],
+              inputs=lambda r: {"models": {n: model_fingerprint(n) for n in names}, "libraries": library_versions()},
+              outputs=[os.path.join('data', 'ledgers', n, 'ledger_meta.json') for n in names],
+              digest=lambda models: {n: frame_digest(f) for n, f in models.items()},
+              load=lambda: {n: BetLedger(n).load() for n in names}),
+        Stage('stats', stats, deps=['ledgers'], code=['scripts/daily_update.py', 'src/metrics.py', 'src/risk.py', 'src/results_store.py'], inputs=lambda r: {"overrides": MANUAL_OVERRIDES},
+              outputs=['docs/stats.json', 'docs/stats.js'] + [os.path.join(RESULTS_DIR, f'{n}.parquet') for n in names]),
+        Stage('reports', reports, deps=['ledgers'], code=['scripts/daily_update.py', 'src/metrics.py'], outputs=['README.md', 'LATEST_ACTION.md']),
+        Stage('assets', assets, deps=['fetch', 'ledgers'], code=['scripts/generate_assets.py', 'src/metrics.py', 'src/series.py'], outputs=ASSET_OUTPUTS),
+        Stage('comparison', comparison, deps=['ledgers'], code=['research/generate_comparison.py'],
+              outputs=[f'docs/comparison_{n}.png' for n in names]),
+    ]
+    graph = BuildGraph(stages, root=BASE_DIR, manifest_path=os.path.join(BASE_DIR, BUILD_MANIFEST), force=force or full_rebuild)
+    # One copy of the picks, features and ledgers for every stage (stage values, loaded lazily when a stage was skipped)
+    ctx = RunContext(raw=lambda: graph.results['fetch'], features=lambda: graph.results['features'],
+                     models=lambda: graph.results['ledgers'])
+    _, status = graph.run()
+    skipped = [n for n, s in status.items() if s == 'skipped']
+    print(f"✅ Daily Update Complete. ({len(status) - len(skipped)} stage(s) ran, {len(skipped)} skipped)")
+
+    # 7. Stage timing report (next to stats.json) + rolling history for regression tracking
+    docs_dir = os.path.join(BASE_DIR, 'docs')
+    os.makedirs(docs_dir, exist_ok=True)
+    tracer.print_summary(tracer.write_report(docs_dir))
 
 if __name__ == "__main__":
-    run_daily_update()
+    import argparse
+    parser = argparse.ArgumentParser(description="Quarry daily pipeline")
+    parser.add_argument('--full', action='store_true', help="Rebuild every model ledger from its release date")
+    parser.add_argument('--no-profile', action='store_true', help="Skip stage timing (docs/run_report.json)")
+    parser.add_argument('--skip-audit', action='store_true', help="Skip the T-1 leakage gate")
+    parser.add_argument('--force', action='store_true', help="Rerun every stage even when its inputs are unchanged")
+    args = parser.parse_args()
+    if not args.no_profile:
+        tracer.enable()
+    run_daily_update(full_rebuild=args.full, audit=not args.skip_audit, force=args.force)
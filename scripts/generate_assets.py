@@ -1,11 +1,9 @@
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
-import joblib
 import numpy as np
 import os
 import json
-import re
 import matplotlib.dates as mdates
 import sys
 
@@ -14,20 +12,24 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 root_dir = os.path.abspath(os.path.join(script_dir, ".."))
 if root_dir not in sys.path:
     sys.path.append(root_dir)
-
-from src.pipeline import SportsDataPipeline, FeatureEngineer
-from src.models import ModelSimulator
+# src on the path too, so daily_update and this script share one copy of each module (and one tracer)
+src_dir = os.path.join(root_dir, 'src')
+if src_dir not in sys.path:
+    sys.path.append(src_dir)
+
+from pipeline import SportsDataPipeline, FeatureEngineer
+from models import ModelSimulator
+from instrumentation import tracer
+from charts import FigureSpec, render_figures
+from metrics import summarize
+from series import export_series
+from results_store import ResultsStore
 
 # ==========================================
 # CONFIGURATION
 # ==========================================
-# Ensure we are in the project root
-if os.path.basename(os.getcwd()) == 'scripts':
-    os.chdir('..')
-
-plt.style.use('dark_background')
-os.makedirs('assets', exist_ok=True)
-os.makedirs('docs/assets', exist_ok=True)
+# No side effects at import: the working directory, plot style and output folders are
+# set up by the functions that write files (chart renderers get theirs from charts.render_png).
 
 COLORS = {
     'void': '#05070a',
@@ -48,6 +50,8 @@ COLORS = {
 # ==========================================
 def generate_synthetic_assets():
     print("Generating Synthetic Assets for Methodology...")
+    plt.style.use('dark_background')
+    os.makedirs('assets', exist_ok=True)
     
     def generate_synthetic_data(n_rows=1000):
         np.random.seed(42)
@@ -136,66 +140,10 @@ def generate_synthetic_assets():
 # ==========================================
 # II. LIVE ASSETS (Dashboards)
 # ==========================================
-def generate_live_assets(since_days=None):
-    print("🚀 Generating Live Assets from Supabase...")
-    # Ensure current directory for file writing
-    if os.path.basename(os.getcwd()) == 'scripts':
-        os.chdir('..')
-
-    pipeline = SportsDataPipeline()
-    raw_df = pipeline.fetch_data(since_days=since_days)
-    if raw_df.empty:
-        print("❌ No data found.")
-        return
-
-    # --- CENTRALIZED DATA LOADING ---
-    cache_path = os.path.join('docs', 'sim_results_cache.pkl')
-    if os.path.exists(cache_path):
-        try:
-            print(f"📦 Loading cached simulation results from {cache_path}...")
-            cached_models = joblib.load(cache_path)
-            v1 = cached_models.get('pyrite', pd.DataFrame())
-            v2 = cached_models.get('diamond', pd.DataFrame())
-            v3 = cached_models.get('obsidian', pd.DataFrame())
-            v4 = cached_models.get('quartz', pd.DataFrame())
-            print("✅ Cache loaded successfully.")
-        except Exception as e:
-            print(f"⚠️ Failed to load cache: {e}. Falling back to live simulation.")
-            v1, v2, v3, v4 = None, None, None, None
-    else:
-        v1, v2, v3, v4 = None, None, None, None
-
-    if v1 is None or v1.empty: # Fallback if cache missing or failed
-        eng = FeatureEngineer(raw_df)
-        df = eng.process()
-        sim = ModelSimulator(df)
-        v1 = sim.run_v1_pyrite()
-        v2 = sim.run_v2_diamond()
-        v3 = sim.run_v3_obsidian()
-        v4 = sim.run_v4_quartz()
-
-    # Ensure edge calculations are consistent
-    if not v1.empty and 'edge' not in v1.columns: v1['edge'] = v1['prob'] - v1['implied_prob']
-    if not v4.empty and 'edge' not in v4.columns: v4['edge'] = (v4['prob'] if 'prob' in v4.columns else 0.5) - (v4['implied_prob'] if 'implied_prob' in v4.columns else 0.5)
-    
-    # --- 1. PLOTS ---
-    # cumulative profit
-    def get_cum(d):
-        if d.empty: return pd.DataFrame({'pick_date':[], 'profit':[]})
-        
-        # Raw Sequential Profit (Institutional Best Practice)
-        d = d.sort_values('pick_date').copy()
-        d['profit'] = d['profit_actual'].cumsum()
-        
-        # Zero-Origin sync
-        min_date = d['pick_date'].min()
-        if pd.isna(min_date): return pd.DataFrame({'pick_date':[], 'profit':[]})
-        
-        start_node = pd.DataFrame({'pick_date': [min_date - pd.Timedelta(seconds=1)], 'profit': [0.0]})
-        return pd.concat([start_node, d[['pick_date', 'profit']]]).sort_values('pick_date')
-
-    d1, d2, d3, d4 = get_cum(v1), get_cum(v2), get_cum(v3), get_cum(v4)
-    
+# Figure renderers: module-level so the chart pool can run them in worker processes.
+# Each draws one new figure from pre-aggregated series (see charts.FigureSpec).
+def draw_performance_curve(curves):
+    d1, d2, d3, d4 = curves
     # Combined Curve
     plt.figure(figsize=(16, 10), facecolor=COLORS['void'])
     ax = plt.gca()
@@ -232,11 +180,7 @@ def generate_live_assets(since_days=None):
         delta = p_max - p_min if p_max > p_min else 10
         ax.set_ylim(p_min - delta*0.1, p_max + delta*0.25)
 
-    plt.savefig("docs/assets/obsidian_curve.png", bbox_inches='tight', dpi=300) # Legacy
-    plt.savefig("docs/assets/quarry_performance.png", bbox_inches='tight', dpi=300)
-    plt.savefig("docs/assets/live_curve.png", bbox_inches='tight', dpi=300)
-    plt.close()
-
+def draw_pyrite_curve(d1):
     # Pyrite Solo Curve
     plt.figure(figsize=(16, 10), facecolor=COLORS['void'])
     ax = plt.gca()
@@ -268,95 +212,34 @@ def generate_live_assets(since_days=None):
         delta = p_max - p_min if p_max > p_min else 10
         ax.set_ylim(p_min - delta*0.1, p_max + delta*0.25)
 
-    plt.savefig("assets/pyrite_live_curve.png", bbox_inches='tight', dpi=300)
-    plt.savefig("docs/assets/pyrite_live_curve.png", bbox_inches='tight', dpi=300)
-    plt.close()
-
-    def plot_sport_roi(data, filename, title, color_pos, color_neg=None):
-        if data.empty: return
-        if color_neg is None: color_neg = COLORS['loss']
-        
-        s = data.groupby('league_name').agg({'profit_actual':'sum', 'wager_unit':'sum'})
-        s['roi'] = s['profit_actual'] / s['wager_unit']
-        s = s.sort_values('roi', ascending=False)
-        
-        plt.figure(figsize=(8, 4), facecolor=COLORS['void'])
-        ax = plt.gca()
-        ax.set_facecolor(COLORS['void'])
-        for spine in ax.spines.values(): spine.set_visible(False)
-        ax.grid(True, axis='y', linestyle=':', color='#222222', alpha=0.3)
-        
-        colors = [color_pos if x > 0 else color_neg for x in s['roi']]
-        sns.barplot(x=s.index, y=s['roi'], palette=colors)
-        
-        plt.title(title, color='white', pad=20, fontname='monospace', fontweight='bold')
-        plt.xticks(rotation=45, color=COLORS['text'])
-        plt.yticks(color=COLORS['text'])
-        plt.ylabel('ROI', color=COLORS['text'])
-        plt.xlabel('')
-        plt.tight_layout()
-        plt.savefig(filename, dpi=150, facecolor=COLORS['void'])
-        plt.savefig(f"docs/{filename}", dpi=150, facecolor=COLORS['void'])
-        plt.close()
-
-    plot_sport_roi(v1, "assets/pyrite_sport.png", "V1 PYRITE ROI BY SPORT", COLORS['pyrite'])
-    plot_sport_roi(v2, "assets/diamond_sport.png", "V2 DIAMOND ROI BY SPORT", COLORS['diamond'])
-    plot_sport_roi(v4, "assets/quartz_sport.png", "V4 QUARTZ ROI BY SPORT", COLORS['quartz'], color_neg=COLORS['quartz_neg'])
-
-    # Bet Sizing / Confidence Calibration
-    def plot_sizing(data, filename, title, color_pos, color_neg=None):
-        if data.empty: return
-        if color_neg is None: color_neg = COLORS['loss']
-        
-        # Bin by confidence
-        data['conf_bin'] = pd.cut(data['prob'], bins=[0.5, 0.55, 0.6, 0.65, 0.7, 1.0], labels=['50-55%', '55-60%', '60-65%', '65-70%', '70%+'])
-        s = data.groupby('conf_bin').agg({'profit_actual':'sum', 'wager_unit':'sum'})
-        s['roi'] = s['profit_actual'] / s['wager_unit']
-        
-        plt.figure(figsize=(8, 4), facecolor=COLORS['void'])
-        ax = plt.gca()
-        ax.set_facecolor(COLORS['void'])
-        for spine in ax.spines.values(): spine.set_visible(False)
-        ax.grid(True, axis='y', linestyle=':', color='#222222', alpha=0.3)
-        
-        colors = [color_pos if x > 0 else color_neg for x in s['roi']]
-        sns.barplot(x=s.index, y=s['roi'], palette=colors)
-        
-        plt.title(title, color='white', pad=20, fontname='monospace', fontweight='bold')
-        plt.xticks(color=COLORS['text'])
-        plt.yticks(color=COLORS['text'])
-        plt.ylabel('ROI', color=COLORS['text'])
-        plt.xlabel('AI Confidence Level', color=COLORS['text'])
-        plt.tight_layout()
-        plt.savefig(filename, dpi=150, facecolor=COLORS['void'])
-        plt.savefig(f"docs/{filename}", dpi=150, facecolor=COLORS['void'])
-        plt.close()
-
-    plot_sizing(v1, "assets/pyrite_size.png", "V1 PYRITE ROI BY CONFIDENCE", COLORS['pyrite'])
-    plot_sizing(v2, "assets/diamond_size.png", "V2 DIAMOND ROI BY CONFIDENCE", COLORS['diamond'])
-    plot_sizing(v4, "assets/quartz_size.png", "V4 QUARTZ ROI BY CONFIDENCE", COLORS['quartz'], color_neg=COLORS['quartz_neg'])
+def draw_roi_bars(roi, title, color_pos, color_neg=None, xlabel='', rotation=None):
+    """ROI per category (league or confidence bin), one bar each."""
+    if color_neg is None: color_neg = COLORS['loss']
+    plt.figure(figsize=(8, 4), facecolor=COLORS['void'])
+    ax = plt.gca()
+    ax.set_facecolor(COLORS['void'])
+    for spine in ax.spines.values(): spine.set_visible(False)
+    ax.grid(True, axis='y', linestyle=':', color='#222222', alpha=0.3)
     
-    if not v3.empty:
-        v3_sports = v3.groupby('league_name')['profit_actual'].sum().sort_index()
-        plt.figure(figsize=(10, 5), facecolor=COLORS['void'])
-        ax = plt.gca()
-        ax.set_facecolor(COLORS['void'])
-        bar_colors = [COLORS['obsidian'] if x >= 0 else COLORS['loss'] for x in v3_sports.values]
-        ax.bar(v3_sports.index, v3_sports.values, color=bar_colors)
-        plt.title("OBSIDIAN // LIQUIDITY BY SPORT", color='white', fontweight='bold')
-        plt.savefig(f"docs/assets/obsidian_sport.png", facecolor=COLORS['void'])
-        plt.savefig(f"assets/obsidian_sport.png", facecolor=COLORS['void'])
-        plt.close()
-
-    v3_roi = (v3['profit_actual'].sum() / v3['wager_unit'].sum() * 100) if not v3.empty else 0
-    v2_roi = (v2['profit_actual'].sum() / v2['wager_unit'].sum() * 100) if not v2.empty else 0
-    v1_roi = (v1['profit_actual'].sum() / v1['wager_unit'].sum() * 100) if not v1.empty else 0
-
-    # Obsidian Algo Comparison
-    roi_data = {'V1 Pyrite': v1_roi if not v1.empty else 0, 
-                'V2 Diamond': v2_roi if not v2.empty else 0, 
-                'V3 Obsidian': v3_roi if not v3.empty else 0}
+    colors = [color_pos if x > 0 else color_neg for x in roi]
+    sns.barplot(x=roi.index, y=roi.values, palette=colors)
     
+    plt.title(title, color='white', pad=20, fontname='monospace', fontweight='bold')
+    plt.xticks(rotation=rotation, color=COLORS['text'])
+    plt.yticks(color=COLORS['text'])
+    plt.ylabel('ROI', color=COLORS['text'])
+    plt.xlabel(xlabel, color=COLORS['text'])
+    plt.tight_layout()
+
+def draw_obsidian_sport(v3_sports):
+    plt.figure(figsize=(10, 5), facecolor=COLORS['void'])
+    ax = plt.gca()
+    ax.set_facecolor(COLORS['void'])
+    bar_colors = [COLORS['obsidian'] if x >= 0 else COLORS['loss'] for x in v3_sports.values]
+    ax.bar(v3_sports.index, v3_sports.values, color=bar_colors)
+    plt.title("OBSIDIAN // LIQUIDITY BY SPORT", color='white', fontweight='bold')
+
+def draw_roi_comparison(roi_data):
     plt.figure(figsize=(10, 6), facecolor=COLORS['void'])
     ax = plt.gca()
     ax.set_facecolor(COLORS['void'])
@@ -378,17 +261,145 @@ def generate_live_assets(since_days=None):
     ax.set_axisbelow(True)
     plt.grid(visible=True, axis='y', color='#333333', linestyle='--', alpha=0.5)
     plt.grid(visible=False, axis='x')
+
+def json_safe(obj):
+    """NaN / inf -> None (JSON null) all the way down; browsers' JSON.parse rejects bare NaN."""
+    if isinstance(obj, dict): return {k: json_safe(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)): return [json_safe(v) for v in obj]
+    if isinstance(obj, float) and not np.isfinite(obj): return None
+    return obj
+
+@tracer.traced('assets')
+def generate_live_assets(since_days=None, context=None):
+    """Render the dashboard plots and inject page data.
+
+    context: the caller's RunContext (synced picks + model ledgers). Without one, picks are
+    fetched from Supabase and results come from the results store (data/results) or a fresh simulation.
+    """
+    # Ensure current directory for file writing
+    if os.path.basename(os.getcwd()) == 'scripts':
+        os.chdir('..')
+
+    if context is not None:
+        print("🚀 Generating Live Assets from the current run...")
+        raw_df = context.raw
+    else:
+        print("🚀 Generating Live Assets from Supabase...")
+        pipeline = SportsDataPipeline()
+        raw_df = pipeline.fetch_data(since_days=since_days)
+    if raw_df.empty:
+        print("❌ No data found.")
+        return
+
+    # --- CENTRALIZED DATA LOADING ---
+    names = ('pyrite', 'diamond', 'obsidian', 'quartz')
+    if context is not None:
+        # Copies: the edge backfill below must not leak into the shared ledgers
+        v1, v2, v3, v4 = (context.models.get(name, pd.DataFrame()).copy() for name in names)
+    else:
+        store = ResultsStore()
+        print(f"📦 Loading stored simulation results from {store.root}...")
+        stored = store.read_all(names)
+        if stored is not None:
+            v1, v2, v3, v4 = (stored[name] for name in names)
+            print("✅ Results loaded successfully.")
+        else:
+            print("⚠️ Stored results missing or stale (schema or model artifacts changed). Falling back to live simulation.")
+            v1, v2, v3, v4 = None, None, None, None
+
+    if v1 is None or v1.empty: # Fallback if cache missing or failed
+        if context is not None and context.has('features'):
+            df = context.features
+        else:
+            eng = FeatureEngineer(raw_df)
+            df = eng.process()
+        sim = ModelSimulator(df)
+        v1 = sim.run_v1_pyrite()
+        v2 = sim.run_v2_diamond()
+        v3 = sim.run_v3_obsidian()
+        v4 = sim.run_v4_quartz()
+
+    # Ensure edge calculations are consistent
+    if not v1.empty and 'edge' not in v1.columns: v1['edge'] = v1['prob'] - v1['implied_prob']
+    if not v4.empty and 'edge' not in v4.columns: v4['edge'] = (v4['prob'] if 'prob' in v4.columns else 0.5) - (v4['implied_prob'] if 'implied_prob' in v4.columns else 0.5)
     
-    plt.savefig("assets/obsidian_comparison.png", bbox_inches='tight', facecolor=COLORS['void'])
-    plt.savefig("docs/assets/obsidian_comparison.png", bbox_inches='tight', facecolor=COLORS['void'])
-    plt.close()
+    # --- 1. PLOTS ---
+    # cumulative profit
+    def get_cum(d):
+        if d.empty: return pd.DataFrame({'pick_date':[], 'profit':[]})
+        
+        # Raw Sequential Profit (Institutional Best Practice)
+        d = d.sort_values('pick_date').copy()
+        d['profit'] = d['profit_actual'].cumsum()
+        
+        # Zero-Origin sync
+        min_date = d['pick_date'].min()
+        if pd.isna(min_date): return pd.DataFrame({'pick_date':[], 'profit':[]})
+        
+        start_node = pd.DataFrame({'pick_date': [min_date - pd.Timedelta(seconds=1)], 'profit': [0.0]})
+        return pd.concat([start_node, d[['pick_date', 'profit']]]).sort_values('pick_date')
+
+    def sport_roi(data):
+        s = data.groupby('league_name').agg({'profit_actual':'sum', 'wager_unit':'sum'})
+        return (s['profit_actual'] / s['wager_unit']).sort_values(ascending=False)
+
+    def sizing_roi(data):
+        # Bin by confidence
+        conf_bin = pd.cut(data['prob'], bins=[0.5, 0.55, 0.6, 0.65, 0.7, 1.0], labels=['50-55%', '55-60%', '60-65%', '65-70%', '70%+'])
+        s = data.groupby(conf_bin).agg({'profit_actual':'sum', 'wager_unit':'sum'})
+        return s['profit_actual'] / s['wager_unit']
+
+    d1, d2, d3, d4 = get_cum(v1), get_cum(v2), get_cum(v3), get_cum(v4)
+    figures = [
+        FigureSpec('performance_curve', draw_performance_curve, {'curves': [d1, d2, d3, d4]},
+                   ["docs/assets/obsidian_curve.png", "docs/assets/quarry_performance.png", "docs/assets/live_curve.png"], # obsidian_curve: Legacy
+                   bbox_inches='tight', dpi=300),
+        FigureSpec('pyrite_live_curve', draw_pyrite_curve, {'d1': d1},
+                   ["assets/pyrite_live_curve.png", "docs/assets/pyrite_live_curve.png"], bbox_inches='tight', dpi=300),
+    ]
+    for name, data, title, color_pos, color_neg in [
+        ('pyrite', v1, "V1 PYRITE", COLORS['pyrite'], None),
+        ('diamond', v2, "V2 DIAMOND", COLORS['diamond'], None),
+        ('quartz', v4, "V4 QUARTZ", COLORS['quartz'], COLORS['quartz_neg']),
+    ]:
+        if data.empty: continue
+        figures.append(FigureSpec(f'{name}_sport', draw_roi_bars,
+                                  {'roi': sport_roi(data), 'title': f"{title} ROI BY SPORT", 'color_pos': color_pos, 'color_neg': color_neg, 'rotation': 45},
+                                  [f"assets/{name}_sport.png", f"docs/assets/{name}_sport.png"], dpi=150, facecolor=COLORS['void']))
+        # Bet Sizing / Confidence Calibration
+        figures.append(FigureSpec(f'{name}_size', draw_roi_bars,
+                                  {'roi': sizing_roi(data), 'title': f"{title} ROI BY CONFIDENCE", 'color_pos': color_pos, 'color_neg': color_neg, 'xlabel': 'AI Confidence Level'},
+                                  [f"assets/{name}_size.png", f"docs/assets/{name}_size.png"], dpi=150, facecolor=COLORS['void']))
+    
+    if not v3.empty:
+        figures.append(FigureSpec('obsidian_sport', draw_obsidian_sport, {'v3_sports': v3.groupby('league_name')['profit_actual'].sum().sort_index()},
+                                  ["docs/assets/obsidian_sport.png", "assets/obsidian_sport.png"], facecolor=COLORS['void']))
+
+    # Every headline number below comes from this one aggregation over all ledgers
+    summary = summarize({'pyrite': v1, 'diamond': v2, 'obsidian': v3, 'quartz': v4})
+
+    # Obsidian Algo Comparison
+    roi_data = {'V1 Pyrite': summary.loc['pyrite', 'roi'],
+                'V2 Diamond': summary.loc['diamond', 'roi'],
+                'V3 Obsidian': summary.loc['obsidian', 'roi']}
+    figures.append(FigureSpec('obsidian_comparison', draw_roi_comparison, {'roi_data': {k: float(v) for k, v in roi_data.items()}},
+                              ["assets/obsidian_comparison.png", "docs/assets/obsidian_comparison.png"], bbox_inches='tight', facecolor=COLORS['void']))
+
+    # Each figure is drawn once (in parallel) and skipped when its series did not change
+    render_figures(figures)
+
+    # Downsampled equity / daily PnL series for interactive charts (docs/<model>_series.json.gz)
+    with tracer.span('series'):
+        for path in export_series({'pyrite': v1, 'diamond': v2, 'obsidian': v3, 'quartz': v4}).values():
+            print(f"✅ Series saved: {path}")
 
     # --- 2. DATA INJECTION ---
     
     # helper to get daily stats for a specific model
-    def get_yesterday_stats(model_df, sort_mode='obsidian'):
+    def get_yesterday_stats(model_df, name, sort_mode='obsidian'):
         if model_df.empty: return None
-        latest_date = model_df['pick_date'].max()
+        m = summary.loc[name]
+        latest_date = m['y_date']
         day = model_df[model_df['pick_date'] == latest_date].copy()
         
         if sort_mode == 'obsidian':
@@ -403,13 +414,12 @@ def generate_live_assets(since_days=None):
         else:
             day_sorted = day
         
-        w, l, p = len(day[day['outcome']==1]), len(day[day['outcome']==0]), len(day[day['outcome']==0.5])
         return {
             "date": latest_date.strftime('%b %d, %Y'),
-            "record": f"{w}-{l}-{p}",
-            "winrate": round((w / (w+l) * 100) if (w+l)>0 else 0, 1),
-            "roi": round((day['profit_actual'].sum() / day['wager_unit'].sum() * 100) if day['wager_unit'].sum()>0 else 0, 1),
-            "net": round(day['profit_actual'].sum(), 2),
+            "record": m['y_record'],
+            "winrate": round(float(m['y_win_rate']), 1),
+            "roi": round(float(m['y_roi']), 1),
+            "net": round(float(m['y_net']), 2),
             "history": [
                 {
                     "date": r['pick_date'].strftime('%m/%d'),
@@ -427,31 +437,18 @@ def generate_live_assets(since_days=None):
         }
 
     
-    v3_yesterday = get_yesterday_stats(v3)    # --- INSTITUTIONAL STATS SYNC ---
-    def get_stats(df):
-        if df.empty: return {"roi": 0, "net": 0, "record": "0-0-0", "win_rate": 0, "sample": 0}
-        settled = df[df['outcome'].isin([0.0, 1.0])].copy()
-        if settled.empty: return {"roi": 0, "net": 0, "record": "0-0-0", "win_rate": 0, "sample": 1} # sample is total bets
-        
-        net = settled['profit_actual'].sum()
-        wager = settled['wager_unit'].sum()
-        roi = (net / wager * 100) if wager > 0 else 0
-        
-        wins = len(settled[settled['outcome'] == 1])
-        losses = len(settled[settled['outcome'] == 0])
-        pushes = len(df[df['outcome'] == 0.5])
-        
-        wr = (wins / len(settled) * 100) if len(settled) > 0 else 0
-        
+    v3_yesterday = get_yesterday_stats(v3, 'obsidian')    # --- INSTITUTIONAL STATS SYNC ---
+    def get_stats(name):
+        m = summary.loc[name]
         return {
-            "roi": round(roi, 1),
-            "net": round(net, 2),
-            "record": f"{wins}-{losses}-{pushes}",
-            "win_rate": round(wr, 1),
-            "sample": len(df)
+            "roi": round(float(m['roi']), 1),
+            "net": round(float(m['net']), 2),
+            "record": m['record'],
+            "win_rate": round(float(m['win_rate']), 1),
+            "sample": int(m['bets'])  # sample is total bets
         }
 
-    v3_stats = get_stats(v3)
+    v3_stats = get_stats('obsidian')
     obsidian_data = {
         "meta": {"last_update": pd.Timestamp.now().strftime('%Y-%m-%d %H:%M UTC'), "status": "ADVANCED"},
         "stats": {
@@ -462,8 +459,8 @@ def generate_live_assets(since_days=None):
             "sample": v3_stats['sample']
         },
         "benchmarks": {
-            "v1_roi": round((v1['profit_actual'].sum() / v1['wager_unit'].sum() * 100) if not v1.empty else 0, 1),
-            "v2_roi": round((v2['profit_actual'].sum() / v2['wager_unit'].sum() * 100) if not v2.empty else 0, 1)
+            "v1_roi": round(float(summary.loc['pyrite', 'roi']), 1),
+            "v2_roi": round(float(summary.loc['diamond', 'roi']), 1)
         },
         "yesterday": {
             "record": v3_yesterday['record'] if v3_yesterday else "0-0-0",
@@ -475,29 +472,21 @@ def generate_live_assets(since_days=None):
         "history": v3_yesterday['history'] if v3_yesterday else []
     }
     
-    # Injection helper
-    def inject_json(html_path, data_object):
-        if not os.path.exists(html_path): return
-        with open(html_path, 'r') as f: content = f.read()
-        
-        # More robust regex handling optional whitespace around the equals sign
-        pattern = r'const DATA\s*=\s*\{.*?\};'
-        
-        if not re.search(pattern, content, flags=re.DOTALL):
-             print(f"❌ Failed to find DATA block in {html_path}")
-             return
-
-        replacement = f'const DATA = {json.dumps(data_object, indent=12)};'
-        new_content = re.sub(pattern, replacement, content, flags=re.DOTALL)
-        
-        with open(html_path, 'w') as f: f.write(new_content)
-        print(f"✅ Injected data into {html_path}")
-
-    inject_json('docs/obsidian.html', obsidian_data)
+    # Data binding: each page fetches its payload from docs/data/<page>.json on load
+    @tracer.traced('page_data')
+    def write_page_data(page, data_object):
+        path = os.path.join('docs', 'data', f'{page}.json')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f: json.dump(json_safe(data_object), f, separators=(',', ':'), allow_nan=False)
+        os.replace(tmp, path)
+        print(f"✅ Page data written to {path}")
+
+    write_page_data('obsidian', obsidian_data)
     
     # Diamond (V2)
-    v2_yesterday = get_yesterday_stats(v2, sort_mode='diamond')
-    v2_stats = get_stats(v2)
+    v2_yesterday = get_yesterday_stats(v2, 'diamond', sort_mode='diamond')
+    v2_stats = get_stats('diamond')
     diamond_page_data = {
         "meta": {"last_update": pd.Timestamp.now().strftime('%Y-%m-%d %H:%M UTC'), "status": "NOMINAL"},
         "stats": {
@@ -507,8 +496,8 @@ def generate_live_assets(since_days=None):
             "win_rate": v2_stats['win_rate']
         },
         "volume": {
-            "v1_avg": round(len(v1) / v1['pick_date'].nunique() if not v1.empty else 0, 1),
-            "v2_avg": round(len(v2) / v2['pick_date'].nunique() if not v2.empty else 0, 1),
+            "v1_avg": round(float(summary.loc['pyrite', 'bets_per_active_day']), 1),
+            "v2_avg": round(float(summary.loc['diamond', 'bets_per_active_day']), 1),
             "v1_label": "High", "v2_label": "Medium"
         },
         "yesterday": {
@@ -520,11 +509,11 @@ def generate_live_assets(since_days=None):
         },
         "history": v2_yesterday['history'] if v2_yesterday else []
     }
-    inject_json('docs/diamond.html', diamond_page_data)
+    write_page_data('diamond', diamond_page_data)
 
     # Pyrite (V1)
-    v1_yesterday = get_yesterday_stats(v1, sort_mode='diamond') # Use profit sort for Pyrite too
-    v1_stats = get_stats(v1)
+    v1_yesterday = get_yesterday_stats(v1, 'pyrite', sort_mode='diamond') # Use profit sort for Pyrite too
+    v1_stats = get_stats('pyrite')
     pyrite_page_data = {
         "meta": {"last_update": pd.Timestamp.now().strftime('%Y-%m-%d %H:%M UTC'), "status": "LEGACY"},
         "stats": {
@@ -534,7 +523,7 @@ def generate_live_assets(since_days=None):
             "win_rate": v1_stats['win_rate']
         },
         "volume": {
-            "v1_avg": round(len(v1) / v1['pick_date'].nunique() if not v1.empty else 0, 1),
+            "v1_avg": round(float(summary.loc['pyrite', 'bets_per_active_day']), 1),
             "v2_avg": 0, # Not needed for Pyrite solo page but keeping structure
             "v1_label": "High", "v2_label": "Medium"
         },
@@ -547,11 +536,11 @@ def generate_live_assets(since_days=None):
         },
         "history": v1_yesterday['history'] if v1_yesterday else []
     }
-    inject_json('docs/pyrite.html', pyrite_page_data)
+    write_page_data('pyrite', pyrite_page_data)
 
     # Quartz (V4)
-    v4_yesterday = get_yesterday_stats(v4, sort_mode='diamond')
-    v4_stats = get_stats(v4)
+    v4_yesterday = get_yesterday_stats(v4, 'quartz', sort_mode='diamond')
+    v4_stats = get_stats('quartz')
     quartz_page_data = {
         "meta": {"last_update": pd.Timestamp.now().strftime('%Y-%m-%d %H:%M UTC'), "status": "FLAGSHIP"},
         "stats": {
@@ -562,7 +551,7 @@ def generate_live_assets(since_days=None):
             "sample": v4_stats['sample']
         },
         "volume": {
-            "v4_avg": round(len(v4) / v4['pick_date'].nunique() if not v4.empty else 0, 1),
+            "v4_avg": round(float(summary.loc['quartz', 'bets_per_active_day']), 1),
             "v4_label": "High"
         },
         "yesterday": {
@@ -574,7 +563,7 @@ def generate_live_assets(since_days=None):
         },
         "history": v4_yesterday['history'] if v4_yesterday else []
     }
-    inject_json('docs/quartz.html', quartz_page_data)
+    write_page_data('quartz', quartz_page_data)
 
     # Selector Page - Dynamic Risk Profiles
     def get_risk_profile(bets_per_day):
@@ -591,9 +580,12 @@ def generate_live_assets(since_days=None):
         }
     }
     
-    inject_json('docs/selector.html', selector_data)
+    write_page_data('selector', selector_data)
 
 if __name__ == "__main__":
+    # Ensure we are in the project root
+    if os.path.basename(os.getcwd()) == 'scripts':
+        os.chdir('..')
     generate_synthetic_assets()
     generate_live_assets()
     print("✨ Asset generation complete.")
@@ -0,0 +1,183 @@
+"""Quarry command line: one entry point for the daily pipeline, its stages and the research tools.
+
+    python scripts/quarry.py <command> [options]
+
+Importing this module has no side effects and pulls in the standard library only; each
+command imports the heavy libraries (pandas, supabase, xgboost, matplotlib, ...) it needs
+when it runs, so `stats` and `status` start instantly.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Research/training scripts the passthrough commands run as __main__ (their own flags apply)
+SCRIPTS = {
+    "train": os.path.join('src', 'v4_quantum_sniper.py'),
+    "tune": os.path.join('research', 'tune_v4.py'),
+    "backtest": os.path.join('research', 'run_walk_forward.py'),
+    "stress": os.path.join('research', 'monte_carlo_sim.py'),
+    "audit": os.path.join('research', 'audit_integrity.py'),
+    "calibrate": os.path.join('research', 'fit_calibration.py'),
+    "bench": os.path.join('research', 'benchmark_pipeline.py'),
+}
+
+def _setup():
+    """Repo root as working directory and src on the path (what every script expects)."""
+    os.chdir(BASE_DIR)
+    for p in (os.path.join(BASE_DIR, 'src'), BASE_DIR):
+        if p not in sys.path:
+            sys.path.append(p)
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+def _age(path):
+    if not os.path.exists(path): return "missing"
+    hours = (time.time() - os.path.getmtime(path)) / 3600
+    return f"{hours:.1f}h old, {os.path.getsize(path) / 1e6:.1f} MB"
+
+# --- quick commands (standard library only) ---
+
+def cmd_stats(args):
+    stats = _read_json(os.path.join(BASE_DIR, 'docs', 'stats.json'))
+    if not stats:
+        print("No docs/stats.json yet (run `quarry update` or `quarry report`).")
+        return 1
+    print(f"Last update: {stats.get('meta', {}).get('last_update', 'N/A')}")
+    print(f"{'MODEL':<10} {'ROI':>7} {'NET':>9} {'RECORD':>13} {'WIN%':>6} {'BETS/D':>7} {'MAX DD':>8}  YESTERDAY")
+    for name, m in stats.get('models', {}).items():
+        y, risk = m.get('yesterday', {}), m.get('risk') or {}
+        dd = f"{risk['max_drawdown']:.1f}u" if 'max_drawdown' in risk else '--'
+        print(f"{name:<10} {m.get('roi', 0):>6.1f}% {m.get('net', 0):>8.1f}u {m.get('record', '0-0-0'):>13} "
+              f"{m.get('win_rate', 0):>5.1f}% {m.get('bets_day', 0):>7.1f} {dd:>8}  "
+              f"{y.get('date', 'N/A')}: {y.get('record', '0-0-0')} ({y.get('net', 0):+.2f}u)")
+    return 0
+
+def cmd_status(args):
+    print(f"Picks cache:   {_age(os.path.join(BASE_DIR, 'data', 'picks_cache.parquet'))}")
+    print(f"Feature frame: {_age(os.path.join(BASE_DIR, 'data', 'build', 'features.parquet'))}")
+    ledger_root = os.path.join(BASE_DIR, 'data', 'ledgers')
+    names = sorted(os.listdir(ledger_root)) if os.path.isdir(ledger_root) else []
+    print("Ledgers:" + ("" if names else "       none"))
+    for name in names:
+        meta = _read_json(os.path.join(ledger_root, name, 'ledger_meta.json')) or {}
+        print(f"  {name:<10} watermark {meta.get('watermark')}, batch {meta.get('batch', 0)}, updated {meta.get('updated', 'N/A')}")
+    manifest = _read_json(os.path.join(BASE_DIR, 'data', 'build', 'stages.json')) or {}
+    print("Build stages:" + ("" if manifest else "  no manifest (next run rebuilds everything)"))
+    for stage, record in manifest.items():
+        print(f"  {stage:<10} last ran {record.get('updated', 'N/A')}")
+    return 0
+
+# --- pipeline commands (heavy imports happen here) ---
+
+def _picks(args):
+    from pipeline import SportsDataPipeline
+    pipeline = SportsDataPipeline()
+    return pipeline.fetch_data(since_days=args.since_days) if getattr(args, 'since_days', None) else pipeline.fetch_data_cached()
+
+def _ledgers():
+    from ledger import BetLedger
+    from runner import SIMULATIONS
+    return {name: BetLedger(name).load() for name in SIMULATIONS}
+
+def cmd_sync(args):
+    raw = _picks(args)
+    if raw.empty:
+        print("❌ No data found.")
+        return 1
+    print(f"✅ {len(raw)} picks, {raw['pick_date'].min()} → {raw['pick_date'].max()}")
+    return 0
+
+def cmd_features(args):
+    from scripts.daily_update import build_features, FEATURES_PATH
+    df = build_features(_picks(args), audit=not args.skip_audit)
+    print(f"✅ {len(df)} rows x {df.shape[1]} features written to {FEATURES_PATH}")
+    return 0
+
+def cmd_simulate(args):
+    from scripts.daily_update import build_features, update_model_ledgers
+    update_model_ledgers(build_features(_picks(args), audit=not args.skip_audit), full_rebuild=args.full)
+    return 0
+
+def cmd_report(args):
+    from scripts.daily_update import build_stats, write_stats, update_markdown_reports
+    models = _ledgers()
+    write_stats(build_stats(models), models)
+    update_markdown_reports(models)
+    return 0
+
+def cmd_assets(args):
+    from run_context import RunContext
+    import scripts.generate_assets as generate_assets
+    if args.synthetic:
+        generate_assets.generate_synthetic_assets()
+    generate_assets.generate_live_assets(context=RunContext(raw=lambda: _picks(args), models=_ledgers))
+    return 0
+
+def cmd_update(args):
+    from scripts.daily_update import run_daily_update
+    from instrumentation import tracer
+    if not args.no_profile:
+        tracer.enable()
+    run_daily_update(full_rebuild=args.full, audit=not args.skip_audit, force=args.force)
+    return 0
+
+def cmd_script(args):
+    import runpy
+    path = os.path.join(BASE_DIR, SCRIPTS[args.command])
+    sys.argv = [path] + [a for a in args.extra if a != '--']
+    runpy.run_path(path, run_name='__main__')
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='quarry', description="Quarry Intelligence pipeline and research tools")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('stats', help="Print the dashboard stats (docs/stats.json)").set_defaults(func=cmd_stats)
+    sub.add_parser('status', help="Picks cache, ledger and build-stage status").set_defaults(func=cmd_status)
+
+    p = sub.add_parser('sync', help="Sync picks from Supabase into the local cache")
+    p.add_argument('--since-days', type=int, default=None, help="Fetch only this many recent days (bypasses the cache)")
+    p.set_defaults(func=cmd_sync)
+    for name, func, text in [('features', cmd_features, "Engineer features (leakage-gated) into data/build"),
+                             ('simulate', cmd_simulate, "Update the model bet ledgers")]:
+        p = sub.add_parser(name, help=text)
+        p.add_argument('--since-days', type=int, default=None)
+        p.add_argument('--skip-audit', action='store_true', help="Skip the T-1 leakage gate")
+        if name == 'simulate':
+            p.add_argument('--full', action='store_true', help="Rebuild every model ledger from its release date")
+        p.set_defaults(func=func)
+    sub.add_parser('report', help="Write stats.json/stats.js, README.md and LATEST_ACTION.md from the ledgers").set_defaults(func=cmd_report)
+    p = sub.add_parser('assets', help="Render dashboard charts and page data from the ledgers")
+    p.add_argument('--synthetic', action='store_true', help="Also draw the methodology figures")
+    p.set_defaults(func=cmd_assets)
+    p = sub.add_parser('update', help="Run the full incremental daily pipeline")
+    p.add_argument('--full', action='store_true', help="Rebuild every model ledger from its release date")
+    p.add_argument('--force', action='store_true', help="Rerun every stage even when its inputs are unchanged")
+    p.add_argument('--skip-audit', action='store_true', help="Skip the T-1 leakage gate")
+    p.add_argument('--no-profile', action='store_true', help="Skip stage timing (docs/run_report.json)")
+    p.set_defaults(func=cmd_update)
+
+    for name, path in SCRIPTS.items():
+        # add_help=False: --help reaches the script itself
+        sub.add_parser(name, help=f"Run {path} (remaining arguments are passed through)", add_help=False).set_defaults(func=cmd_script)
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args, args.extra = parser.parse_known_args(argv)
+    if args.extra and args.func is not cmd_script:
+        parser.error(f"unrecognized arguments: {' '.join(args.extra)}")
+    _setup()
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
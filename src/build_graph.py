@@ -0,0 +1,157 @@
+import os
+import json
+import hashlib
+import importlib.metadata
+
+import pandas as pd
+
+try:
+    from instrumentation import tracer
+except ModuleNotFoundError:
+    from src.instrumentation import tracer
+
+BUILD_MANIFEST = os.path.join('data', 'build', 'stages.json')
+LIBRARIES = ['numpy', 'pandas', 'scikit-learn', 'xgboost', 'lightgbm', 'joblib']
+
+def file_digest(path):
+    """sha256 of a file's bytes (None when it does not exist)."""
+    if not os.path.exists(path): return None
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def frame_digest(df, dtypes=True):
+    """Content hash of a frame: column names, dtypes (optional) and row hashes (index ignored)."""
+    h = hashlib.sha256(json.dumps([[str(c), str(t) if dtypes else None] for c, t in df.dtypes.items()]).encode())
+    if len(df):
+        df = df.loc[:, ~df.columns.duplicated()]
+        h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+def partition_hashes(df, date_col='pick_date', key='id'):
+    """Content hash per monthly partition of a picks frame.
+
+    Rows are ordered by key and timestamps normalized to ns, so neither sync order nor a
+    parquet round trip (which may change dtypes, not values) reads as a data change.
+    """
+    if df.empty: return {}
+    df = df.copy(deep=False)
+    for c in df.columns[[pd.api.types.is_datetime64_any_dtype(t) for t in df.dtypes]]:
+        df[c] = df[c].dt.as_unit('ns')
+    month = pd.to_datetime(df[date_col]).dt.strftime('%Y-%m')
+    out = {}
+    for m, part in df.groupby(month.to_numpy(), sort=True):
+        out[str(m)] = frame_digest(part.sort_values(key, kind='stable') if key in part.columns else part, dtypes=False)
+    return out
+
+def library_versions(names=LIBRARIES):
+    out = {}
+    for name in names:
+        try:
+            out[name] = importlib.metadata.version(name)
+        except importlib.metadata.PackageNotFoundError:
+            out[name] = None
+    return out
+
+def _hash(obj):
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, default=str).encode()).hexdigest()
+
+class Stage:
+    """One step of an incremental build.
+
+    run(results) computes the stage's value from upstream values (results[name]). The
+    fingerprint covers the stage's code files, its inputs(results) (any JSON-able content:
+    digests, configs, flags) and the output digests of its deps, so a stage is skipped when
+    all of them match the last run and its declared output files are still intact; its value
+    is then rebuilt lazily with load() only if a downstream stage actually runs. digest(value)
+    defines what downstream stages see as this stage's output (default: the output files),
+    so a rerun that reproduces the same content does not cascade. always=True stages run
+    every time (e.g. the data sync) and only gate the stages after them.
+    """
+    def __init__(self, name, run, deps=(), code=(), inputs=None, outputs=(), load=None, digest=None, always=False):
+        self.name, self.run, self.deps = name, run, list(deps)
+        self.code, self.outputs = list(code), list(outputs)
+        self.inputs, self.load, self.digest, self.always = inputs, load, digest, always
+
+class _Results(dict):
+    """Stage values by name; skipped stages are loaded from their cached outputs on first access."""
+    def __init__(self, loaders):
+        super().__init__()
+        self.loaders = loaders
+
+    def __missing__(self, name):
+        load = self.loaders.get(name)
+        if load is None:
+            raise KeyError(f"Stage '{name}' was skipped and has no loader for its cached outputs")
+        self[name] = value = load()
+        return value
+
+class BuildGraph:
+    """Runs stages in declaration order (deps must come first), skipping unchanged ones.
+
+    Code and output paths are relative to root, so the manifest survives moving the checkout.
+    The manifest records, per stage: fingerprint, output file digests and output digest.
+    """
+    def __init__(self, stages, root='.', manifest_path=BUILD_MANIFEST, force=False):
+        self.stages = list(stages)
+        self.root = root
+        self.manifest_path = manifest_path
+        self.force = force
+        self.manifest = self._load_manifest()
+        self.results = _Results({s.name: s.load for s in self.stages if s.load})
+
+    def _digest(self, path):
+        return file_digest(os.path.join(self.root, path))
+
+    def _load_manifest(self):
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path) as f:
+                    return json.load(f)
+            except (OSError, json.JSONDecodeError):
+                pass
+        return {}
+
+    def _save_manifest(self):
+        os.makedirs(os.path.dirname(self.manifest_path) or '.', exist_ok=True)
+        tmp = self.manifest_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.manifest, f, indent=4)
+        os.replace(tmp, self.manifest_path)
+
+    def fingerprint(self, stage, results):
+        return _hash({
+            "code": {path: self._digest(path) for path in stage.code},
+            "inputs": stage.inputs(results) if stage.inputs else None,
+            "deps": {d: self.manifest.get(d, {}).get("output") for d in stage.deps},
+        })
+
+    def _outputs_intact(self, stage, record):
+        files = record.get("files", {})
+        # An output the stage legitimately did not write (recorded as None) must still be absent
+        return all(p in files and files[p] == self._digest(p) for p in stage.outputs)
+
+    def run(self):
+        """Execute the graph; returns (results, {stage name: 'ran' | 'skipped'})."""
+        results, status = self.results, {}
+        for stage in self.stages:
+            with tracer.span(f'stage:{stage.name}') as sp:
+                fp = None if stage.always else self.fingerprint(stage, results)
+                record = self.manifest.get(stage.name, {})
+                if not self.force and fp is not None and record.get("fingerprint") == fp and self._outputs_intact(stage, record):
+                    print(f"⏭️  {stage.name}: inputs unchanged, reusing cached outputs.")
+                    status[stage.name] = 'skipped'
+                    sp.set(skipped=True)
+                    continue
+                value = stage.run(results)
+                results[stage.name] = value
+                files = {p: self._digest(p) for p in stage.outputs}
+                output = stage.digest(value) if stage.digest else _hash(files)
+                self.manifest[stage.name] = {"fingerprint": fp, "files": files, "output": output,
+                                             "updated": pd.Timestamp.now(tz='UTC').strftime('%Y-%m-%d %H:%M UTC')}
+                # Persist after every stage, so a failure later on keeps the work already done
+                self._save_manifest()
+                status[stage.name] = 'ran'
+        return results, status
@@ -0,0 +1,99 @@
+import json
+import numpy as np
+
+GLOBAL = '__all__'
+PLATT_KNOTS = 128       # Knots (even in logit space) used to tabulate a Platt sigmoid
+
+class Calibrator:
+    """Piecewise-linear probability calibration stored as knot tables.
+
+    tables maps a league name (or GLOBAL) to (x, y) knots; rows whose league has no table of
+    its own use the GLOBAL one. Inputs outside a table's knots are clipped to its ends, like
+    IsotonicRegression(out_of_bounds='clip'). All tables are stacked on one axis (table t
+    occupies [2t, 2t + 1]) so a whole frame is calibrated with a single searchsorted pass.
+    """
+    def __init__(self, tables, method='isotonic', base_rate=None, meta=None):
+        self.tables = {k: (np.asarray(x, dtype=float), np.asarray(y, dtype=float)) for k, (x, y) in tables.items()}
+        self.method = method
+        self.base_rate = base_rate
+        self.meta = meta or {}
+        self.names = [GLOBAL] + sorted(k for k in self.tables if k != GLOBAL)
+        xs, ys, bounds = [], [], []
+        for t, name in enumerate(self.names):
+            x, y = self.tables[name]
+            if len(x) == 1:
+                x, y = np.r_[x, x + 1e-9], np.r_[y, y]
+            xs.append(x + 2 * t)
+            ys.append(y)
+            bounds.append(len(x))
+        self._x, self._y = np.concatenate(xs), np.concatenate(ys)
+        self._end = np.cumsum(bounds)
+        self._start = self._end - np.asarray(bounds)
+        self._lo = np.array([self.tables[n][0][0] for n in self.names])
+        self._hi = np.array([self.tables[n][0][-1] for n in self.names])
+
+    def table_index(self, leagues):
+        if leagues is None or len(self.names) == 1: return None
+        lookup = {name: t for t, name in enumerate(self.names)}
+        uniq, inv = np.unique(np.asarray(leagues, dtype=str), return_inverse=True)
+        return np.array([lookup.get(l, 0) for l in uniq], dtype=np.int64)[inv.ravel()]
+
+    def apply(self, raw, leagues=None):
+        """Calibrated probabilities for raw scores (leagues: per-row league names, optional)."""
+        raw = np.asarray(raw, dtype=float)
+        t = self.table_index(leagues)
+        if t is None: t = np.zeros(len(raw), dtype=np.int64)
+        q = np.clip(raw, self._lo[t], self._hi[t]) + 2 * t
+        i = np.clip(np.searchsorted(self._x, q, side='right'), self._start[t] + 1, self._end[t] - 1)
+        x0, x1, y0, y1 = self._x[i - 1], self._x[i], self._y[i - 1], self._y[i]
+        w = np.divide(q - x0, x1 - x0, out=np.zeros_like(q), where=x1 > x0)
+        return y0 + np.clip(w, 0.0, 1.0) * (y1 - y0)
+
+    # --- PERSISTENCE ---
+    def to_dict(self):
+        return {
+            "method": self.method, "base_rate": self.base_rate, **self.meta,
+            # Isotonic knots can sit closer than any fixed rounding of x; only y is rounded
+            "tables": {k: {"x": x.tolist(), "y": np.round(y, 6).tolist()} for k, (x, y) in self.tables.items()},
+        }
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            d = json.load(f)
+        tables = {k: (v["x"], v["y"]) for k, v in d.pop("tables").items()}
+        return cls(tables, method=d.pop("method", 'isotonic'), base_rate=d.pop("base_rate", None), meta=d)
+
+def _isotonic_table(raw, y):
+    from sklearn.isotonic import IsotonicRegression
+    iso = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds='clip').fit(raw, y)
+    return iso.X_thresholds_, iso.y_thresholds_
+
+def _platt_table(raw, y):
+    from sklearn.linear_model import LogisticRegression
+    p = np.clip(raw, 1e-6, 1 - 1e-6)
+    logit = np.log(p / (1 - p))
+    lr = LogisticRegression(C=1e6).fit(logit.reshape(-1, 1), y)
+    xl = np.linspace(logit.min(), logit.max(), PLATT_KNOTS)
+    return 1 / (1 + np.exp(-xl)), 1 / (1 + np.exp(-(lr.coef_[0, 0] * xl + lr.intercept_[0])))
+
+def fit_calibrator(raw, outcome, method='isotonic', leagues=None, min_league_rows=300, meta=None):
+    """Fit on out-of-sample (raw score, settled outcome) pairs; per-league tables where a league has enough rows."""
+    raw, outcome = np.asarray(raw, dtype=float), np.asarray(outcome, dtype=float)
+    ok = np.isfinite(raw) & np.isin(outcome, [0.0, 1.0])
+    raw, outcome = raw[ok], outcome[ok]
+    if len(raw) == 0 or len(np.unique(outcome)) < 2:
+        raise ValueError("Calibration needs settled out-of-sample rows with both outcomes")
+    fit = _isotonic_table if method == 'isotonic' else _platt_table
+    tables = {GLOBAL: fit(raw, outcome)}
+    if leagues is not None:
+        leagues = np.asarray(leagues)[ok]
+        for name in np.unique(leagues):
+            m = leagues == name
+            if m.sum() >= min_league_rows and len(np.unique(outcome[m])) == 2:
+                tables[str(name)] = fit(raw[m], outcome[m])
+    return Calibrator(tables, method=method, base_rate=float(outcome.mean()), meta={**(meta or {}), "rows": int(len(raw))})
@@ -0,0 +1,156 @@
+import os
+import io
+import sys
+import json
+import time
+import hashlib
+import inspect
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+try:
+    from instrumentation import tracer
+    from build_graph import file_digest, frame_digest
+except ModuleNotFoundError:
+    from src.instrumentation import tracer
+    from src.build_graph import file_digest, frame_digest
+
+CHART_MANIFEST = os.path.join('data', 'build', 'charts.json')
+CHART_STYLE = 'dark_background'     # House matplotlib style, applied around every render
+
+class FigureSpec:
+    """One chart: render(**data) draws a new matplotlib figure, which is saved once per run.
+
+    render must be a module-level function (workers look it up by reference) and data should
+    hold the plotted series only (already aggregated), since its content hash decides whether
+    the figure is redrawn. The PNG is encoded once and copied to every destination. style is
+    applied for both drawing and saving, so renderers do not set it themselves (None keeps
+    the current rcParams).
+    """
+    def __init__(self, name, render, data, destinations, style=CHART_STYLE, **savefig):
+        self.name, self.render, self.data = name, render, data
+        self.destinations = list(destinations)
+        self.style = style
+        self.savefig = savefig
+
+def _digest_value(v, h):
+    # The index is part of the content: series are plotted against it
+    if isinstance(v, (pd.DataFrame, pd.Series)):
+        h.update(frame_digest(v.to_frame(name=str(v.name)) if isinstance(v, pd.Series) else v).encode())
+        h.update(pd.util.hash_pandas_object(v.index).to_numpy().tobytes())
+    elif isinstance(v, np.ndarray):
+        h.update(str(v.dtype).encode() + np.ascontiguousarray(v).tobytes())
+    elif isinstance(v, (list, tuple)) and any(isinstance(x, (pd.DataFrame, pd.Series, np.ndarray)) for x in v):
+        for x in v:
+            _digest_value(x, h)
+    else:
+        h.update(json.dumps(v, sort_keys=True, default=str).encode())
+
+def spec_hash(spec):
+    """Content hash of a figure: its data, savefig options and the source of the module that draws it."""
+    import matplotlib
+    h = hashlib.sha256()
+    for key in sorted(spec.data):
+        h.update(key.encode())
+        _digest_value(spec.data[key], h)
+    h.update(json.dumps(spec.savefig, sort_keys=True, default=str).encode())
+    h.update(json.dumps(spec.style, default=str).encode())
+    h.update(f"{spec.render.__module__}.{spec.render.__qualname__}|{matplotlib.__version__}".encode())
+    source = inspect.getsourcefile(spec.render)
+    h.update(str(file_digest(source) if source else None).encode())
+    return h.hexdigest()
+
+def _init_worker(paths):
+    import matplotlib
+    matplotlib.use('Agg')
+    for p in paths:
+        if p not in sys.path:
+            sys.path.append(p)
+
+def render_png(spec):
+    """Draw one spec and encode it to PNG bytes; returns (name, png, wall_s)."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    t0 = time.perf_counter()
+    with plt.style.context(spec.style or []):
+        fig = spec.render(**spec.data) or plt.gcf()
+        buf = io.BytesIO()
+        fig.savefig(buf, format='png', **spec.savefig)
+    plt.close(fig)
+    return spec.name, buf.getvalue(), time.perf_counter() - t0
+
+class ChartRenderer:
+    """Renders figure specs, skipping those whose content hash matches the previous run.
+
+    Pending figures are drawn in a process pool (Agg backend) and each PNG is written to all
+    of its destinations. Falls back to in-process rendering for a single worker or figure,
+    or when the pool cannot be started.
+    """
+    def __init__(self, workers=None, manifest_path=CHART_MANIFEST, force=False):
+        self.workers = workers or os.cpu_count() or 1
+        self.manifest_path = manifest_path
+        self.force = force
+
+    def _load_manifest(self):
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path) as f:
+                    return json.load(f)
+            except (OSError, json.JSONDecodeError):
+                pass
+        return {}
+
+    def _save_manifest(self, manifest):
+        os.makedirs(os.path.dirname(self.manifest_path) or '.', exist_ok=True)
+        tmp = self.manifest_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f, indent=4)
+        os.replace(tmp, self.manifest_path)
+
+    def _up_to_date(self, spec, h, record):
+        return (not self.force and record.get("hash") == h
+                and all(file_digest(p) == record.get("png") for p in spec.destinations))
+
+    def _render(self, specs):
+        workers = max(1, min(self.workers, len(specs)))
+        if workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(list(sys.path),)) as pool:
+                    return list(pool.map(render_png, specs)), workers
+            except Exception as e:
+                print(f"⚠️ Parallel chart rendering unavailable ({e}). Falling back to sequential.")
+        return [render_png(spec) for spec in specs], 1
+
+    def render(self, specs):
+        """Bring every spec's destinations up to date; returns {name: 'rendered' | 'skipped'}."""
+        specs = list(specs)
+        with tracer.span('charts', rows_in=len(specs)) as sp:
+            manifest = self._load_manifest()
+            hashes = {s.name: spec_hash(s) for s in specs}
+            pending = [s for s in specs if not self._up_to_date(s, hashes[s.name], manifest.get(s.name, {}))]
+            status = {s.name: 'skipped' for s in specs}
+            runs, workers = self._render(pending) if pending else ([], 0)
+            by_name = {s.name: s for s in pending}
+            for name, png, wall in runs:
+                for path in by_name[name].destinations:
+                    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+                    with open(path, 'wb') as f:
+                        f.write(png)
+                    print(f"✅ Chart saved: {path}")
+                manifest[name] = {"hash": hashes[name], "png": hashlib.sha256(png).hexdigest(),
+                                  "destinations": by_name[name].destinations}
+                tracer.record(name, round(wall, 4))
+                status[name] = 'rendered'
+            self._save_manifest(manifest)
+            sp.rows_out = len(runs)
+            sp.set(skipped=len(specs) - len(runs), workers=workers)
+        if len(runs) < len(specs):
+            print(f"⏭️  {len(specs) - len(runs)} chart(s) unchanged since the last run.")
+        return status
+
+def render_figures(specs, workers=None, force=False):
+    """Convenience wrapper used by the asset generators."""
+    return ChartRenderer(workers=workers, force=force).render(specs)
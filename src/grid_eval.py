@@ -0,0 +1,165 @@
+import os
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+GRID_KEYS = ['min_edge', 'min_odds', 'min_exp', 'daily_cap', 'toxic_leagues']
+STATS = ['candidates', 'bets', 'days', 'profit', 'wins']
+
+def expand_grid(grid):
+    """Cartesian product in GRID_KEYS order (same order as itertools.product over the lists)."""
+    return list(itertools.product(*[grid[k] for k in GRID_KEYS]))
+
+# --- WORKER STATE (arrays shipped once per process) ---
+_ARRAYS = {}
+
+def _init_worker(arrays):
+    _ARRAYS.update(arrays)
+
+def _passing(h):
+    """Histogram over 'thresholds passed' (axis 0, 0..n_e) -> totals of rows passing threshold i."""
+    return np.cumsum(h[::-1], axis=0)[::-1][1:]
+
+def _evaluate_block(masks):
+    """Stats tables for a block of (min_odds, min_exp, toxic_idx) masks.
+
+    Rows are sorted by (day, edge desc), so edge >= e keeps a prefix of every day: a row's rank
+    among the day's mask rows is the same for every edge threshold and every cap. One pass per
+    mask therefore buckets rows by (thresholds passed, first cap that admits them); cumulative
+    sums over that 2-D histogram give every (min_edge, daily_cap) pair at once.
+    Returns {stat: array (len(masks), n_edges, n_caps)}.
+    """
+    a = _ARRAYS
+    n_e, n_c = len(a['edges']), len(a['caps'])
+    size = (n_e + 1) * (n_c + 1)
+    out = {k: np.zeros((len(masks), n_e, n_c)) for k in STATS}
+    for i, (min_odds, min_exp, toxic_idx) in enumerate(masks):
+        M = (a['odds'] >= min_odds) & (a['exp'] >= min_exp) & ~a['toxic'][:, int(toxic_idx)]
+        before = np.cumsum(M) - M
+        rank = (before - before[a['starts']][a['row_day']])[M]
+        e_bin = a['edge_bin'][M]
+        flat = e_bin * (n_c + 1) + np.searchsorted(a['caps'], rank, side='right')
+
+        # Pushes and pending bets carry outcome NaN: they count as bets but not wins (like Series.sum)
+        for stat, w in (('bets', None), ('profit', a['pnl'][M]), ('wins', np.nan_to_num(a['outcome'][M]))):
+            h = np.bincount(flat, weights=w, minlength=size).reshape(n_e + 1, n_c + 1)
+            out[stat][i] = np.cumsum(_passing(h), axis=1)[:, :n_c]
+        # A day trades iff its top-ranked candidate passes the edge threshold (and the cap is >= 1)
+        out['days'][i] = _passing(np.bincount(e_bin[rank == 0], minlength=n_e + 1))[:, None] * (a['caps'] > 0)
+        out['candidates'][i] = _passing(np.bincount(e_bin, minlength=n_e + 1))[:, None]
+    return out
+
+class GridEvaluator:
+    """Batched evaluator for top-N-per-day strategy grids.
+
+    Equivalent to, per config: filter on (edge, decimal_odds, capper_experience, league), sort
+    by (pick_date, edge desc), take head(daily_cap) per day and sum flat-1u PnL. The frame is
+    pre-filtered to rows any config could select and sorted once; the (min_odds, min_exp, toxic)
+    masks are then spread over worker processes, each covering all edge/cap pairs in one pass.
+    """
+    def __init__(self, df, toxic_options):
+        self.toxic_options = [list(t) for t in toxic_options]
+        self.df = df
+
+    def _arrays(self, grid):
+        df = self.df
+        keep = (df['edge'] >= min(grid['min_edge'])) & (df['decimal_odds'] >= min(grid['min_odds'])) & \
+               (df['capper_experience'] >= min(grid['min_exp']))
+        d = df.loc[keep, ['pick_date', 'edge', 'decimal_odds', 'capper_experience', 'league_name', 'outcome']]
+        # Stable (pick_date asc, edge desc): ties keep frame order, exactly like sort_values
+        day_codes = pd.factorize(d['pick_date'], sort=True)[0]
+        order = np.lexsort((-d['edge'].to_numpy(dtype=float), day_codes))
+        d, day_codes = d.iloc[order], day_codes[order]
+
+        starts = np.flatnonzero(np.r_[True, day_codes[1:] != day_codes[:-1]]) if len(d) else np.array([], dtype=np.int64)
+        row_day = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(d)]))
+        edges = np.array(sorted(set(grid['min_edge'])), dtype=float)
+        edge = d['edge'].to_numpy(dtype=float)
+        outcome = d['outcome'].to_numpy(dtype=float)
+        odds = d['decimal_odds'].to_numpy(dtype=float)
+        return {
+            'edges': edges,
+            'caps': np.array(sorted(set(grid['daily_cap'])), dtype=np.int64),
+            'edge_bin': np.searchsorted(edges, edge, side='right'),  # number of edge thresholds passed
+            'odds': odds,
+            'exp': d['capper_experience'].to_numpy(dtype=float),
+            'toxic': np.column_stack([d['league_name'].isin(t).to_numpy() for t in self.toxic_options]) if len(self.toxic_options) else np.zeros((len(d), 0), bool),
+            'outcome': outcome,
+            'pnl': np.where(outcome == 1, odds - 1, np.where(outcome == 0, -1.0, 0.0)),
+            'starts': starts,
+            'row_day': row_day,
+        }
+
+    def evaluate(self, grid, workers=None):
+        """Stats for every config in the grid, in grid order (configs without candidates are dropped, as in the loop)."""
+        combos = expand_grid(grid)
+        if not combos: return pd.DataFrame()
+        toxic_index = {tuple(t): i for i, t in enumerate(self.toxic_options)}
+        arrays = self._arrays(grid)
+
+        masks = list(dict.fromkeys((o, x, toxic_index[tuple(t)]) for _, o, x, _, t in combos))
+        workers = max(1, min(workers or os.cpu_count() or 1, len(masks)))
+        step = -(-len(masks) // workers)
+        blocks = [masks[i:i + step] for i in range(0, len(masks), step)]
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(arrays,)) as pool:
+                parts = list(pool.map(_evaluate_block, blocks))
+        else:
+            _init_worker(arrays)
+            parts = [_evaluate_block(b) for b in blocks]
+        _ARRAYS.clear()
+        tables = {k: np.concatenate([p[k] for p in parts]) for k in STATS}
+
+        # Gather each config's cell: (mask, edge threshold, cap)
+        mask_pos = {m: i for i, m in enumerate(masks)}
+        mi = np.array([mask_pos[(o, x, toxic_index[tuple(t)])] for _, o, x, _, t in combos])
+        ei = np.searchsorted(arrays['edges'], [c[0] for c in combos])
+        ci = np.searchsorted(arrays['caps'], [c[3] for c in combos])
+        stats = {k: v[mi, ei, ci] for k, v in tables.items()}
+
+        bets, days = stats['bets'].astype(np.int64), stats['days'].astype(np.int64)
+        res = pd.DataFrame({
+            'min_edge': [c[0] for c in combos],
+            'min_odds': [c[1] for c in combos],
+            'min_exp': [c[2] for c in combos],
+            'daily_cap': [c[3] for c in combos],
+            'toxic_count': [len(c[4]) for c in combos],
+            'bets': bets,
+            'days': days,
+            'avg_picks_day': np.divide(bets, days, out=np.zeros(len(bets)), where=days > 0),
+            'profit': stats['profit'],
+            'roi': np.divide(stats['profit'], bets, out=np.zeros(len(bets)), where=bets > 0) * 100,
+            'win_rate': np.divide(stats['wins'], bets, out=np.zeros(len(bets)), where=bets > 0),
+        })
+        return res[stats['candidates'] > 0].reset_index(drop=True)
+
+def evaluate_grid(df, grid, workers=None):
+    """Convenience wrapper: grid is {key: values} over GRID_KEYS (toxic_leagues holds lists)."""
+    return GridEvaluator(df, grid['toxic_leagues']).evaluate(grid, workers=workers)
+
+def reference_grid(df, grid):
+    """The per-config loop GridEvaluator replaces (filter, copy, sort, head per day); slow, kept for parity checks."""
+    results = []
+    for min_edge, min_odds, min_exp, daily_cap, toxic in expand_grid(grid):
+        cand = df[(df['edge'] >= min_edge) & (df['decimal_odds'] >= min_odds) &
+                  (df['capper_experience'] >= min_exp) & (~df['league_name'].isin(toxic))].copy()
+        if cand.empty: continue
+        cand = cand.sort_values(['pick_date', 'edge'], ascending=[True, False])
+        final = cand.groupby('pick_date', group_keys=False).head(daily_cap)
+        pnl = np.where(final['outcome'] == 1, final['decimal_odds'] - 1, np.where(final['outcome'] == 0, -1.0, 0))
+        bets, days = len(final), final['pick_date'].nunique()
+        results.append({'min_edge': min_edge, 'min_odds': min_odds, 'min_exp': min_exp, 'daily_cap': daily_cap,
+                        'toxic_count': len(toxic), 'bets': bets, 'days': days,
+                        'avg_picks_day': bets / days if days > 0 else 0, 'profit': pnl.sum(),
+                        'roi': (pnl.sum() / bets) * 100 if bets > 0 else 0,
+                        'win_rate': final['outcome'].sum() / bets if bets > 0 else 0})
+    return pd.DataFrame(results)
+
+def parity_gap(df, grid, workers=None):
+    """Largest absolute difference per stat between evaluate_grid and reference_grid (all 0 up to float noise)."""
+    fast, slow = evaluate_grid(df, grid, workers=workers), reference_grid(df, grid)
+    if len(fast) != len(slow): raise ValueError(f"config count differs: {len(fast)} batched vs {len(slow)} loop")
+    cols = [c for c in slow.columns if c != 'toxic_count']
+    return (fast[cols].astype(float) - slow[cols].astype(float)).abs().max()
@@ -0,0 +1,105 @@
+import numpy as np
+
+try:
+    import xgboost as xgb
+except ImportError:
+    xgb = None
+
+try:
+    import lightgbm as lgb
+except ImportError:
+    lgb = None
+
+class NativePredictor:
+    """Fast scoring path that bypasses sklearn's predict_proba wrapper.
+
+    Known estimators are unwrapped to their native boosters once:
+      - XGBClassifier  -> Booster.inplace_predict (float32, explicit nthread)
+      - LGBMClassifier -> Booster.predict (float64, explicit num_threads)
+      - soft VotingClassifier over the above -> weighted average of member votes
+    Anything else (pipelines, calibrated wrappers, hard voting) falls back to predict_proba.
+
+    LightGBM stores split thresholds as doubles, so feeding it float32 flips rows sitting
+    between float32(x) and x; it is scored on float64 to stay bit-identical to predict_proba.
+
+    Boosters score positional arrays, so DataFrame inputs are checked against the training
+    feature names first (as predict_proba does): reordered when the columns are merely in
+    another order, rejected when a feature is missing.
+    """
+    NATIVE_DTYPES = {'xgb': np.float32, 'lgb': np.float64}
+
+    def __init__(self, model, n_threads=None):
+        self.model = model
+        self.n_threads = n_threads if n_threads and n_threads > 0 else None
+        self.members, self.weights = self._unwrap(model)
+        self.feature_names = self._feature_names(model) if self.members is not None else None
+
+    # --- UNWRAPPING ---
+    def _native_member(self, est):
+        if xgb is not None and isinstance(est, xgb.XGBClassifier) and getattr(est, 'n_classes_', 2) == 2:
+            booster = est.get_booster()
+            if self.n_threads: booster.set_param({'nthread': self.n_threads})
+            best = getattr(est, 'best_iteration', None)
+            return ('xgb', booster, (0, best + 1) if best is not None else (0, 0))
+        if lgb is not None and isinstance(est, lgb.LGBMClassifier) and getattr(est, 'n_classes_', 2) == 2:
+            return ('lgb', est.booster_, None)
+        return None
+
+    def _unwrap(self, model):
+        if getattr(model, 'voting', None) == 'soft' and hasattr(model, 'estimators_'):
+            members = [self._native_member(est) for est in model.estimators_]
+            if all(m is not None for m in members):
+                weights = getattr(model, 'weights', None)
+                return members, (np.asarray(weights, dtype=float) if weights is not None else None)
+            return None, None
+        member = self._native_member(model)
+        return ([member], None) if member is not None else (None, None)
+
+    def _feature_names(self, model):
+        """Training feature order: sklearn's feature_names_in_, else the boosters' own names."""
+        names = getattr(model, 'feature_names_in_', None)
+        if names is not None: return [str(n) for n in names]
+        for kind, booster, _ in self.members:
+            names = booster.feature_names if kind == 'xgb' else booster.feature_name()
+            # LightGBM names anonymous (array-trained) columns Column_<i>
+            if names and not all(n == f'Column_{i}' for i, n in enumerate(names)):
+                return [str(n) for n in names]
+        return None
+
+    def _align(self, X):
+        if self.feature_names is None or not hasattr(X, 'columns'): return X
+        columns = list(X.columns)
+        if columns == self.feature_names: return X
+        missing = [f for f in self.feature_names if f not in columns]
+        if missing:
+            raise ValueError(f"Features missing from the scoring frame: {missing}")
+        return X[self.feature_names]
+
+    @property
+    def is_native(self):
+        return self.members is not None
+
+    # --- SCORING ---
+    def _score_member(self, member, arrays):
+        kind, booster, iteration_range = member
+        X = arrays[kind]
+        if kind == 'xgb':
+            p = booster.inplace_predict(X, iteration_range=iteration_range, predict_type='value')
+        else:
+            p = booster.predict(X, num_threads=self.n_threads or 0)
+        return np.asarray(p).reshape(len(X), -1)[:, -1]
+
+    def predict_positive(self, X):
+        """Positive-class probability as a 1-D array."""
+        if not self.is_native:
+            return self.model.predict_proba(X)[:, 1]
+        X = np.asarray(self._align(X))
+        # One contiguous copy per dtype actually needed by the members
+        arrays = {kind: np.ascontiguousarray(X, dtype=self.NATIVE_DTYPES[kind]) for kind in {m[0] for m in self.members}}
+        votes = np.column_stack([self._score_member(m, arrays) for m in self.members])
+        return np.average(votes, axis=1, weights=self.weights)
+
+    def predict_proba(self, X):
+        """Drop-in replacement for estimator.predict_proba (binary)."""
+        p = self.predict_positive(X)
+        return np.column_stack([1.0 - p, p])
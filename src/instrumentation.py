@@ -0,0 +1,273 @@
+import os
+import sys
+import json
+import time
+import functools
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+HISTORY_LIMIT = 90          # Runs kept in run_history.json
+REGRESSION_FACTOR = 1.5     # Stage flagged when slower than this x its recent median...
+REGRESSION_MIN_SECONDS = 1.0  # ...and at least this many seconds slower
+
+def _current_rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except (OSError, ValueError, AttributeError):
+        try:
+            import psutil
+            return psutil.Process().memory_info().rss / 1e6
+        except ImportError:
+            return None
+
+def _peak_rss_mb(who=None):
+    """Process high-water RSS (ru_maxrss is KB on Linux, bytes on macOS)."""
+    if resource is None: return None
+    peak = resource.getrusage(who if who is not None else resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
+
+class RssSampler:
+    """Peak RSS over a block, polled from a background thread.
+
+    ru_maxrss is a process-lifetime high-water mark, so it cannot attribute a peak to one
+    stage once an earlier stage went higher; sampling every `interval` seconds can.
+    on_sample(rss_mb), when given, sees every sample (the tracer feeds its open spans).
+    """
+    def __init__(self, interval=0.01, on_sample=None):
+        self.interval = interval
+        self.on_sample = on_sample
+        self.start_mb = self.end_mb = self.peak_mb = None
+
+    def _poll(self):
+        while not self._done.wait(self.interval):
+            rss = _current_rss_mb()
+            if rss is None: continue
+            self.peak_mb = max(self.peak_mb, rss)
+            if self.on_sample is not None:
+                self.on_sample(rss)
+
+    def __enter__(self):
+        import threading
+        self.start_mb = self.peak_mb = _current_rss_mb() or 0.0
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._poll, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._done.set()
+        self._thread.join()
+        self.end_mb = _current_rss_mb() or 0.0
+        self.peak_mb = max(self.peak_mb, self.end_mb)
+        return False
+
+class Span:
+    """One timed stage. Set rows_in / rows_out (or any extra attrs via .set()) inside the block."""
+    __slots__ = ('name', 'rows_in', 'rows_out', 'attrs', 'children', 'wall_s', 'cpu_s',
+                 'rss_start_mb', 'rss_end_mb', 'peak_rss_mb', '_t0', '_c0')
+
+    def __init__(self, name, rows_in=None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.attrs = {}
+        self.children = []
+        self.wall_s = self.cpu_s = None
+        self.rss_start_mb = self.rss_end_mb = self.peak_rss_mb = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+        return self
+
+    def to_dict(self):
+        d = {"name": self.name, "wall_s": self.wall_s, "cpu_s": self.cpu_s,
+             "rows_in": self.rows_in, "rows_out": self.rows_out,
+             "rss_start_mb": self.rss_start_mb, "rss_end_mb": self.rss_end_mb, "peak_rss_mb": self.peak_rss_mb}
+        d = {k: v for k, v in d.items() if v is not None}
+        if self.attrs: d["attrs"] = self.attrs
+        if self.children: d["children"] = [c.to_dict() for c in self.children]
+        return d
+
+class _NullSpan:
+    """Shared no-op span returned while tracing is disabled."""
+    __slots__ = ()
+    rows_in = rows_out = None
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+    def __setattr__(self, key, value): pass
+    def set(self, **attrs): return self
+
+_NULL_SPAN = _NullSpan()
+
+class _ActiveSpan:
+    __slots__ = ('tracer', 'span')
+
+    def __init__(self, tracer, span):
+        self.tracer, self.span = tracer, span
+
+    def __enter__(self):
+        sp = self.span
+        parent = self.tracer._stack[-1] if self.tracer._stack else None
+        (parent.children if parent else self.tracer.roots).append(sp)
+        self.tracer._stack.append(sp)
+        sp.rss_start_mb = sp.peak_rss_mb = _current_rss_mb()
+        if sp.rss_start_mb is not None and self.tracer._sampler is None:
+            # One sampler while any span is open; each sample raises the peak of every open span
+            self.tracer._sampler = RssSampler(on_sample=self.tracer._on_rss).__enter__()
+        sp._c0, sp._t0 = time.process_time(), time.perf_counter()
+        return sp
+
+    def __exit__(self, *exc):
+        sp = self.span
+        sp.wall_s = round(time.perf_counter() - sp._t0, 4)
+        sp.cpu_s = round(time.process_time() - sp._c0, 4)
+        sp.rss_end_mb = _current_rss_mb()
+        if sp.rss_end_mb is not None:
+            sp.peak_rss_mb = max(sp.peak_rss_mb or 0.0, sp.rss_end_mb)
+        self.tracer._stack.pop()
+        if sp.peak_rss_mb is not None:
+            self.tracer._on_rss(sp.peak_rss_mb)  # A parent's peak covers its children's
+        if not self.tracer._stack and self.tracer._sampler is not None:
+            self.tracer._sampler.__exit__(None, None, None)
+            self.tracer._sampler = None
+        return False
+
+class Tracer:
+    """Nested stage timer for the daily pipeline.
+
+    Disabled by default: span() then hands back a shared no-op object, so instrumented code
+    costs one attribute check per stage. Enable with tracer.enable() or QUARRY_PROFILE=1.
+    """
+    def __init__(self):
+        self.enabled = os.environ.get('QUARRY_PROFILE', '0') not in ('', '0', 'false')
+        self.reset()
+
+    def reset(self):
+        self.roots = []
+        self._stack = []
+        self._sampler = None
+        self.started = datetime.now(timezone.utc)
+
+    def enable(self):
+        self.enabled = True
+        return self
+
+    def disable(self):
+        self.enabled = False
+        return self
+
+    def _on_rss(self, rss):
+        for sp in list(self._stack):
+            if sp.peak_rss_mb is not None and rss > sp.peak_rss_mb:
+                sp.peak_rss_mb = rss
+
+    def span(self, name, rows_in=None):
+        if not self.enabled: return _NULL_SPAN
+        return _ActiveSpan(self, Span(name, rows_in))
+
+    def current(self):
+        """The innermost open span (a no-op span when disabled or outside any span)."""
+        return self._stack[-1] if self.enabled and self._stack else _NULL_SPAN
+
+    def traced(self, name=None):
+        """Decorator form; rows_out defaults to len(result) for frames, lists and arrays."""
+        def deco(fn):
+            label = name or fn.__qualname__
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled: return fn(*args, **kwargs)
+                with self.span(label) as sp:
+                    out = fn(*args, **kwargs)
+                    if sp.rows_out is None and hasattr(out, '__len__') and not isinstance(out, dict):
+                        sp.rows_out = len(out)
+                    return out
+            return wrapper
+        return deco
+
+    def record(self, name, wall_s, cpu_s=None, rows_out=None, **attrs):
+        """Attach an externally timed span (e.g. measured in a worker process) to the open span."""
+        if not self.enabled: return
+        sp = Span(name)
+        sp.wall_s, sp.cpu_s, sp.rows_out = wall_s, cpu_s, rows_out
+        sp.attrs.update(attrs)
+        (self._stack[-1].children if self._stack else self.roots).append(sp)
+
+    # --- REPORTING ---
+    def report(self):
+        return {
+            "started": self.started.strftime('%Y-%m-%d %H:%M:%S UTC'),
+            "total_wall_s": round(sum(s.wall_s or 0 for s in self.roots), 3),
+            # Whole-run high-water marks (per-stage peaks are sampled, see RssSampler)
+            "peak_rss_mb": _peak_rss_mb(),
+            "peak_rss_children_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None,
+            "stages": [s.to_dict() for s in self.roots],
+        }
+
+    @staticmethod
+    def _flatten(stages, prefix='', flat=None):
+        """{'parent/child': wall_s}; repeated sibling names (one span per chart, per call) are summed."""
+        flat = {} if flat is None else flat
+        for s in stages:
+            key = f"{prefix}{s['name']}"
+            if s.get('wall_s') is not None: flat[key] = round(flat.get(key, 0.0) + s['wall_s'], 4)
+            Tracer._flatten(s.get('children', []), key + '/', flat)
+        return flat
+
+    def write_report(self, out_dir, report_name='run_report.json', history_name='run_history.json'):
+        """Write the latest run tree and append a flat summary to the rolling history.
+
+        Stages slower than REGRESSION_FACTOR x their median over previous runs are flagged.
+        """
+        if not self.enabled: return None
+        os.makedirs(out_dir, exist_ok=True)
+        report = self.report()
+        flat = self._flatten(report["stages"])
+
+        history_path = os.path.join(out_dir, history_name)
+        history = []
+        if os.path.exists(history_path):
+            try:
+                with open(history_path) as f:
+                    history = json.load(f)
+            except (OSError, ValueError):
+                history = []
+
+        regressions = []
+        for stage, wall in flat.items():
+            past = sorted(h["stages"][stage] for h in history if stage in h.get("stages", {}))
+            if len(past) < 3: continue
+            median = past[len(past) // 2]
+            if wall > median * REGRESSION_FACTOR and wall - median > REGRESSION_MIN_SECONDS:
+                regressions.append({"stage": stage, "wall_s": wall, "median_s": median})
+        report["regressions"] = regressions
+
+        history.append({"started": report["started"], "total_wall_s": report["total_wall_s"],
+                        "peak_rss_mb": report["peak_rss_mb"], "stages": flat})
+        with open(history_path, 'w') as f:
+            json.dump(history[-HISTORY_LIMIT:], f, indent=1)
+        with open(os.path.join(out_dir, report_name), 'w') as f:
+            json.dump(report, f, indent=2)
+        return report
+
+    def print_summary(self, report=None, max_depth=2):
+        if not self.enabled: return
+        report = report or self.report()
+        print("\n⏱️ STAGE TIMINGS:")
+        def walk(stages, depth):
+            for s in stages:
+                rows = f" rows {s.get('rows_in', '?')} -> {s.get('rows_out', '?')}" if ('rows_in' in s or 'rows_out' in s) else ""
+                peak = f" peak {s['peak_rss_mb']:.0f}MB" if s.get('peak_rss_mb') else ""
+                print(f"  {'  ' * depth}{s['name']:<{34 - 2 * depth}} {s.get('wall_s', 0):>8.2f}s{rows}{peak}")
+                if depth + 1 < max_depth: walk(s.get('children', []), depth + 1)
+        walk(report["stages"], 0)
+        for r in report.get("regressions", []):
+            print(f"  ⚠️ REGRESSION: {r['stage']} took {r['wall_s']:.1f}s (median {r['median_s']:.1f}s)")
+
+# Process-wide tracer shared by every module
+tracer = Tracer()
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from instrumentation import tracer
+except ModuleNotFoundError:
+    from src.instrumentation import tracer
+
+WINDOWS = {'7d': 7, '30d': 30}
+CONSENSUS_DAYS = 7
+ATOL, RTOL = 1e-6, 1e-6
+
+def decimal_odds(american):
+    """American -> decimal odds, vectorized (0/missing read as the standard -110 price, 1.91)."""
+    o = pd.to_numeric(pd.Series(american), errors='coerce').to_numpy(dtype=float)
+    with np.errstate(divide='ignore'):
+        dec = np.where(o > 0, o / 100 + 1, 100 / np.abs(o) + 1)
+    return np.where(np.isnan(o) | (o == 0), 1.91, dec)
+
+def window_sums(group, day, values, days):
+    """As-of trailing sums over rows sorted by (group, day), one row per (group, day).
+
+    For each row: sum of `values` columns over rows of the same group with day in
+    [day - days + 1, day], from cumulative sums and one searchsorted for the window start.
+    """
+    key = group * (1 << 32) + day
+    csum = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(values, axis=0)])
+    lo = np.searchsorted(key, group * (1 << 32) + day - days + 1, side='left')
+    return csum[np.arange(1, len(key) + 1)] - csum[lo]
+
+def window_std(group, day, x, days):
+    """Sample std of x over the same trailing windows as window_sums.
+
+    Two passes (mean, then squared deviations) over the window offsets: a window spans at most
+    `days` rows, and constant windows come out exactly 0 instead of power-sum round-off.
+    """
+    key = group * (1 << 32) + day
+    row = np.arange(len(key))
+    n = row - np.searchsorted(key, group * (1 << 32) + day - days + 1, side='left') + 1
+    mean, ss = np.zeros(len(key)), np.zeros(len(key))
+    span = int(n.max()) if len(key) else 0
+    for k in range(span):
+        m = n > k
+        mean[m] += x[row[m] - k]
+    mean /= np.maximum(n, 1)
+    for k in range(span):
+        m = n > k
+        ss[m] += (x[row[m] - k] - mean[m]) ** 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(n > 1, np.sqrt(ss / (n - 1)), np.nan)
+
+def _asof_previous_day(group, day, row_group, row_day):
+    """Index of each pick's latest (group, day <= D - 1) row, or -1 when the group has none yet."""
+    key = group * (1 << 32) + day
+    i = np.searchsorted(key, row_group * (1 << 32) + row_day - 1, side='right') - 1
+    safe = np.maximum(i, 0)
+    return np.where((len(key) > 0) & (i >= 0) & (group[safe] == row_group), i, -1)
+
+def expected_features(df):
+    """Independent recomputation of every lagged feature from raw pick columns.
+
+    Contract (what FeatureEngineer publishes): a capper's results are known the day after
+    they are played, so a pick on day D sees the capper's latest snapshot known by D: the
+    daily aggregates over [P - W + 1, P] for the capper's last active day P <= D - 1, carried
+    forward across idle days; before any snapshot the feature is the neutral 0. Consensus
+    is the mean play size of the same market (league, normalized pick) over its plays in the
+    7 days up to the market's last active day before D, published the same way.
+    """
+    res = df['result'].astype(str).str.lower().str.strip()
+    outcome = np.select([res.isin(['win', 'won']), res.isin(['loss', 'lost'])], [1.0, 0.0], default=np.nan)
+    unit = pd.to_numeric(df['unit'], errors='coerce').fillna(1.0).to_numpy(dtype=float)
+    profit = np.where(outcome == 1, unit * (decimal_odds(df['odds_american']) - 1), np.where(outcome == 0, -unit, 0.0))
+    day = (pd.to_datetime(df['pick_date']).dt.normalize().to_numpy().astype('datetime64[D]').astype(np.int64))
+    out = pd.DataFrame(index=df.index)
+
+    # Capper-days: wins, graded count and total profit per (capper, day)
+    capper = pd.Series(df['capper_id'])
+    valid = capper.notna().to_numpy()
+    c_code = np.full(len(df), -1, dtype=np.int64)
+    c_code[valid] = pd.factorize(capper[valid])[0]
+    cd_key, cd_inv = np.unique(c_code[valid] * (1 << 32) + day[valid], return_inverse=True)
+    n_cd = len(cd_key)
+    graded = ~np.isnan(outcome[valid])
+    wins = np.bincount(cd_inv, weights=np.where(graded, outcome[valid], 0.0), minlength=n_cd)
+    count = np.bincount(cd_inv, weights=graded.astype(float), minlength=n_cd)
+    pnl = np.bincount(cd_inv, weights=profit[valid], minlength=n_cd)
+    g, d = cd_key >> 32, cd_key & ((1 << 32) - 1)
+    prev = np.full(len(df), -1, dtype=np.int64)
+    prev[valid] = _asof_previous_day(g, d, c_code[valid], day[valid])
+    hit = prev >= 0
+
+    for s, days in WINDOWS.items():
+        w = window_sums(g, d, np.column_stack([wins, count, pnl]), days)
+        stats = {f'acc_{s}': w[:, 0] / (w[:, 1] + 1e-6), f'roi_{s}': w[:, 2], f'vol_{s}': window_std(g, d, pnl, days)}
+        for name, v in stats.items():
+            out[name] = np.where(hit, np.nan_to_num(v[np.maximum(prev, 0)], nan=0.0), 0.0)
+    out['capper_roi_std_30d'] = out['vol_30d']
+    out['capper_win_rate_30d'] = out['acc_30d']
+    out['raw_hotness'] = out['roi_7d']
+
+    # Market plays: (play size, 1) per (market, day)
+    m_code = pd.factorize(pd.MultiIndex.from_arrays([df['league_name'].astype(str), df['pick_norm'].astype(str)]))[0].astype(np.int64)
+    md_key, md_inv = np.unique(m_code * (1 << 32) + day, return_inverse=True)
+    size = np.bincount(md_inv, minlength=len(md_key)).astype(float)
+    mg, mday = md_key >> 32, md_key & ((1 << 32) - 1)
+    w = window_sums(mg, mday, np.column_stack([size, np.ones(len(md_key))]), CONSENSUS_DAYS)
+    mprev = _asof_previous_day(mg, mday, m_code, day)
+    out['v4_consensus_count_lag1'] = np.where(mprev >= 0, (w[:, 0] / w[:, 1])[np.maximum(mprev, 0)], 0.0)
+    return out
+
+def audit_features(df, atol=ATOL, rtol=RTOL):
+    """Compare every lagged feature in an engineered frame with expected_features.
+
+    Returns {"ok", "rows", "summary" (per-feature mismatch counts and max error), "mismatches"
+    (one row per mismatching pick and feature: id, capper_id, pick_date, feature, pipeline, expected)}.
+    """
+    with tracer.span('leakage_audit', rows_in=len(df)) as sp:
+        expected = expected_features(df)
+        rows, summary = [], []
+        for f in expected.columns:
+            if f not in df.columns:
+                summary.append({"feature": f, "mismatches": len(df), "max_abs_err": np.nan, "missing": True})
+                continue
+            got = pd.to_numeric(df[f], errors='coerce').to_numpy(dtype=float)
+            exp = expected[f].to_numpy(dtype=float)
+            bad = ~np.isclose(got, exp, atol=atol, rtol=rtol)
+            summary.append({"feature": f, "mismatches": int(bad.sum()),
+                            "max_abs_err": float(np.nanmax(np.abs(got - exp))) if len(df) else 0.0, "missing": False})
+            if bad.any():
+                idx = np.flatnonzero(bad)
+                rows.append(pd.DataFrame({
+                    'id': df['id'].to_numpy()[idx] if 'id' in df.columns else idx,
+                    'capper_id': df['capper_id'].to_numpy()[idx], 'pick_date': df['pick_date'].to_numpy()[idx],
+                    'feature': f, 'pipeline': got[idx], 'expected': exp[idx],
+                }))
+        mismatches = pd.concat(rows, ignore_index=True) if rows else \
+            pd.DataFrame(columns=['id', 'capper_id', 'pick_date', 'feature', 'pipeline', 'expected'])
+        sp.rows_out = len(mismatches)
+    summary = pd.DataFrame(summary)
+    return {"ok": mismatches.empty and not summary['missing'].any(), "rows": len(df), "summary": summary, "mismatches": mismatches}
@@ -0,0 +1,272 @@
+import os
+import json
+import glob
+import time
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+try:
+    from instrumentation import tracer
+    from risk import RiskAccumulator
+except ModuleNotFoundError:
+    from src.instrumentation import tracer
+    from src.risk import RiskAccumulator
+
+# Identity of a ledger row in the feature frame (Quartz bets are pooled plays, not picks)
+LEDGER_KEYS = {
+    "pyrite": ['id'],
+    "diamond": ['id'],
+    "obsidian": ['id'],
+    "quartz": ['pick_date', 'league_name', 'pick_norm'],
+}
+
+# Artifacts whose content defines each model's ledger (first existing name wins per slot; the
+# estimator comes first). Calibration tables change every stake, so they count even when optional.
+MODEL_ARTIFACTS = {
+    "pyrite": [['v1_pyrite.pkl']],
+    "diamond": [['v2_diamond.pkl']],
+    "obsidian": [['v3_obsidian.pkl'], ['v3_config.json'], ['v3_obsidian_calibration.json']],
+    "quartz": [['v4_quartz.pkl', 'v4_quantum_sniper.pkl'], ['v4_quartz_config.json', 'v4_config.json'], ['v4_quartz_calibration.json']],
+}
+
+# Days older than this (vs. newest pick_date) are frozen: never re-simulated or re-graded.
+# The picks cache only re-syncs the last ~3 days, so older results cannot change anyway.
+SETTLE_WINDOW_DAYS = 7
+COMPACT_AFTER_PARTS = 30
+
+def arrow_safe(df):
+    """Cast mixed-type object columns (fillna(0) leaves str/int mixes, e.g. 'result') to str."""
+    import pyarrow as pa
+    df = df.copy(deep=False)
+    for col in df.columns[df.dtypes == object]:
+        try:
+            pa.array(df[col], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            df[col] = df[col].astype(str)
+    return df
+
+def _file_digest(path, h):
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+
+def model_fingerprint(name):
+    """Content hash of the model artifacts + simulator and feature code that produced a ledger."""
+    from models import get_model_path
+    h = hashlib.sha256()
+    for slot in MODEL_ARTIFACTS.get(name, []):
+        for filename in slot:
+            path = get_model_path(filename)
+            if os.path.exists(path):
+                h.update(filename.encode())
+                _file_digest(path, h)
+                break
+        else:
+            # Absence is part of the state: adding or deleting an optional table changes the hash
+            h.update(f"{slot[0]}:absent".encode())
+    # Feature semantics change what every model sees, so the feature code is part of the fingerprint
+    for module in ('models.py', 'pipeline.py', 'point_in_time.py'):
+        _file_digest(os.path.join(os.path.dirname(os.path.abspath(__file__)), module), h)
+    return h.hexdigest()[:16]
+
+def settlement_table(df, keys):
+    """Latest outcome/settled state per ledger key from the current feature frame."""
+    cols = keys + ['outcome', 'settled']
+    table = df[[c for c in cols if c in df.columns]].drop_duplicates(subset=keys, keep='first')
+    if 'settled' not in table.columns:
+        table['settled'] = True
+    return table
+
+def settle(rows, table, keys):
+    """Overwrite outcome/settled/profit_actual of ledger rows from the settlement table."""
+    if rows.empty: return rows
+    # Obsidian's legacy renames leave duplicate labels (first one wins, as in the reports)
+    rows = rows.loc[:, ~rows.columns.duplicated()]
+    rows = rows.drop(columns=['outcome', 'settled'], errors='ignore').merge(table, on=keys, how='left')
+    rows['settled'] = rows['settled'].fillna(False).astype(bool)
+    rows['profit_actual'] = np.where(rows['outcome']==1, rows['wager_unit']*(rows['decimal_odds']-1),
+                                     np.where(rows['outcome']==0, -rows['wager_unit'], 0))
+    return rows
+
+class BetLedger:
+    """Append-only parquet ledger of one model's bets.
+
+    Each run appends a part file stamped with a batch number and records which pick_dates
+    that batch covers (a covered date may have zero bets). On read, only rows from the
+    batch that last covered their date survive. Parts are compacted once they accumulate.
+    The meta also holds the model's risk accumulator over its frozen days (see fold_risk).
+    """
+    def __init__(self, name, ledger_dir=os.path.join('data', 'ledgers')):
+        self.name = name
+        self.dir = os.path.join(ledger_dir, name)
+        self.meta_path = os.path.join(self.dir, 'ledger_meta.json')
+        self.keys = LEDGER_KEYS.get(name, ['id'])
+        self.meta = self._load_meta()
+
+    def _load_meta(self):
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path) as f:
+                return json.load(f)
+        return {"batch": 0, "watermark": None, "fingerprint": None, "coverage": {}}
+
+    def _save_meta(self):
+        with open(self.meta_path, 'w') as f:
+            json.dump(self.meta, f, indent=4)
+
+    def _parts(self):
+        return sorted(glob.glob(os.path.join(self.dir, 'part-*.parquet')))
+
+    def reset(self):
+        for path in self._parts():
+            os.remove(path)
+        self.meta = {"batch": 0, "watermark": None, "fingerprint": None, "coverage": {}}
+
+    def load(self, columns=None, keep_batch=False):
+        parts = self._parts()
+        if not parts: return pd.DataFrame()
+        read_cols = None if columns is None else list(dict.fromkeys(list(columns) + ['pick_date', '_batch']))
+        frames = [pd.read_parquet(p, columns=read_cols) for p in parts]
+        df = pd.concat([f for f in frames if not f.empty], ignore_index=True) if any(not f.empty for f in frames) else frames[0]
+        if df.empty: return df.drop(columns=['_batch'], errors='ignore')
+        # The batch that last covered a pick_date owns it
+        coverage = self.meta.get("coverage", {})
+        owner = df['pick_date'].dt.strftime('%Y-%m-%d').map(coverage)
+        owner = owner.fillna(df.groupby('pick_date')['_batch'].transform('max'))
+        df = df[df['_batch'] == owner]
+        if not keep_batch: df = df.drop(columns=['_batch'])
+        df = df.sort_values('pick_date', kind='stable').reset_index(drop=True)
+        return df if columns is None else df[list(columns)]
+
+    def append(self, rows, covered_dates, watermark):
+        """Write rows for the covered pick_dates as a new batch and advance the watermark."""
+        os.makedirs(self.dir, exist_ok=True)
+        batch = int(self.meta.get("batch", 0)) + 1
+        coverage = self.meta.setdefault("coverage", {})
+        for d in covered_dates:
+            coverage[pd.Timestamp(d).strftime('%Y-%m-%d')] = batch
+        if not rows.empty:
+            rows = arrow_safe(rows.assign(_batch=batch))
+            rows.to_parquet(os.path.join(self.dir, f'part-{batch:06d}.parquet'), index=False)
+        self.meta.update({"batch": batch, "watermark": str(pd.Timestamp(watermark).date()) if watermark is not None else None,
+                          "updated": pd.Timestamp.now(tz='UTC').strftime('%Y-%m-%d %H:%M UTC')})
+        self._save_meta()
+        if len(self._parts()) > COMPACT_AFTER_PARTS:
+            self.compact()
+
+    def fold_risk(self, df, before):
+        """Fold the frozen pick_dates (< before) not yet folded into the persisted risk state."""
+        acc = RiskAccumulator(self.meta.get("risk"))
+        if not df.empty:
+            new = df['pick_date'] < pd.Timestamp(before)
+            if acc.through is not None:
+                new &= df['pick_date'] > pd.Timestamp(acc.through)
+            acc.add_frame(df[new])
+        self.meta["risk"] = acc.to_dict()
+        self._save_meta()
+        return acc
+
+    def risk(self, df):
+        """Risk stats through df's newest day: the persisted state plus the still-open days of df."""
+        acc = RiskAccumulator(self.meta.get("risk"))
+        if df.empty: return acc.summary()
+        tail = df[df['pick_date'] > pd.Timestamp(acc.through)] if acc.through is not None else df
+        return acc.add_frame(tail).summary()
+
+    def compact(self):
+        """Rewrite the surviving rows (keeping their owning batch) into a single part."""
+        current = self.load(keep_batch=True)
+        old_parts = self._parts()
+        batch = int(self.meta.get("batch", 0))
+        path = os.path.join(self.dir, f'part-{batch:06d}.parquet')
+        tmp = path + '.tmp'
+        arrow_safe(current).to_parquet(tmp, index=False)
+        for p in old_parts:
+            os.remove(p)
+        os.replace(tmp, path)
+
+@tracer.traced('ledgers')
+def update_ledgers(df, models=None, ledger_dir=os.path.join('data', 'ledgers'), full_rebuild=False, workers=None):
+    """Bring every model ledger up to date, simulating only open and new pick_dates.
+
+    Open dates are those inside SETTLE_WINDOW_DAYS whose ledger rows still contain unsettled
+    bets, plus every day from the last watermark on (picks keep arriving for it). Closed dates
+    inside the window are re-settled against the latest outcomes instead of being re-simulated.
+    Returns {"models": {name: ledger frame}, "simulated_dates": {name: n}, "timings": {...}}.
+    """
+    from runner import SIMULATIONS, run_simulations
+    t0 = time.perf_counter()
+    tracer.current().rows_in = len(df)
+    names = list(models or SIMULATIONS.keys())
+    if 'settled' not in df.columns:
+        df = df.assign(settled=True)
+    all_dates = pd.Index(df['pick_date'].dropna().unique()).sort_values()
+    max_date = all_dates.max() if len(all_dates) else None
+
+    ledgers, current, targets, resettled = {}, {}, {}, {}
+    with tracer.span('load'):
+        for name in names:
+            ledger = BetLedger(name, ledger_dir)
+            fp = model_fingerprint(name)
+            if full_rebuild or ledger.meta.get("fingerprint") != fp:
+                if ledger.meta.get("fingerprint"):
+                    print(f"  - {name.upper()}: model/simulator changed. Rebuilding ledger.")
+                ledger.reset()
+            ledger.meta["fingerprint"] = fp
+            ledgers[name] = ledger
+
+            cur = ledger.load()
+            current[name] = cur
+            watermark = ledger.meta.get("watermark")
+            if cur.empty and watermark is None:
+                targets[name] = set(all_dates)
+                continue
+            wm = pd.Timestamp(watermark) if watermark else pd.Timestamp.min
+            recent = cur[cur['pick_date'] >= max_date - pd.Timedelta(days=SETTLE_WINDOW_DAYS)] if not cur.empty else cur
+            open_dates = set(recent.loc[~recent['settled'].astype(bool), 'pick_date'].unique()) if not recent.empty else set()
+            targets[name] = open_dates | set(all_dates[all_dates >= wm])
+
+    union = sorted(set().union(*targets.values())) if targets else []
+    sim_models = {}
+    if union:
+        print(f"⏳ Simulating {len(union)} open/new day(s) (of {len(all_dates)} in history)...")
+        sim_run = run_simulations(df[df['pick_date'].isin(union)], workers=workers, models=names)
+        sim_models, timings = sim_run["models"], sim_run["timings"]
+    else:
+        print("⚡ Ledgers up to date. Nothing to simulate.")
+        timings = {}
+
+    out = {"models": {}, "simulated_dates": {}, "resettled_dates": {}, "timings": timings}
+    with tracer.span('settle_append') as sp:
+        for name in names:
+            ledger, cur, keys = ledgers[name], current[name], ledgers[name].keys
+            table = settlement_table(df, keys)
+            fresh = sim_models.get(name, pd.DataFrame())
+            if not fresh.empty:
+                fresh = settle(fresh[fresh['pick_date'].isin(targets[name])], table, keys)
+
+            # Late results for closed days: rewrite only the days whose grading changed
+            changed = pd.DataFrame()
+            if not cur.empty and max_date is not None:
+                window = cur[(cur['pick_date'] >= max_date - pd.Timedelta(days=SETTLE_WINDOW_DAYS)) & ~cur['pick_date'].isin(targets[name])]
+                if not window.empty:
+                    regraded = settle(window, table, keys)
+                    diff = (regraded['outcome'].fillna(-1).values != window['outcome'].fillna(-1).values) | \
+                           (regraded['settled'].values != window['settled'].astype(bool).values)
+                    changed_days = set(regraded.loc[diff, 'pick_date'])
+                    changed = regraded[regraded['pick_date'].isin(changed_days)]
+            resettled[name] = changed['pick_date'].nunique() if not changed.empty else 0
+
+            rows = pd.concat([f for f in [fresh, changed] if not f.empty], ignore_index=True) if (not fresh.empty or not changed.empty) else pd.DataFrame()
+            covered = set(targets[name]) | (set(changed['pick_date']) if not changed.empty else set())
+            ledger.append(rows, covered, max_date)
+            out["models"][name] = ledger.load()
+            if max_date is not None:
+                ledger.fold_risk(out["models"][name], max_date - pd.Timedelta(days=SETTLE_WINDOW_DAYS))
+            out["simulated_dates"][name] = len(targets[name])
+            out["resettled_dates"][name] = resettled[name]
+        sp.rows_out = sum(len(f) for f in out["models"].values())
+    out["timings"]["ledger_total"] = {"wall_s": round(time.perf_counter() - t0, 3)}
+    tracer.current().rows_out = sum(len(f) for f in out["models"].values())
+    return out
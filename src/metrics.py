@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+RECENT_DAYS = 30
+TRADING_DAYS = 365      # Sharpe annualization (sports run every day)
+
+# Per-bet indicator columns summed per (model, day); every summary is derived from these daily sums
+_DAILY = ['bets', 'wins', 'losses', 'pushes', 'net', 'staked', 'decided_staked']
+
+def combine_ledgers(models):
+    """One frame of every model's bets with a categorical 'model' key (first of duplicate labels wins)."""
+    frames = []
+    for name, res in models.items():
+        if res is None or res.empty or 'profit_actual' not in res.columns: continue
+        res = res.loc[:, ~res.columns.duplicated()]
+        frames.append(pd.DataFrame({
+            'model': name,
+            'pick_date': pd.to_datetime(res['pick_date']).to_numpy(),
+            'outcome': pd.to_numeric(res['outcome'], errors='coerce').to_numpy(dtype=float),
+            'profit_actual': pd.to_numeric(res['profit_actual'], errors='coerce').fillna(0).to_numpy(dtype=float),
+            'wager_unit': pd.to_numeric(res['wager_unit'], errors='coerce').fillna(0).to_numpy(dtype=float),
+        }))
+    if not frames:
+        return pd.DataFrame({'model': pd.Categorical([], categories=list(models)), 'pick_date': pd.to_datetime([]),
+                             'outcome': [], 'profit_actual': [], 'wager_unit': []})
+    out = pd.concat(frames, ignore_index=True)
+    out['model'] = pd.Categorical(out['model'], categories=list(models))
+    return out
+
+def daily_table(bets):
+    """Per (model, pick_date) sums of the bet indicators, from one groupby over the combined ledgers."""
+    o = bets['outcome'].to_numpy()
+    win, loss = o == 1, o == 0
+    ind = pd.DataFrame({
+        'model': bets['model'], 'pick_date': bets['pick_date'],
+        'bets': 1, 'wins': win.astype(int), 'losses': loss.astype(int), 'pushes': (o == 0.5).astype(int),
+        'net': bets['profit_actual'], 'staked': bets['wager_unit'],
+        'decided_staked': np.where(win | loss, bets['wager_unit'], 0.0),
+    })
+    return ind.groupby(['model', 'pick_date'], observed=True, sort=True)[_DAILY].sum().reset_index()
+
+def _ratio(num, den, scale=1.0):
+    return (num / den * scale).where(den > 0, 0.0)
+
+def _rates(df, prefix=''):
+    """ROI (on stakes of decided bets, %), win rate (wins / decided, %) and W-L-P record from summed counts."""
+    w, l, p = df[f'{prefix}wins'], df[f'{prefix}losses'], df[f'{prefix}pushes']
+    df[f'{prefix}roi'] = _ratio(df[f'{prefix}net'], df[f'{prefix}decided_staked'], 100)
+    df[f'{prefix}win_rate'] = _ratio(w, w + l, 100)
+    df[f'{prefix}record'] = w.astype(int).astype(str) + '-' + l.astype(int).astype(str) + '-' + p.astype(int).astype(str)
+    return df
+
+def summarize(models, as_of=None, recent_days=RECENT_DAYS):
+    """Every per-model summary the reporters publish, one row per model (in models' order).
+
+    Columns: bets, wins, losses, pushes, pending, net, staked, roi, win_rate, record,
+    first_date, last_date, active_days, bets_per_day (calendar days from first to last
+    bet, inclusive), bets_per_active_day, sharpe (annualized, daily PnL of active days),
+    the same counts/rates for the model's last pick_date prefixed 'y_' (plus y_date), and
+    for the last recent_days days up to as_of (default: newest pick_date of any model)
+    prefixed 'recent_'. ROI is net profit over the stakes of decided (won/lost) bets, so
+    pending bets never dilute it; win rate is wins over decided bets.
+    """
+    daily = daily_table(combine_ledgers(models))
+    names = pd.Index(list(models), name='model')
+    g = daily.groupby('model', observed=False)
+    out = g[_DAILY].sum().reindex(names, fill_value=0)
+    out['first_date'] = g['pick_date'].min().reindex(names)
+    out['last_date'] = g['pick_date'].max().reindex(names)
+    out['active_days'] = g.size().reindex(names, fill_value=0)
+    out['pending'] = out['bets'] - out['wins'] - out['losses'] - out['pushes']
+    span = ((out['last_date'] - out['first_date']).dt.days + 1).fillna(0)
+    out['bets_per_day'] = _ratio(out['bets'], span)
+    out['bets_per_active_day'] = _ratio(out['bets'], out['active_days'])
+    stats = g['net'].agg(['mean', 'std']).reindex(names)
+    out['sharpe'] = (stats['mean'] / (stats['std'].fillna(0) + 1e-6) * np.sqrt(TRADING_DAYS)).fillna(0.0)
+    out = _rates(out)
+
+    # Yesterday: each model's newest pick_date
+    last = daily['pick_date'] == g['pick_date'].transform('max')
+    y = daily[last].groupby('model', observed=False)[_DAILY].sum().reindex(names, fill_value=0).add_prefix('y_')
+    out = _rates(out.join(y), 'y_')
+    out['y_date'] = out['last_date']
+
+    # Recent window, shared cut-off for every model
+    as_of = pd.Timestamp(as_of) if as_of is not None else daily['pick_date'].max()
+    recent = daily[daily['pick_date'] >= as_of - pd.Timedelta(days=recent_days)] if pd.notna(as_of) else daily.iloc[:0]
+    r = recent.groupby('model', observed=False)[_DAILY].sum().reindex(names, fill_value=0).add_prefix('recent_')
+    return _rates(out.join(r), 'recent_')
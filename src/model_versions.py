@@ -0,0 +1,86 @@
+import os
+import json
+import shutil
+import pandas as pd
+import numpy as np
+import joblib
+
+VERSIONS_DIR = os.path.join('models', 'v4_versions')
+
+def feature_profile(df, features, bins=10):
+    """Per-feature quantile bins and their training proportions (the drift reference)."""
+    profile = {}
+    for f in features:
+        x = df[f].to_numpy(dtype=float)
+        x = x[np.isfinite(x)]
+        if x.size == 0: continue
+        edges = np.unique(np.quantile(x, np.linspace(0, 1, bins + 1)[1:-1]))
+        counts = np.bincount(np.searchsorted(edges, x, side='right'), minlength=len(edges) + 1)
+        profile[f] = {"edges": edges.tolist(), "props": (counts / x.size).tolist()}
+    return profile
+
+def psi(profile, df, eps=1e-4):
+    """Population stability index of df's features against a feature_profile."""
+    out = {}
+    for f, ref in profile.items():
+        if f not in df.columns: continue
+        x = df[f].to_numpy(dtype=float)
+        x = x[np.isfinite(x)]
+        if x.size == 0: continue
+        expected = np.maximum(np.asarray(ref["props"]), eps)
+        actual = np.bincount(np.searchsorted(ref["edges"], x, side='right'), minlength=len(expected)) / x.size
+        actual = np.maximum(actual, eps)
+        out[f] = float(np.sum((actual - expected) * np.log(actual / expected)))
+    return out
+
+class ModelVersions:
+    """Versioned model artifacts: <root>/<version>/{model.pkl, config.json, manifest.json, trained_ids.parquet}.
+
+    Versions are UTC timestamps, so the newest sorts last. The manifest records lineage
+    (parent, mode, chain of warm starts since the last full fit) and the drift reference
+    of the last full fit; trained_ids lists every pick the model has been fit on.
+    """
+    def __init__(self, root=VERSIONS_DIR):
+        self.root = root
+
+    def versions(self):
+        if not os.path.isdir(self.root): return []
+        return sorted(v for v in os.listdir(self.root) if os.path.exists(os.path.join(self.root, v, 'manifest.json')))
+
+    def latest(self):
+        """Manifest of the newest version, or None."""
+        versions = self.versions()
+        return self.manifest(versions[-1]) if versions else None
+
+    def manifest(self, version):
+        with open(os.path.join(self.root, version, 'manifest.json')) as f:
+            return json.load(f)
+
+    def load(self, version):
+        """(model, config, manifest, trained ids) of one version."""
+        d = os.path.join(self.root, version)
+        with open(os.path.join(d, 'config.json')) as f:
+            config = json.load(f)
+        ids = pd.read_parquet(os.path.join(d, 'trained_ids.parquet'))['id']
+        return joblib.load(os.path.join(d, 'model.pkl')), config, self.manifest(version), ids
+
+    def save(self, model, config, manifest, trained_ids):
+        """Write a new version (staged in a temp dir, then renamed into place); returns its name."""
+        version = pd.Timestamp.now(tz='UTC').strftime('%Y%m%dT%H%M%S')
+        while os.path.exists(os.path.join(self.root, version)):
+            version += '_1'
+        d = os.path.join(self.root, version)
+        tmp = d + '.tmp'
+        os.makedirs(tmp, exist_ok=True)
+        try:
+            joblib.dump(model, os.path.join(tmp, 'model.pkl'))
+            with open(os.path.join(tmp, 'config.json'), 'w') as f:
+                json.dump(config, f, indent=4)
+            pd.DataFrame({'id': pd.unique(np.asarray(trained_ids))}).to_parquet(os.path.join(tmp, 'trained_ids.parquet'), index=False)
+            with open(os.path.join(tmp, 'manifest.json'), 'w') as f:
+                json.dump({**manifest, "version": version}, f, indent=4, default=str)
+            os.replace(tmp, d)
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        return version
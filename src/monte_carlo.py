@@ -0,0 +1,284 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Bytes of float64 path matrix (paths x steps) materialized per chunk
+CHUNK_BYTES = 64 * 1024 * 1024
+PILOT_PATHS = 1000      # Paths used to fix each step's histogram range
+BAND_SIGMAS = 5.0       # Histogram range = pilot mean +/- this many pilot std devs
+SAMPLE_PATHS = 5        # Raw paths kept for plotting
+TIE_UNITS = 1e-7        # A bet this close to the running peak counts as at the peak (not under water)
+
+def summarize(values, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)):
+    """Mean/std plus percentiles of a per-path metric."""
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0: return {}
+    out = {"mean": float(values.mean()), "std": float(values.std())}
+    for q, v in zip(quantiles, np.quantile(values, quantiles)):
+        out[f"p{int(round(q * 100))}"] = float(v)
+    return out
+
+# --- WORKER STATE ---
+_STATE = {}
+
+def _init_worker(state):
+    _STATE.clear()
+    _STATE.update(state)
+
+def _paths(seed, n_paths, s):
+    """(n_paths x steps) bankroll curves: one gather + one cumsum for the whole block."""
+    rng = np.random.default_rng(seed)
+    increments = s['pnl'][rng.integers(0, len(s['pnl']), size=(n_paths, s['steps']))]
+    return s['initial'] + np.cumsum(increments, axis=1)
+
+def day_segments(pnl, day_codes, n_days):
+    """Per-day segment summaries from bet-level PnL ordered by day.
+
+    For each calendar day (empty days included): total, highest and lowest running PnL
+    (relative to the day's opening level, which counts) and the max drawdown inside the day.
+    """
+    offsets = np.searchsorted(day_codes, np.arange(n_days + 1))
+    seg = {k: np.zeros(n_days) for k in ('sum', 'hi', 'lo', 'dd')}
+    for d in range(n_days):
+        a, b = offsets[d], offsets[d + 1]
+        if a == b: continue
+        run = np.concatenate([[0.0], np.cumsum(pnl[a:b])])
+        seg['sum'][d] = run[-1]
+        seg['hi'][d] = run.max()
+        seg['lo'][d] = run.min()
+        seg['dd'][d] = (np.maximum.accumulate(run) - run).max()
+    return seg
+
+def block_segments(seg, block_days):
+    """Merge every run of block_days consecutive day segments (moving blocks), vectorized over starts.
+
+    Segments compose associatively: (A then B) has sum A+B, hi max(A.hi, A.sum+B.hi),
+    lo min(A.lo, A.sum+B.lo) and dd max(A.dd, B.dd, A.hi - (A.sum + B.lo)).
+    """
+    n = len(seg['sum']) - block_days + 1
+    out = {k: v[:n].copy() for k, v in seg.items()}
+    for j in range(1, block_days):
+        b = {k: v[j:j + n] for k, v in seg.items()}
+        out['dd'] = np.maximum(np.maximum(out['dd'], b['dd']), out['hi'] - (out['sum'] + b['lo']))
+        out['hi'] = np.maximum(out['hi'], out['sum'] + b['hi'])
+        out['lo'] = np.minimum(out['lo'], out['sum'] + b['lo'])
+        out['sum'] = out['sum'] + b['sum']
+    return out
+
+def block_records(pnl, day_codes, n_days, block_days):
+    """Running highs of every moving block's bet-level PnL, for exact bet-level time under water.
+
+    Inside a block, a bet is above water iff its running PnL is a running high of the block
+    (ties count) and at least t = entering peak - block opening level; so for any t, the
+    block's under-water bets are its bet count minus its records >= t. Records are
+    nondecreasing, so they are stored flat with each block shifted onto its own disjoint
+    range ('base'), and one searchsorted answers every (path, block) at once.
+    Returns (flat records, per-block arrays: bets, rec_end, rec_lo, rec_hi, rec_base).
+    """
+    offsets = np.searchsorted(day_codes, np.arange(n_days + 1))
+    n = n_days - block_days + 1
+    recs = []
+    for b in range(n):
+        run = np.cumsum(pnl[offsets[b]:offsets[b + block_days]])
+        recs.append(run[run >= np.maximum.accumulate(run)])
+    counts = np.array([len(r) for r in recs], dtype=np.int64)
+    lo = np.array([r[0] if len(r) else 0.0 for r in recs])
+    hi = np.array([r[-1] if len(r) else 0.0 for r in recs])
+    base = np.arange(n) * (float((hi - lo).max()) + 2.0) - lo
+    flat = np.concatenate([r + base[b] for b, r in enumerate(recs)])
+    bets = (offsets[block_days:block_days + n] - offsets[:n]).astype(np.float64)
+    return flat, {'bets': bets, 'rec_end': np.cumsum(counts), 'rec_lo': lo, 'rec_hi': hi, 'rec_base': base}
+
+def _block_paths(seed, n_paths, s):
+    """Block bootstrap: (n_paths x n_blocks) block-end curves plus exact bet-level MDD and time under water."""
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(s['blocks']['sum']), size=(n_paths, s['steps']))
+    g = {k: v[idx] for k, v in s['blocks'].items()}
+    curves = s['initial'] + np.cumsum(g['sum'], axis=1)
+    start = curves - g['sum']
+    # Peak reached before each block (the starting bankroll counts as the first peak)
+    peak_in = np.maximum.accumulate(start + g['hi'], axis=1)
+    peak_before = np.maximum(np.concatenate([np.full((n_paths, 1), s['initial']), peak_in[:, :-1]], axis=1), s['initial'])
+    max_dd = np.maximum(g['dd'], peak_before - (start + g['lo'])).max(axis=1)
+    # Bets above water per block (see block_records); t is clipped into the block's own range
+    q = np.clip(peak_before - start - TIE_UNITS, g['rec_lo'], g['rec_hi'] + 1.0) + g['rec_base']
+    above = g['rec_end'] - np.searchsorted(s['records'], q, side='left')
+    bets = g['bets'].sum(axis=1)
+    return curves, max_dd, (bets - above.sum(axis=1)) / np.maximum(bets, 1)
+
+def _iid_paths(seed, n_paths, s):
+    curves = _paths(seed, n_paths, s)
+    # Drawdown from the running peak (the starting bankroll counts as the first peak)
+    peak = np.maximum.accumulate(np.maximum(curves, s['initial']), axis=1)
+    return curves, (peak - curves).max(axis=1), (curves < peak - TIE_UNITS).mean(axis=1)
+
+def _simulate_chunk(task):
+    """Simulate one seeded chunk; returns mergeable partial summaries."""
+    seed, n_paths = task
+    s = _STATE
+    curves, max_dd, tuw = (_block_paths if 'blocks' in s else _iid_paths)(seed, n_paths, s)
+
+    out = {
+        'n': n_paths,
+        'sum': curves.sum(axis=0),
+        'final': curves[:, -1].astype(np.float32),
+        'max_drawdown': max_dd.astype(np.float32),
+        'time_under_water': tuw.astype(np.float32),
+        'sample': curves[:SAMPLE_PATHS].copy(),
+    }
+    if 'lo' in s:
+        bins = s['bins']
+        idx = np.clip(((curves - s['lo']) / s['width']).astype(np.int64), 0, bins - 1)
+        flat = (idx + np.arange(s['steps']) * bins).ravel()
+        out['hist'] = np.bincount(flat, minlength=s['steps'] * bins).reshape(s['steps'], bins).astype(np.int32)
+    return out
+
+class MonteCarloEngine:
+    """Bootstrap equity-curve stress test with bounded memory.
+
+    mode='iid' resamples single bets; mode='block' resamples moving blocks of block_days
+    calendar days (1 = days, 7 = weeks) so same-day and pooled-play correlation survives.
+    Block mode needs each bet's pick_date: day segments are summarized once from the day
+    offsets, and paths are gathers over those summaries, so max drawdown and time under
+    water stay exact at bet level while a path costs O(blocks) instead of O(bets).
+
+    Paths are generated CHUNK_BYTES at a time as 2-D (paths x steps) blocks. Per-step bands
+    are streamed into fixed-range histograms (range set by a seeded pilot batch), so memory
+    does not grow with the path count; per-path scalars are kept as float32 for exact
+    percentiles. Every chunk draws from its own SeedSequence child, so results are
+    identical for any worker count.
+    """
+    def __init__(self, pnl, initial_bankroll=100.0, seed=42, workers=None, bins=512,
+                 band_quantiles=(0.05, 0.5, 0.95), mode='iid', days=None, block_days=1):
+        self.pnl = np.asarray(pnl, dtype=np.float64)
+        self.initial = float(initial_bankroll)
+        self.seed = seed
+        self.workers = workers
+        self.bins = bins
+        self.band_quantiles = band_quantiles
+        self.mode = mode
+        self.block_days = max(1, int(block_days))
+        self.blocks = self.records = None
+        if mode == 'block':
+            if days is None: raise ValueError("Block bootstrap needs the pick_date of every bet")
+            days = pd.to_datetime(pd.Series(days)).dt.normalize().to_numpy()
+            order = np.argsort(days, kind='stable')
+            codes = ((days[order] - days[order][0]) // np.timedelta64(1, 'D')).astype(np.int64) if len(days) else np.array([], np.int64)
+            n_days = int(codes[-1]) + 1 if len(codes) else 0
+            self.block_days = min(self.block_days, max(n_days, 1))
+            self.n_days = n_days
+            if n_days:
+                self.blocks = block_segments(day_segments(self.pnl[order], codes, n_days), self.block_days)
+                self.records, per_block = block_records(self.pnl[order], codes, n_days, self.block_days)
+                self.blocks.update(per_block)
+        elif mode != 'iid':
+            raise ValueError(f"Unknown bootstrap mode: {mode}")
+
+    @property
+    def steps(self):
+        """Bets per path (iid) or blocks per path (block: enough to cover the observed calendar)."""
+        if self.mode == 'block':
+            return -(-self.n_days // self.block_days) if self.blocks is not None else 0
+        return len(self.pnl)
+
+    def _state(self):
+        state = {'pnl': self.pnl, 'steps': self.steps, 'initial': self.initial}
+        if self.blocks is not None:
+            state['blocks'] = self.blocks
+            state['records'] = self.records
+        return state
+
+    def _chunk_paths(self, paths):
+        """Paths per chunk so one chunk's live (paths x steps) float64 temporaries fit CHUNK_BYTES
+        (~16 of them in block mode, ~3 in iid mode)."""
+        return max(1, min(paths, CHUNK_BYTES // (8 * self.steps * (16 if self.blocks is not None else 3))))
+
+    def _band_range(self, seed):
+        """Per-step histogram (lo, bin width) from a seeded pilot batch, streamed in chunks.
+
+        Per-step means and variances are merged across chunks (Chan et al.), so the pilot never
+        holds more than one chunk of curves, like the main run.
+        """
+        state = self._state()
+        simulate = _block_paths if 'blocks' in state else _iid_paths
+        chunk = self._chunk_paths(PILOT_PATHS)
+        sizes = [min(chunk, PILOT_PATHS - i) for i in range(0, PILOT_PATHS, chunk)]
+        n, mean, m2 = 0, np.zeros(self.steps), np.zeros(self.steps)
+        for child, size in zip(seed.spawn(len(sizes)), sizes):
+            curves = simulate(child, size, state)[0]
+            c_mean = curves.mean(axis=0)
+            delta = c_mean - mean
+            m2 += ((curves - c_mean) ** 2).sum(axis=0) + delta ** 2 * (n * size / (n + size))
+            mean += delta * (size / (n + size))
+            n += size
+        half = BAND_SIGMAS * np.maximum(np.sqrt(m2 / n), 1e-9)
+        return mean - half, 2 * half / self.bins
+
+    def run(self, paths=10_000):
+        """Returns {"mean_curve", "bands": {q: curve}, "final", "max_drawdown", "time_under_water", "sample_paths", ...}."""
+        if self.steps == 0 or paths <= 0:
+            return {}
+        seeds = np.random.SeedSequence(self.seed).spawn(2)
+        lo, width = self._band_range(seeds[0])
+
+        chunk = self._chunk_paths(paths)
+        sizes = [min(chunk, paths - i) for i in range(0, paths, chunk)]
+        tasks = list(zip(seeds[1].spawn(len(sizes)), sizes))
+        state = {**self._state(), 'lo': lo, 'width': width, 'bins': self.bins}
+
+        # Partial summaries are folded in as chunks finish, so nothing scales with the path count but the scalars
+        hist = np.zeros((self.steps, self.bins), dtype=np.int64)
+        total = np.zeros(self.steps)
+        final, mdd, tuw, sample = [], [], [], None
+        def merge(part):
+            nonlocal hist, total, sample
+            hist += part['hist']
+            total += part['sum']
+            final.append(part['final'])
+            mdd.append(part['max_drawdown'])
+            tuw.append(part['time_under_water'])
+            if sample is None: sample = part['sample']
+
+        workers = max(1, min(self.workers or os.cpu_count() or 1, len(tasks)))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(state,)) as pool:
+                for part in pool.map(_simulate_chunk, tasks):
+                    merge(part)
+        else:
+            _init_worker(state)
+            for task in tasks:
+                merge(_simulate_chunk(task))
+        _STATE.clear()
+        final, mdd, tuw = np.concatenate(final), np.concatenate(mdd), np.concatenate(tuw)
+
+        return {
+            "paths": paths,
+            "mode": self.mode if self.mode == 'iid' else f"block_{self.block_days}d",
+            "steps": self.steps,
+            "initial_bankroll": self.initial,
+            "mean_curve": total / paths,
+            "bands": {q: self._hist_quantile(hist, q, lo, width) for q in self.band_quantiles},
+            "final": summarize(final),
+            "max_drawdown": summarize(mdd),
+            "time_under_water": summarize(tuw),
+            "final_values": final,
+            "max_drawdowns": mdd,
+            "sample_paths": sample,
+        }
+
+    @staticmethod
+    def _hist_quantile(hist, q, lo, width):
+        """Per-step quantile from streamed counts (linear within the bin)."""
+        cdf = np.cumsum(hist, axis=1)
+        target = q * cdf[:, -1]
+        b = np.minimum((cdf < target[:, None]).sum(axis=1), hist.shape[1] - 1)
+        rows = np.arange(len(hist))
+        prev = np.where(b > 0, cdf[rows, b - 1], 0)
+        frac = np.divide(target - prev, hist[rows, b], out=np.zeros(len(hist)), where=hist[rows, b] > 0)
+        return lo + (b + frac) * width
+
+def run_monte_carlo_engine(pnl, paths=10_000, **kwargs):
+    """Convenience wrapper; kwargs are MonteCarloEngine options."""
+    return MonteCarloEngine(pnl, **kwargs).run(paths)
@@ -7,6 +7,13 @@ import warnings
 import traceback
 import time
 
+try:
+    from instrumentation import tracer
+    from point_in_time import PointInTimeIndex
+except ModuleNotFoundError:
+    from src.instrumentation import tracer
+    from src.point_in_time import PointInTimeIndex
+
 # SILENCE WARNINGS
 warnings.simplefilter(action='ignore', category=FutureWarning)
 pd.options.mode.chained_assignment = None
@@ -25,33 +32,36 @@ class SportsDataPipeline:
         start = 0
         print(f"📥 Fetching '{table_name}'...", end=" ", flush=True)
         
-        while True:
-            try:
-                query = self.supabase.table(table_name).select(select_query)
-                
-                # Apply custom filters (e.g. date ranges)
-                if filters:
-                    for field, op, value in filters:
-                        if op == 'gte': query = query.gte(field, value)
-                        elif op == 'lte': query = query.lte(field, value)
-                        elif op == 'eq': query = query.eq(field, value)
+        with tracer.span(table_name) as sp:
+            while True:
+                try:
+                    query = self.supabase.table(table_name).select(select_query)
                 
-                response = query.range(start, start+batch_size-1).execute()
-                data = response.data
-                if not data: break
-                all_rows.extend(data)
-                if len(all_rows) % 5000 == 0: print(f"{len(all_rows)}...", end=" ", flush=True)
-                if len(data) < batch_size: break
-                start += batch_size
-            except Exception as e:
-                print(f"\n⚠️ Warning: Batch error in '{table_name}' at {start}: {e}")
-                # Simple retry logic: just break and return what we have if it's a partial fetch
-                # or we could implement actual retries here.
-                break
+                    # Apply custom filters (e.g. date ranges)
+                    if filters:
+                        for field, op, value in filters:
+                            if op == 'gte': query = query.gte(field, value)
+                            elif op == 'lte': query = query.lte(field, value)
+                            elif op == 'eq': query = query.eq(field, value)
                 
+                    response = query.range(start, start+batch_size-1).execute()
+                    data = response.data
+                    if not data: break
+                    all_rows.extend(data)
+                    if len(all_rows) % 5000 == 0: print(f"{len(all_rows)}...", end=" ", flush=True)
+                    if len(data) < batch_size: break
+                    start += batch_size
+                except Exception as e:
+                    print(f"\n⚠️ Warning: Batch error in '{table_name}' at {start}: {e}")
+                    # Simple retry logic: just break and return what we have if it's a partial fetch
+                    # or we could implement actual retries here.
+                    break
+            sp.rows_out = len(all_rows)
+
         print(f"Done ({len(all_rows)} rows).")
         return all_rows
 
+    @tracer.traced('supabase')
     def fetch_data(self, since_days=None):
         filters = []
         if since_days:
@@ -86,6 +96,7 @@ class SportsDataPipeline:
         df['league_name'] = df['league_name'].map(league_map).fillna('Other')
         return df.sort_values('pick_date')
 
+    @tracer.traced('fetch')
     def fetch_data_cached(self, cache_dir='data', max_age_hours=6):
         """Fetch incremental updates from supabase and cache as parquet."""
         os.makedirs(cache_dir, exist_ok=True)
@@ -160,14 +171,32 @@ class SportsDataPipeline:
         else:
             return new_df.sort_values('pick_date')
 
+def build_play_keys(df):
+    """Factorize the play triple once into dense int64 keys.
+
+    Returns (market_id, play_id): market_id identifies (league_name, pick_norm) and play_id
+    identifies (pick_date, league_name, pick_norm). Codes follow the lexicographic order of
+    the string keys, so grouping on the ids yields the same group order as the strings.
+    """
+    d = pd.factorize(df['pick_date'], sort=True)[0].astype(np.int64)
+    l, leagues = pd.factorize(df['league_name'], sort=True)
+    p, picks = pd.factorize(df['pick_norm'], sort=True)
+    market_id = np.unique(l.astype(np.int64) * len(picks) + p, return_inverse=True)[1].astype(np.int64)
+    play_id = np.unique(d * (int(market_id.max()) + 1 if len(market_id) else 1) + market_id, return_inverse=True)[1].astype(np.int64)
+    return market_id, play_id
+
 class FeatureEngineer:
     def __init__(self, df): 
         self.df = df.copy()
+        # Point-in-time snapshots built by process() (reusable for as-of lookups, e.g. live scoring)
+        self.indexes = {}
 
     def _dec(self, o): 
         return 1.91 if pd.isna(o) or o==0 else (o/100)+1 if o>0 else (100/abs(o))+1
     
+    @tracer.traced('features')
     def process(self):
+        tracer.current().rows_in = len(self.df)
         print("Processing features (Billion Dollar v4 Correct Shift)...")
         df = self.df.copy()
         
@@ -178,8 +207,11 @@ class FeatureEngineer:
         if 'result' in df.columns:
             res = df['result'].astype(str).str.lower().str.strip()
             df['outcome'] = np.select([res.isin(['win','won']), res.isin(['loss','lost'])], [1.0, 0.0], default=np.nan)
+            # Graded picks (pending ones read as outcome 0 after the final fillna)
+            df['settled'] = df['outcome'].notna() | res.isin(['push', 'void', 'cancelled'])
         else:
             df['outcome'] = np.nan
+            df['settled'] = False
             
         df['profit_units'] = np.where(df['outcome']==1, df['unit']*(df['decimal_odds']-1), np.where(df['outcome']==0, -df['unit'], 0))
         df['implied_prob'] = 1 / df['decimal_odds']
@@ -202,6 +234,9 @@ class FeatureEngineer:
 
         df['pick_norm'] = df['pick_value'].apply(normalize_pick)
 
+        # 2b. Integer Play Keys (every play-level groupby/dedup downstream uses these)
+        df['market_id'], df['play_id'] = build_play_keys(df)
+
         # 3. Daily Capper Aggregation
         daily = df.groupby(['capper_id', 'pick_date']).agg({
             'outcome': ['sum', 'count'],
@@ -233,11 +268,12 @@ class FeatureEngineer:
         daily['capper_roi_std_30d'] = daily['vol_30d'].fillna(0)
         daily['capper_win_rate_30d'] = daily['acc_30d'].fillna(0.5)
         
-        # 4. Join back to original picks
-        # Drop original pick_date from daily before renaming known_date to pick_date
-        daily_features = daily.reset_index().drop(columns=['pick_date']).rename(columns={'known_date': 'pick_date'})
-        feat_cols = ['capper_id', 'pick_date', 'acc_7d', 'roi_7d', 'vol_7d', 'acc_30d', 'roi_30d', 'vol_30d', 'capper_roi_std_30d', 'capper_win_rate_30d']
-        df = df.merge(daily_features[feat_cols], on=['capper_id', 'pick_date'], how='left')
+        # 4. Join back to original picks: each pick sees its capper's latest snapshot known by the pick date
+        # (carried forward across idle days instead of only the day after the capper was active)
+        daily_features = daily.reset_index()
+        feat_cols = ['acc_7d', 'roi_7d', 'vol_7d', 'acc_30d', 'roi_30d', 'vol_30d', 'capper_roi_std_30d', 'capper_win_rate_30d']
+        self.indexes['capper'] = PointInTimeIndex(daily_features['capper_id'], daily_features['known_date'], daily_features[feat_cols])
+        df[feat_cols] = self.indexes['capper'].asof(df['capper_id'], df['pick_date']).to_numpy()
         
         # 4b. Non-Lagged Features (For V3 Benchmark alignment ONLY)
         # This matches the user's dashboard volume by using same-day performance
@@ -247,22 +283,25 @@ class FeatureEngineer:
                           on=['capper_id', 'pick_date'], how='left', suffixes=('', '_non_lagged'))
 
         # 5. Consensus Fix (Lagged)
-        cons = df.groupby(['league_name', 'pick_norm', 'pick_date']).size().reset_index(name='count')
+        play_size = np.bincount(df['play_id'])
         
         # Leaked Version (for v3 calibration)
-        df = df.merge(cons.rename(columns={'count': 'consensus_count_leaked'}), on=['league_name', 'pick_norm', 'pick_date'], how='left')
+        df['consensus_count_leaked'] = play_size[df['play_id']]
         
+        cons = df.drop_duplicates('play_id')[['play_id', 'market_id', 'pick_date']].sort_values('play_id')
+        cons['count'] = play_size[cons['play_id']]
         cons['known_date'] = cons['pick_date'] + pd.Timedelta(days=1)
-        cons_roll = cons.sort_values(['league_name', 'pick_norm', 'known_date']).set_index('known_date')
-        # Use transform/rolling and drop original to avoid collision
-        cons_roll['v4_consensus_count_lag1'] = cons_roll.groupby(['league_name', 'pick_norm'])['count'].transform(lambda x: x.rolling('7D', min_periods=1).mean())
+        # play_id order == (pick_date, market) order; re-sort by market then time for the rolling window
+        cons_roll = cons.sort_values(['market_id', 'known_date'], kind='stable').set_index('known_date')
+        cons_roll['v4_consensus_count_lag1'] = cons_roll.groupby('market_id')['count'].rolling('7D', min_periods=1).mean().values
         
-        cons_final = cons_roll.reset_index()[['league_name', 'pick_norm', 'known_date', 'v4_consensus_count_lag1']].rename(columns={'known_date': 'pick_date'})
-        df = df.merge(cons_final, on=['league_name', 'pick_norm', 'pick_date'], how='left')
+        cons_final = cons_roll.reset_index()
+        self.indexes['market'] = PointInTimeIndex(cons_final['market_id'], cons_final['known_date'], cons_final[['v4_consensus_count_lag1']])
+        df['v4_consensus_count_lag1'] = self.indexes['market'].asof(df['market_id'], df['pick_date'])['v4_consensus_count_lag1'].to_numpy()
 
         # 5b. Market Drift (Institutional CLV Proxy)
         # Calculate the deviation of the pick's odds from the average consensus odds for that game
-        game_odds = df.groupby(['league_name', 'pick_norm', 'pick_date'])['decimal_odds'].transform('mean')
+        game_odds = (np.bincount(df['play_id'], weights=df['decimal_odds']) / play_size)[df['play_id']]
         df['market_drift'] = (df['decimal_odds'] - game_odds) / (game_odds + 1e-6)
 
         # 6. Final Defaults & V1-V3 Compatibility
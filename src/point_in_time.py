@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+def _seconds(ts):
+    """Timestamps as int64 seconds since the epoch (tz-naive UTC)."""
+    return pd.to_datetime(pd.Series(ts)).to_numpy().astype('datetime64[s]').astype(np.int64)
+
+class PointInTimeIndex:
+    """Per-entity state snapshots with batched as-of lookup.
+
+    Each snapshot is (entity, known_at, values...): the entity's state as it became known
+    at known_at. Snapshots are sorted once by (entity, known_at) into a single int64 key
+    (entity code << 32 | seconds), so a whole frame of (entity, timestamp) queries resolves
+    with one hash lookup for the entity codes and one searchsorted: O(log n) per query.
+    A query sees the latest snapshot with known_at <= at (strictly before with strict=True),
+    i.e. the last known state is carried forward until a newer one exists.
+    """
+    def __init__(self, entity, known_at, values):
+        values = pd.DataFrame(values).reset_index(drop=True)
+        self.entities = pd.Index(pd.unique(pd.Series(entity).dropna()))
+        codes = self.entities.get_indexer(pd.Series(entity))
+        ok = codes >= 0
+        key = (codes[ok].astype(np.int64) << 32) + _seconds(known_at)[ok]
+        order = np.argsort(key, kind='stable')
+        self.key = key[order]
+        self.known_at = _seconds(known_at)[ok][order]
+        self.columns = list(values.columns)
+        self.values = values[ok].iloc[order].to_numpy(dtype=float)
+
+    def __len__(self):
+        return len(self.key)
+
+    def positions(self, entity, at, strict=False, max_age=None):
+        """Snapshot row per query (-1 when the entity has no snapshot yet, or it is older than max_age)."""
+        codes = self.entities.get_indexer(pd.Series(entity))
+        if len(self.key) == 0:
+            return np.full(len(codes), -1, dtype=np.int64)
+        t = _seconds(at)
+        target = (np.maximum(codes, 0).astype(np.int64) << 32) + t
+        pos = np.searchsorted(self.key, target, side='left' if strict else 'right') - 1
+        safe = np.maximum(pos, 0)
+        hit = (codes >= 0) & (pos >= 0)
+        hit &= (self.key[safe] >> 32) == codes
+        if max_age is not None:
+            hit &= (t - self.known_at[safe]) <= pd.Timedelta(max_age).total_seconds()
+        return np.where(hit, pos, -1)
+
+    def asof(self, entity, at, strict=False, max_age=None, columns=None):
+        """Frame (one row per query, same order) of snapshot values; NaN where nothing is known."""
+        pos = self.positions(entity, at, strict=strict, max_age=max_age)
+        cols = [self.columns.index(c) for c in (columns or self.columns)]
+        out = np.full((len(pos), len(cols)), np.nan)
+        hit = pos >= 0
+        out[hit] = self.values[pos[hit]][:, cols]
+        return pd.DataFrame(out, columns=columns or self.columns)
@@ -0,0 +1,82 @@
+import os
+
+try:
+    from ledger import arrow_safe, model_fingerprint
+except ModuleNotFoundError:
+    from src.ledger import arrow_safe, model_fingerprint
+
+RESULTS_DIR = os.path.join('data', 'results')
+SCHEMA_VERSION = 1      # bump when the stored columns/dtypes change meaning; older files read as stale
+
+# Enough for cumulative-profit curves
+CURVE_COLUMNS = ['pick_date', 'profit_actual', 'wager_unit']
+
+class ResultsStore:
+    """Typed columnar store of the latest simulation results: one parquet file per model.
+
+    Each file's schema metadata records the store's schema version and the producing model's
+    artifact hash (ledger.model_fingerprint), so a reader can tell stale results from current
+    ones without loading any rows. Reads are memory-mapped and take a column projection.
+    """
+    def __init__(self, root=RESULTS_DIR):
+        self.root = root
+
+    def path(self, name):
+        return os.path.join(self.root, f'{name}.parquet')
+
+    def write(self, name, df, artifact_hash=None):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        df = df.loc[:, ~df.columns.duplicated()].reset_index(drop=True)
+        table = pa.Table.from_pandas(arrow_safe(df), preserve_index=False)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            b'quarry.schema_version': str(SCHEMA_VERSION).encode(),
+            b'quarry.model': name.encode(),
+            b'quarry.artifact_hash': (artifact_hash or '').encode(),
+        })
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self.path(name) + '.tmp'
+        pq.write_table(table, tmp)
+        os.replace(tmp, self.path(name))
+        return self.path(name)
+
+    def write_all(self, models):
+        """Store every model's results stamped with its current artifact hash; returns {name: path}."""
+        return {name: self.write(name, df, model_fingerprint(name)) for name, df in models.items()}
+
+    def meta(self, name):
+        """{'schema_version', 'model', 'artifact_hash', 'rows'} of a stored model, or None if absent."""
+        import pyarrow.parquet as pq
+        if not os.path.exists(self.path(name)): return None
+        info = pq.read_metadata(self.path(name))
+        md = info.schema.to_arrow_schema().metadata or {}
+        return {
+            "schema_version": int(md.get(b'quarry.schema_version', b'0')),
+            "model": md.get(b'quarry.model', b'').decode(),
+            "artifact_hash": md.get(b'quarry.artifact_hash', b'').decode() or None,
+            "rows": info.num_rows,
+        }
+
+    def is_current(self, name, artifact_hash=None):
+        meta = self.meta(name)
+        if meta is None or meta["schema_version"] != SCHEMA_VERSION: return False
+        return artifact_hash is None or meta["artifact_hash"] == artifact_hash
+
+    def read(self, name, columns=None, artifact_hash=None):
+        """Stored results (only the requested columns that exist), or None when absent or stale."""
+        import pyarrow.parquet as pq
+        if not self.is_current(name, artifact_hash): return None
+        if columns is not None:
+            names = set(pq.read_schema(self.path(name)).names)
+            columns = [c for c in columns if c in names]
+        return pq.read_table(self.path(name), columns=columns, memory_map=True).to_pandas()
+
+    def read_all(self, names, columns=None, verify=True):
+        """{name: frame} when every model has current results (checked against its artifacts), else None."""
+        out = {}
+        for name in names:
+            df = self.read(name, columns, model_fingerprint(name) if verify else None)
+            if df is None: return None
+            out[name] = df
+        return out
@@ -0,0 +1,121 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 365      # annualization, as in metrics.summarize
+STATE_VERSION = 1       # bump when the folded quantities change; stale states are refolded
+
+class RiskAccumulator:
+    """Streaming risk stats over one model's daily PnL, updated one settled day at a time.
+
+    Each add_day is O(1) in the history length (O(bets) for that day's streak update), so a
+    persisted state plus the newly closed days gives the same numbers as a full rescan:
+    cumulative PnL, running peak, current/max drawdown (units below the peak, the start
+    counting as a 0u peak), time under water (calendar days since the last peak), Welford
+    mean/variance of daily PnL (Sharpe) and the downside semideviation (Sortino, target 0),
+    win/loss streaks over decided bets in ledger order, and the stake-weighted mean
+    market_drift of the bets (closing-line value proxy; the picks carry no closing odds).
+    """
+    FIELDS = {
+        "version": STATE_VERSION, "through": None, "days": 0, "bets": 0,
+        "cum_pnl": 0.0, "peak": 0.0, "peak_date": None, "max_drawdown": 0.0, "max_underwater_days": 0,
+        "mean": 0.0, "m2": 0.0, "down_sq": 0.0,
+        "streak": 0, "longest_win": 0, "longest_loss": 0,
+        "clv_sum": 0.0, "clv_weight": 0.0,
+    }
+
+    def __init__(self, state=None):
+        self.__dict__.update(self.FIELDS)
+        if state and state.get("version") == STATE_VERSION:
+            self.__dict__.update({k: state[k] for k in self.FIELDS if k in state})
+
+    def to_dict(self):
+        return {k: getattr(self, k) for k in self.FIELDS}
+
+    def add_day(self, day, pnl, outcomes=(), clv_sum=0.0, clv_weight=0.0):
+        """Fold one pick_date (days must arrive in increasing order)."""
+        day = pd.Timestamp(day)
+        if self.through is not None and day <= pd.Timestamp(self.through):
+            raise ValueError(f"Day {day.date()} is not after the last folded day {self.through}")
+        if self.peak_date is None:
+            self.peak_date = str(day.date())
+        pnl = float(pnl)
+        self.days += 1
+        self.bets += len(outcomes)
+        self.cum_pnl += pnl
+        if self.cum_pnl >= self.peak:
+            self.peak, self.peak_date = self.cum_pnl, str(day.date())
+        self.max_drawdown = max(self.max_drawdown, self.peak - self.cum_pnl)
+        self.max_underwater_days = max(self.max_underwater_days, (day - pd.Timestamp(self.peak_date)).days)
+
+        # Welford: one pass, numerically stable
+        delta = pnl - self.mean
+        self.mean += delta / self.days
+        self.m2 += delta * (pnl - self.mean)
+        self.down_sq += min(pnl, 0.0) ** 2
+
+        self._add_streaks(np.asarray(outcomes, dtype=float))
+        self.clv_sum += float(clv_sum)
+        self.clv_weight += float(clv_weight)
+        self.through = str(day.date())
+        return self
+
+    def _add_streaks(self, outcomes):
+        # Runs of wins (+) / losses (-) over decided bets; pushes and pending bets are skipped
+        won = outcomes[(outcomes == 0) | (outcomes == 1)] == 1
+        if not len(won): return
+        starts = np.flatnonzero(np.r_[True, won[1:] != won[:-1]])
+        lengths = np.diff(np.r_[starts, len(won)])
+        signs = np.where(won[starts], 1, -1)
+        # The first run continues the streak carried over from earlier days
+        if self.streak * signs[0] > 0:
+            lengths[0] += abs(self.streak)
+        for sign in (1, -1):
+            runs = lengths[signs == sign]
+            if len(runs):
+                key = "longest_win" if sign > 0 else "longest_loss"
+                setattr(self, key, max(getattr(self, key), int(runs.max())))
+        self.streak = int(signs[-1] * lengths[-1])
+
+    def add_frame(self, res):
+        """Fold every pick_date of a ledger frame (all after the last folded day), in date order."""
+        if res is None or res.empty: return self
+        res = res.loc[:, ~res.columns.duplicated()]
+        stake = pd.to_numeric(res['wager_unit'], errors='coerce').fillna(0)
+        drift = pd.to_numeric(res['market_drift'], errors='coerce') if 'market_drift' in res.columns else pd.Series(np.nan, index=res.index)
+        has = drift.notna()
+        frame = pd.DataFrame({
+            'pick_date': res['pick_date'],
+            'pnl': pd.to_numeric(res['profit_actual'], errors='coerce').fillna(0),
+            'outcome': pd.to_numeric(res['outcome'], errors='coerce'),
+            'clv_sum': (drift.fillna(0) * stake).where(has, 0.0),
+            'clv_weight': stake.where(has, 0.0),
+        })
+        for day, g in frame.groupby('pick_date', sort=True):
+            self.add_day(day, g['pnl'].sum(), g['outcome'].to_numpy(), g['clv_sum'].sum(), g['clv_weight'].sum())
+        return self
+
+    def summary(self):
+        """Risk stats as plain floats/ints (JSON-ready)."""
+        std = math.sqrt(self.m2 / (self.days - 1)) if self.days > 1 else 0.0
+        downside = math.sqrt(self.down_sq / self.days) if self.days else 0.0
+        scale = math.sqrt(TRADING_DAYS)
+        underwater = (pd.Timestamp(self.through) - pd.Timestamp(self.peak_date)).days if self.through else 0
+        return {
+            "through": self.through,
+            "days": self.days,
+            "cum_pnl": round(self.cum_pnl, 2),
+            "peak": round(self.peak, 2),
+            "drawdown": round(self.peak - self.cum_pnl, 2),
+            "max_drawdown": round(self.max_drawdown, 2),
+            "time_under_water": underwater,
+            "max_time_under_water": self.max_underwater_days,
+            "sharpe": round(self.mean / (std + 1e-6) * scale, 2) if self.days else 0.0,
+            # Undefined without a losing day
+            "sortino": round(self.mean / downside * scale, 2) if downside > 0 else None,
+            "streak": self.streak,
+            "longest_win_streak": self.longest_win,
+            "longest_loss_streak": self.longest_loss,
+            "clv": round(self.clv_sum / self.clv_weight, 4) if self.clv_weight > 0 else None,
+        }
@@ -0,0 +1,35 @@
+class RunContext:
+    """Data one pipeline run shares between its stages, so nothing is fetched or simulated twice.
+
+    raw: synced picks frame, features: engineered frame, models: {name: ledger frame}.
+    Each field is given as a value or as a zero-argument loader that runs on first access
+    (e.g. reading a skipped stage's cached output); unset fields raise AttributeError.
+    """
+    FIELDS = ('raw', 'features', 'models')
+
+    def __init__(self, **fields):
+        self._values, self._loaders = {}, {}
+        for name, value in fields.items():
+            self.set(name, value)
+
+    def set(self, name, value):
+        if name not in self.FIELDS:
+            raise ValueError(f"Unknown run context field '{name}' (expected one of {self.FIELDS})")
+        if callable(value):
+            self._loaders[name] = value
+            self._values.pop(name, None)
+        else:
+            self._values[name] = value
+        return self
+
+    def has(self, name):
+        return name in self._values or name in self._loaders
+
+    def __getattr__(self, name):
+        if name not in RunContext.FIELDS:
+            raise AttributeError(name)
+        if name not in self._values:
+            if name not in self._loaders:
+                raise AttributeError(f"Run context has no '{name}'")
+            self._values[name] = self._loaders.pop(name)()
+        return self._values[name]
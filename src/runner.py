@@ -0,0 +1,144 @@
+import os
+import time
+import tempfile
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+try:
+    from instrumentation import tracer
+except ModuleNotFoundError:
+    from src.instrumentation import tracer
+
+# Model key -> ModelSimulator method (dashboard ordering)
+SIMULATIONS = {
+    "pyrite": "run_v1_pyrite",
+    "diamond": "run_v2_diamond",
+    "obsidian": "run_v3_obsidian",
+    "quartz": "run_v4_quartz",
+}
+
+# Native thread pools honoured by xgboost / lightgbm / sklearn (OpenMP + BLAS)
+THREAD_ENV_VARS = ['OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS']
+
+def thread_budget(workers, total=None):
+    """Split the CPU budget evenly so N parallel simulations never oversubscribe."""
+    total = total or os.cpu_count() or 1
+    return max(1, total // max(1, workers))
+
+def _pin_threads(n_threads):
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(n_threads)
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(limits=n_threads)
+    except ImportError:
+        pass
+
+def _write_shared_frame(df, path):
+    """Persist the feature frame as an uncompressed Arrow IPC file (memory-mappable)."""
+    import pyarrow as pa
+    from ledger import arrow_safe
+    table = pa.Table.from_pandas(arrow_safe(df), preserve_index=False)
+    with pa.OSFile(path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+def _read_shared_frame(path):
+    import pyarrow as pa
+    with pa.memory_map(path, 'r') as source:
+        return pa.ipc.open_file(source).read_all().to_pandas()
+
+# --- WORKER STATE (one feature frame per process, loaded once) ---
+_WORKER = {}
+
+def _init_worker(shared_path, n_threads, src_dir):
+    _pin_threads(n_threads)
+    import sys
+    if src_dir not in sys.path:
+        sys.path.append(src_dir)
+    _WORKER['path'] = shared_path
+    _WORKER['n_threads'] = n_threads
+
+def _run_one(name, simulator=None):
+    """Run a single model simulation; returns (name, frame, wall_s, cpu_s)."""
+    t0, c0 = time.perf_counter(), time.process_time()
+    if simulator is None:
+        from models import ModelSimulator
+        if 'df' not in _WORKER:
+            _WORKER['df'] = _read_shared_frame(_WORKER['path'])
+        simulator = ModelSimulator(_WORKER['df'], n_jobs=_WORKER['n_threads'])
+    try:
+        res = getattr(simulator, SIMULATIONS[name])()
+    except Exception as e:
+        print(f"Error {name.upper()}: {e}")
+        traceback.print_exc()
+        res = pd.DataFrame()
+    return name, res, time.perf_counter() - t0, time.process_time() - c0
+
+class SimulationRunner:
+    """Executes the four model simulations concurrently against one shared feature frame.
+
+    The frame is written once to a memory-mapped Arrow file; workers map it instead of
+    receiving a pickled copy. Falls back to in-process sequential runs when only one
+    worker is requested or the pool cannot be started.
+    """
+    def __init__(self, df, workers=None, models=None, total_threads=None):
+        self.df = df
+        self.models = list(models or SIMULATIONS.keys())
+        cpus = total_threads or os.cpu_count() or 1
+        self.workers = max(1, min(workers or cpus, len(self.models)))
+        self.n_threads = thread_budget(self.workers, cpus)
+
+    def _run_sequential(self):
+        from models import ModelSimulator
+        sim = ModelSimulator(self.df, n_jobs=self.n_threads)
+        return [_run_one(name, sim) for name in self.models]
+
+    def _run_parallel(self):
+        src_dir = os.path.dirname(os.path.abspath(__file__))
+        with tempfile.TemporaryDirectory(prefix='quarry_sim_') as tmp:
+            shared_path = os.path.join(tmp, 'features.arrow')
+            _write_shared_frame(self.df, shared_path)
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                     initargs=(shared_path, self.n_threads, src_dir)) as pool:
+                futures = [pool.submit(_run_one, name) for name in self.models]
+                return [f.result() for f in futures]
+
+    def run(self):
+        """Returns {"models": {name: frame}, "timings": {name: {...}}, "workers": n, "threads_per_worker": n}."""
+        t0 = time.perf_counter()
+        mode = 'parallel' if self.workers > 1 else 'sequential'
+        with tracer.span('simulate', rows_in=len(self.df)) as sp:
+            if self.workers > 1:
+                try:
+                    runs = self._run_parallel()
+                except Exception as e:
+                    print(f"⚠️ Parallel simulation unavailable ({e}). Falling back to sequential.")
+                    mode = 'sequential'
+                    runs = self._run_sequential()
+            else:
+                runs = self._run_sequential()
+            # Per-model times are measured where the model ran (possibly a worker process)
+            for name, res, wall, cpu in runs:
+                tracer.record(name, round(wall, 4), round(cpu, 4), rows_out=len(res))
+            sp.rows_out = sum(len(r[1]) for r in runs)
+            sp.set(mode=mode, workers=self.workers if mode == 'parallel' else 1, threads_per_worker=self.n_threads)
+
+        report = {
+            "models": {},
+            "timings": {},
+            "mode": mode,
+            "workers": self.workers if mode == 'parallel' else 1,
+            "threads_per_worker": self.n_threads,
+        }
+        for name, res, wall, cpu in runs:
+            report["models"][name] = res
+            report["timings"][name] = {"wall_s": round(wall, 3), "cpu_s": round(cpu, 3), "rows": len(res)}
+        report["timings"]["total"] = {"wall_s": round(time.perf_counter() - t0, 3)}
+        return report
+
+def run_simulations(df, workers=None, models=None):
+    """Convenience wrapper used by the daily pipeline."""
+    return SimulationRunner(df, workers=workers, models=models).run()
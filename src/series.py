@@ -0,0 +1,72 @@
+import os
+import gzip
+import json
+
+import numpy as np
+import pandas as pd
+
+SERIES_POINTS = 500     # point budget per exported curve
+SERIES_PATH = os.path.join('docs', '{name}_series.json.gz')
+
+def lttb(x, y, n_out):
+    """Indices kept by Largest-Triangle-Three-Buckets downsampling to n_out points.
+
+    The first and last points are always kept; the interior is split into n_out - 2 equal
+    buckets and each keeps the point spanning the largest triangle with the previously kept
+    point and the next bucket's mean, so peaks, troughs and drawdowns survive.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            cx, cy = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+def _points(dates, values, n_out):
+    keep = lttb(np.arange(len(values)), values, n_out)
+    return {"date": pd.DatetimeIndex(dates[keep]).strftime('%Y-%m-%d').tolist(),
+            "value": np.round(values[keep], 2).tolist()}
+
+def model_series(res, points=SERIES_POINTS):
+    """Downsampled equity curve (cumulative units after each bet, from a 0u origin) and daily PnL."""
+    if res is None or res.empty or 'profit_actual' not in res.columns:
+        return {"through": None, "bets": 0, "days": 0, "equity": {"date": [], "value": []}, "daily_pnl": {"date": [], "value": []}}
+    res = res.loc[:, ~res.columns.duplicated()].sort_values('pick_date', kind='stable')
+    dates = pd.to_datetime(res['pick_date']).to_numpy()
+    pnl = pd.to_numeric(res['profit_actual'], errors='coerce').fillna(0).to_numpy(dtype=float)
+    equity = np.r_[0.0, np.cumsum(pnl)]
+    daily = pd.Series(pnl).groupby(dates, sort=True).sum()
+    return {
+        "through": pd.Timestamp(dates[-1]).strftime('%Y-%m-%d'),
+        "bets": len(pnl),
+        "days": len(daily),
+        "equity": _points(np.r_[dates[:1], dates], equity, points),
+        "daily_pnl": _points(daily.index.to_numpy(), daily.to_numpy(), points),
+    }
+
+def export_series(models, points=SERIES_POINTS, path=SERIES_PATH):
+    """Write one pre-gzipped compact JSON of model_series per model; returns {name: path}.
+
+    gzip's header timestamp is zeroed so unchanged series produce byte-identical files.
+    """
+    out = {}
+    for name, res in models.items():
+        payload = {"model": name, "points": points, **model_series(res, points)}
+        target = path.format(name=name)
+        os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(gzip.compress(json.dumps(payload, separators=(',', ':')).encode(), mtime=0))
+        out[name] = target
+    return out
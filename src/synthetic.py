@@ -0,0 +1,176 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+END_DATE = '2026-06-30'
+PICKS_PER_DAY = 400             # history length scales with size, clipped to MIN/MAX_DAYS
+MIN_DAYS, MAX_DAYS = 60, 730
+
+# (league_id, source name, dashboard name as mapped by SportsDataPipeline.fetch_data, sport, share, teams)
+LEAGUES = [
+    (1, 'NBA', 'NBA', 'Basketball', 0.24, 30), (2, 'NCAAB', 'NCAAB', 'Basketball', 0.18, 120),
+    (3, 'NFL', 'NFL', 'Football', 0.08, 32), (4, 'NCAAF', 'NCAAF', 'Football', 0.06, 100),
+    (5, 'NHL', 'NHL', 'Hockey', 0.12, 32), (6, 'MLB', 'MLB', 'Baseball', 0.12, 30),
+    (7, 'WNBA', 'WNBA', 'Basketball', 0.02, 12), (8, 'UFC', 'Combat', 'MMA', 0.04, 60),
+    (9, 'EPL', 'Soccer', 'Soccer', 0.05, 20), (10, 'TENNIS', 'Tennis', 'Tennis', 0.05, 80),
+    (11, 'KBO', 'Other', 'Baseball', 0.04, 10),
+]
+# Teams the pick normalizer abbreviates; their abbreviations show up as surface variants
+NBA_TEAMS = ['golden state warriors', 'los angeles lakers', 'philadelphia', 'phoenix', 'boston', 'dallas', 'chicago']
+ABBREVS = {'golden state warriors': 'gsw', 'los angeles lakers': 'lal', 'philadelphia': 'phi', 'phoenix': 'phx',
+           'boston': 'bos', 'dallas': 'dal', 'chicago': 'chi'}
+
+def _team_names(source, teams):
+    names = [f"{source.lower()} team {i}" for i in range(teams)]
+    return NBA_TEAMS + names[len(NBA_TEAMS):] if source == 'NBA' else names
+
+TEAMS = np.array([l[5] for l in LEAGUES])
+OFFSETS = np.r_[0, np.cumsum(TEAMS)[:-1]]
+MAX_GAMES = int(TEAMS.max()) // 2
+TEAM_NAMES = np.array([t for l in LEAGUES for t in _team_names(l[1], l[5])], dtype=object)
+ABBREVIATED = np.array([ABBREVS.get(t, t) for t in TEAM_NAMES], dtype=object)
+
+UNITS = np.array(['1', '2', '1.5', '0.5', '3', None], dtype=object)
+UNIT_P = [0.50, 0.15, 0.10, 0.10, 0.05, 0.10]
+BET_TYPES = ['ml', 'spread', 'total']               # bet_type_id 1..3
+BET_TYPE_P = [0.45, 0.35, 0.20]
+
+def _mix(*keys):
+    """Deterministic int64 hash of integer arrays (same market -> same line on every pick)."""
+    h = np.zeros(np.broadcast(*keys).shape, dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for k in keys:
+            h = (h ^ np.asarray(k).astype(np.uint64)) * np.uint64(0x9E3779B97F4A7C15)
+            h ^= h >> np.uint64(29)
+    return (h >> np.uint64(1)).astype(np.int64)
+
+class SyntheticPicks:
+    """Vectorized generator of raw picks in the schema SportsDataPipeline.fetch_data returns.
+
+    The universe (cappers, their activity, home league and skill) is fixed by n and seed, and
+    picks are drawn in chunks from it, so any size up to tens of millions can be streamed.
+    Shapes follow the live feed: a heavy-tailed (lognormal) capper activity, so a minority of
+    cappers posts most picks, a per-capper home league over the global league mix, volume growing over time,
+    and many cappers posting the same market each day (moneyline, spread or total with a
+    per-game line), so pick strings repeat and consensus groups form; about a tenth of the
+    strings use surface variants the normalizer folds back (case, spacing, 'pk', team
+    abbreviations, '.0'). Results: win/loss from the odds' implied probability plus the
+    capper's skill, with pushes, voids and the newest day still pending.
+    """
+    def __init__(self, n, seed=0, end=END_DATE, days=None, cappers=None):
+        self.n, self.seed = int(n), seed
+        self.days = int(days or np.clip(np.ceil(n / PICKS_PER_DAY), MIN_DAYS, MAX_DAYS))
+        self.end = pd.Timestamp(end).normalize()
+        self.start = self.end - pd.Timedelta(days=self.days - 1)
+        rng = np.random.default_rng(np.random.SeedSequence([seed, 0]))
+        self.n_cappers = int(cappers or max(50, 8 * np.sqrt(n)))
+        activity = rng.lognormal(0.0, 1.3, self.n_cappers)
+        self.capper_p = activity / activity.sum()
+        share = np.array([l[4] for l in LEAGUES])
+        self.league_p = share / share.sum()
+        self.capper_home = rng.choice(len(LEAGUES), self.n_cappers, p=self.league_p)
+        self.capper_skill = rng.normal(0.0, 0.03, self.n_cappers)
+        self.capper_names = np.array([f"capper_{i:06d}" for i in range(self.n_cappers)], dtype=object)
+
+    def chunk(self, rows, offset=0, seed=None):
+        """rows picks with ids offset.. (unsorted); seed defaults to one derived from offset."""
+        rng = np.random.default_rng(np.random.SeedSequence([self.seed, 1, offset if seed is None else seed]))
+        capper = rng.choice(self.n_cappers, rows, p=self.capper_p)
+        league = np.where(rng.random(rows) < 0.5, self.capper_home[capper], rng.choice(len(LEAGUES), rows, p=self.league_p))
+        # Volume grows over the history (density rises linearly towards the newest day)
+        day = np.minimum((np.sqrt(rng.random(rows)) * self.days).astype(np.int64), self.days - 1)
+        # Popular games draw most picks (Zipf over the day's slate)
+        game = np.minimum(rng.zipf(1.6, rows) - 1, TEAMS[league] // 2 - 1)
+        side = rng.integers(0, 2, rows)
+        btype = rng.choice(3, rows, p=BET_TYPE_P)
+        variant = np.where(rng.random(rows) < 0.1, rng.integers(1, 5, rows), 0)
+
+        # Odds: mostly near -110, some underdogs and heavy favorites
+        kind = rng.choice(3, rows, p=[0.6, 0.25, 0.15])
+        odds = np.select([kind == 0, kind == 1], [rng.integers(-130, -104, rows), rng.integers(100, 251, rows)],
+                         rng.integers(-300, -130, rows)).astype(float)
+        implied = np.where(odds > 0, 100, -odds) / (np.abs(odds) + 100)
+        p_win = np.clip(implied * 0.955 + self.capper_skill[capper], 0.02, 0.98)
+        u = rng.random(rows)
+        won = rng.random(rows) < p_win
+        result = np.where(won, np.where(u < 0.8, 'win', 'Won'), np.where(u < 0.8, 'loss', 'Lost')).astype(object)
+        result[u > 0.975] = 'push'
+        result[u > 0.995] = 'void'
+        pending = (day == self.days - 1) | ((day >= self.days - 3) & (rng.random(rows) < 0.02))
+        result[pending] = None
+
+        pick_value = self._pick_strings(league, day, game, side, btype, variant)
+        league_id = np.array([l[0] for l in LEAGUES], dtype=np.int64)[league]
+        return pd.DataFrame({
+            'id': np.arange(offset, offset + rows, dtype=np.int64),
+            'pick_date': self.start + pd.to_timedelta(day, unit='D'),
+            'pick_value': pick_value,
+            'unit': UNITS[rng.choice(len(UNITS), rows, p=UNIT_P)],
+            'odds_american': odds,
+            'result': result,
+            'capper_id': capper.astype(np.int64),
+            'league_id': league_id,
+            'bet_type_id': btype + 1,
+            'id_capper': capper.astype(np.int64),
+            'canonical_name': self.capper_names[capper],
+            'id_league': league_id,
+            'league_name': np.array([l[2] for l in LEAGUES], dtype=object)[league],
+            'sport': np.array([l[3] for l in LEAGUES], dtype=object)[league],
+        })
+
+    def _pick_strings(self, league, day, game, side, btype, variant):
+        # Strings are formatted once per distinct (market, variant) and gathered by code
+        key = ((((league.astype(np.int64) * self.days + day) * MAX_GAMES + game) * 2 + side) * 3 + btype) * 5 + variant
+        codes, uniq = pd.factorize(key)
+        uniq, variant = np.divmod(uniq, 5)
+        uniq, btype = np.divmod(uniq, 3)
+        uniq, side = np.divmod(uniq, 2)
+        uniq, game = np.divmod(uniq, MAX_GAMES)
+        league, day = np.divmod(uniq, self.days)
+
+        teams = TEAMS[league]
+        a, b = OFFSETS[league] + (2 * game + day) % teams, OFFSETS[league] + (2 * game + 1 + day) % teams
+        h = _mix(league, day, game)
+        # Per-game lines shared by every capper on that market (spread side B takes the other side)
+        spread = (h % 15 - 7) + np.where(h % 3 > 0, 0.5, 0.0)
+        spread = np.where(side == 0, spread, -spread)
+        total = 40 + h % 180 + np.where(h % 2 > 0, 0.5, 0.0)
+        team = np.where(side == 0, a, b)
+        name = np.where(variant == 3, ABBREVIATED[team], TEAM_NAMES[team])
+        vocab = [self._format(*row) for row in zip(name, TEAM_NAMES[a], TEAM_NAMES[b], side.tolist(), btype.tolist(),
+                                                  variant.tolist(), spread.tolist(), total.tolist())]
+        return np.array(vocab, dtype=object)[codes]
+
+    @staticmethod
+    def _format(team, home, away, side, btype, variant, spread, total):
+        if btype == 0:
+            s = f"{team} ml"
+        elif btype == 1:
+            if spread == 0: s = f"{team} {'pk' if variant == 4 else '0'}"
+            elif spread == int(spread) and variant == 4: s = f"{team} {spread:+.1f}"
+            else: s = f"{team} {spread:+g}"
+        else:
+            s = f"{home} vs {away} {'over' if side == 0 else 'under'} {total:g}"
+        if variant == 1: s = s.upper()
+        elif variant == 2: s = s.replace(' ', '  ', 1) + ' '
+        return s
+
+    def frames(self, chunk_rows=1_000_000):
+        """Yield the n picks as chunks of up to chunk_rows."""
+        for offset in range(0, self.n, chunk_rows):
+            yield self.chunk(min(chunk_rows, self.n - offset), offset)
+
+def synthetic_picks(n, seed=0, **kwargs):
+    """n synthetic raw picks in one frame, sorted by pick_date like fetch_data."""
+    gen = SyntheticPicks(n, seed, **kwargs)
+    return pd.concat(list(gen.frames()), ignore_index=True).sort_values('pick_date', kind='stable').reset_index(drop=True)
+
+def write_synthetic_lake(path, n, seed=0, chunk_rows=1_000_000, **kwargs):
+    """Stream n synthetic picks to a directory of parquet parts (bounded memory); returns the part paths."""
+    os.makedirs(path, exist_ok=True)
+    parts = []
+    for i, frame in enumerate(SyntheticPicks(n, seed, **kwargs).frames(chunk_rows)):
+        parts.append(os.path.join(path, f'part-{i:05d}.parquet'))
+        frame.to_parquet(parts[-1], index=False)
+    return parts
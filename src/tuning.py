@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import optuna
+
+try:
+    from instrumentation import tracer
+except ModuleNotFoundError:
+    from src.instrumentation import tracer
+
+TUNING_DIR = os.path.join('data', 'optuna')
+TUNED_PARAMS_PATH = os.path.join('models', 'v4_tuned_params.json')
+MAX_TREES = 2000        # Upper bound per member; early stopping picks the real count
+
+def storage_url(path):
+    return f"sqlite:///{os.path.abspath(path)}"
+
+def _storage(url):
+    # Several worker processes share one SQLite file: wait on locks instead of failing
+    return optuna.storages.RDBStorage(url, engine_kwargs={"connect_args": {"timeout": 60}})
+
+def make_pruner(kind='median'):
+    if kind == 'halving':
+        return optuna.pruners.SuccessiveHalvingPruner(min_resource=1, reduction_factor=2)
+    return optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=1, interval_steps=1)
+
+def suggest_params(trial):
+    """Search space over both members and the soft-voting weights (binning params stay fixed so cached bins apply)."""
+    xgb_params = {
+        'n_estimators': MAX_TREES,
+        'learning_rate': trial.suggest_float('xgb_learning_rate', 0.005, 0.2, log=True),
+        'max_depth': trial.suggest_int('xgb_max_depth', 2, 8),
+        'min_child_weight': trial.suggest_float('xgb_min_child_weight', 1.0, 50.0, log=True),
+        'subsample': trial.suggest_float('xgb_subsample', 0.5, 1.0),
+        'colsample_bytree': trial.suggest_float('xgb_colsample_bytree', 0.4, 1.0),
+        'reg_lambda': trial.suggest_float('xgb_reg_lambda', 1e-3, 50.0, log=True),
+    }
+    lgb_params = {
+        'n_estimators': MAX_TREES,
+        'learning_rate': trial.suggest_float('lgb_learning_rate', 0.005, 0.2, log=True),
+        'num_leaves': trial.suggest_int('lgb_num_leaves', 7, 127, log=True),
+        'min_child_samples': trial.suggest_int('lgb_min_child_samples', 10, 300, log=True),
+        'feature_fraction': trial.suggest_float('lgb_feature_fraction', 0.4, 1.0),
+        'bagging_fraction': trial.suggest_float('lgb_bagging_fraction', 0.5, 1.0),
+        'bagging_freq': 1,
+        'lambda_l2': trial.suggest_float('lgb_lambda_l2', 1e-3, 50.0, log=True),
+    }
+    w = trial.suggest_float('xgb_weight', 0.0, 1.0)
+    return {'xgb': xgb_params, 'lgb': lgb_params, 'weights': [w, 1.0 - w]}
+
+def params_from_trial(trial):
+    """Shippable params for a finished trial: search values plus its CV tree counts."""
+    params = suggest_params(optuna.trial.FixedTrial(trial.params))
+    for m in ('xgb', 'lgb'):
+        params[m]['n_estimators'] = int(trial.user_attrs.get(f'n_estimators_{m}', params[m]['n_estimators']))
+    return params
+
+def _objective(trial, sniper, df, folds, key, cache_dir, n_threads, early_stopping_rounds):
+    from sklearn.metrics import log_loss
+    params = suggest_params(trial)
+    w = np.asarray(params['weights'])
+    losses, trees = [], {'xgb': [], 'lgb': []}
+    y = df[sniper.target].values
+    for fold, (tr, va) in enumerate(folds):
+        p_xgb, p_lgb, best = sniper.fit_fold(df, key, fold, tr, va, cache_dir, n_threads, early_stopping_rounds,
+                                             xgb_params=params['xgb'], lgb_params=params['lgb'])
+        p = np.clip(w[0] * p_xgb + w[1] * p_lgb, 1e-6, 1 - 1e-6)
+        losses.append(log_loss(y[va], p, labels=[0, 1]))
+        for m in trees: trees[m].append(best[m])
+        # One step per fold: poor configs stop after the early (cheap, small-train) folds
+        trial.report(float(np.mean(losses)), step=fold)
+        if trial.should_prune():
+            raise optuna.TrialPruned()
+    for m in trees:
+        trial.set_user_attr(f'n_estimators_{m}', int(np.median(trees[m])))
+    return float(np.mean(losses))
+
+# --- WORKER (shares runner's per-process frame state) ---
+def _tune_worker(job):
+    """Run this worker's share of trials against the shared study; returns (trials run, wall seconds)."""
+    from runner import _WORKER as shared, _read_shared_frame
+    t0 = time.perf_counter()
+    if 'df' not in shared:
+        shared['df'] = _read_shared_frame(shared['path'])
+    n = _optimize(shared['df'], job, shared['n_threads'])
+    return n, time.perf_counter() - t0
+
+def _optimize(df, job, n_threads):
+    from v4_quantum_sniper import QuantumSniperV4, date_folds
+    sniper = QuantumSniperV4()
+    folds = date_folds(df['pick_date'], job['n_splits'])
+    study = optuna.load_study(study_name=job['study_name'], storage=_storage(job['storage']),
+                              sampler=optuna.samplers.TPESampler(seed=job['seed']),
+                              pruner=make_pruner(job['pruner']))
+    before = len(study.trials)
+    study.optimize(lambda t: _objective(t, sniper, df, folds, job['key'], job['cache_dir'], n_threads, job['early_stopping_rounds']),
+                   n_trials=job['n_trials'], timeout=job['timeout'], gc_after_trial=False)
+    return len(study.trials) - before
+
+class TuningEngine:
+    """Parallel Optuna search over the v4 ensemble's member hyperparameters and voting weights.
+
+    Every trial runs the same day-aligned time-series CV as QuantumSniperV4.train_cv, with early
+    stopping inside each fold, and reports the running mean fold logloss so the pruner can stop
+    bad trials after the first folds. Worker processes share one SQLite study (resumable across
+    runs) and one memory-mapped feature frame; each gets an equal share of the CPU threads.
+    Fold bins are cached (LightGBM on disk, XGBoost per process), so trials only pay for boosting.
+    """
+    def __init__(self, df, study_name='v4_quantum_sniper', n_trials=100, timeout=None, workers=None,
+                 n_splits=5, early_stopping_rounds=50, pruner='median', seed=42, storage=None, cache_dir=None):
+        from runner import thread_budget
+        from v4_quantum_sniper import QuantumSniperV4, CV_CACHE_DIR
+        sniper = QuantumSniperV4()
+        self.df = sniper.prepare(df).reset_index(drop=True)
+        self.study_name = study_name
+        self.n_trials = n_trials
+        self.timeout = timeout
+        self.n_splits = n_splits
+        self.early_stopping_rounds = early_stopping_rounds
+        self.pruner = pruner
+        self.seed = seed
+        self.storage = storage or storage_url(os.path.join(TUNING_DIR, 'v4_tuning.db'))
+        self.cache_dir = cache_dir or CV_CACHE_DIR
+        self.key = sniper.cv_key(self.df, n_splits)
+        cpus = os.cpu_count() or 1
+        self.workers = max(1, min(workers or cpus, n_trials))
+        self.n_threads = thread_budget(self.workers, cpus)
+
+    def _jobs(self):
+        share = [self.n_trials // self.workers + (i < self.n_trials % self.workers) for i in range(self.workers)]
+        return [{'study_name': self.study_name, 'storage': self.storage, 'n_trials': n, 'timeout': self.timeout,
+                 'n_splits': self.n_splits, 'early_stopping_rounds': self.early_stopping_rounds, 'pruner': self.pruner,
+                 'seed': self.seed + i, 'key': self.key, 'cache_dir': self.cache_dir} for i, n in enumerate(share)]
+
+    def _run_parallel(self, jobs):
+        from runner import _write_shared_frame, _init_worker
+        src_dir = os.path.dirname(os.path.abspath(__file__))
+        with tempfile.TemporaryDirectory(prefix='quarry_tune_') as tmp:
+            shared_path = os.path.join(tmp, 'features.arrow')
+            _write_shared_frame(self.df, shared_path)
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                     initargs=(shared_path, self.n_threads, src_dir)) as pool:
+                return list(pool.map(_tune_worker, jobs))
+
+    def run(self):
+        """Returns the study (best trial = lowest mean CV logloss)."""
+        if self.storage.startswith('sqlite:///'):
+            os.makedirs(os.path.dirname(self.storage[len('sqlite:///'):]), exist_ok=True)
+        study = optuna.create_study(study_name=self.study_name, storage=_storage(self.storage),
+                                    direction='minimize', load_if_exists=True)
+        study.set_user_attr('data_key', self.key)
+        done = len(study.trials)
+        print(f"🎛️ Tuning '{self.study_name}': {self.n_trials} trials ({done} already stored) on "
+              f"{self.workers} worker(s) x {self.n_threads} thread(s), {self.n_splits}-fold time-series CV...")
+
+        jobs = self._jobs()
+        with tracer.span('tuning', rows_in=len(self.df)) as sp:
+            runs = None
+            if self.workers > 1:
+                try:
+                    runs = self._run_parallel(jobs)
+                except Exception as e:
+                    print(f"⚠️ Parallel tuning unavailable ({e}). Falling back to sequential.")
+            if runs is None:
+                job = {**jobs[0], 'n_trials': self.n_trials}
+                t0 = time.perf_counter()
+                runs = [(_optimize(self.df, job, self.n_threads), time.perf_counter() - t0)]
+            for i, (n, wall) in enumerate(runs):
+                tracer.record(f"worker_{i:02d}", wall, None, rows_out=n)
+            study = optuna.load_study(study_name=self.study_name, storage=_storage(self.storage))
+            sp.rows_out = len(study.trials) - done
+        return study
+
+def save_best(study, path=TUNED_PARAMS_PATH):
+    """Write the best trial's params (with CV tree counts) for build_ensemble / train_cv."""
+    best = study.best_trial
+    params = {**params_from_trial(best), 'value': best.value, 'trial': best.number, 'study': study.study_name,
+              'data_key': study.user_attrs.get('data_key')}
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(params, f, indent=4)
+    return params
+
+def run_tuning(df, **kwargs):
+    """Convenience wrapper; kwargs are TuningEngine options."""
+    return TuningEngine(df, **kwargs).run()
@@ -1,4 +1,9 @@
 import os
+import copy
+import time
+import hashlib
+import argparse
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
 import joblib
@@ -9,10 +14,71 @@ from sklearn.ensemble import VotingClassifier
 from sklearn.model_selection import TimeSeriesSplit
 import optuna
 from pipeline import SportsDataPipeline, FeatureEngineer
+from model_versions import ModelVersions, feature_profile, psi
 import warnings
 
 warnings.filterwarnings('ignore')
 
+CV_CACHE_DIR = os.path.join('data', 'cv')
+
+# Member hyperparameters (sklearn names); the native CV path translates them
+XGB_PARAMS = dict(n_estimators=500, learning_rate=0.02, max_depth=5,
+                  subsample=0.8, colsample_bytree=0.8, tree_method='hist', random_state=42)
+LGB_PARAMS = dict(n_estimators=500, learning_rate=0.02, num_leaves=31,
+                  feature_fraction=0.8, bagging_fraction=0.8, random_state=42, verbose=-1)
+
+# QuantileDMatrix cannot be written to disk, so binned XGBoost folds are reused per process
+# (least recently used first out: enough for one CV configuration across tuning trials)
+_QDM_CACHE = OrderedDict()
+QDM_CACHE_FOLDS = 10
+# Tail of each fold's training days held out for early stopping; the validation days stay untouched
+ES_FRACTION = 0.15
+
+def data_hash(df, cols):
+    """Content hash of the training columns (row order included)."""
+    h = hashlib.sha256(json.dumps(cols).encode())
+    if len(df):
+        h.update(pd.util.hash_pandas_object(df[cols], index=False).values.tobytes())
+    h.update(str(len(df)).encode())
+    return h.hexdigest()[:20]
+
+def date_folds(dates, n_splits=5):
+    """TimeSeriesSplit over calendar days, so a day's picks never straddle train and validation."""
+    days = np.sort(pd.Series(dates).unique())
+    if len(days) <= n_splits: return []
+    pos = np.searchsorted(days, np.asarray(dates))
+    return [(np.flatnonzero(np.isin(pos, tr)), np.flatnonzero(np.isin(pos, va)))
+            for tr, va in TimeSeriesSplit(n_splits=n_splits).split(days)]
+
+def early_stopping_split(dates, tr, frac=ES_FRACTION):
+    """Split a fold's training rows into (fit, stop): stop is the last frac of its calendar days.
+
+    With a single training day there is nothing to hold out; the fit rows then double as the
+    stopping set (early stopping never triggers, the full tree count is used).
+    """
+    days = np.unique(dates[tr])
+    n_stop = min(max(1, int(round(len(days) * frac))), len(days) - 1)
+    if n_stop < 1: return tr, tr
+    stop = dates[tr] >= days[-n_stop]
+    return tr[~stop], tr[stop]
+
+def load_tuned_params(path='models/v4_tuned_params.json'):
+    """Best trial written by the tuner ({'xgb': {...}, 'lgb': {...}, 'weights': [...]}), or None."""
+    if not os.path.exists(path): return None
+    with open(path) as f:
+        return json.load(f)
+
+def xgb_native_params(params, n_jobs):
+    p = {k: v for k, v in xgb.XGBClassifier(**params, n_jobs=n_jobs).get_xgb_params().items() if v is not None}
+    p['eval_metric'] = 'logloss'
+    return p
+
+def lgb_native_params(params, n_jobs):
+    p = {k: v for k, v in params.items() if k not in ('n_estimators', 'random_state')}
+    p.update(objective='binary', metric='binary_logloss', seed=params.get('random_state', 42),
+             num_threads=max(n_jobs, 0), feature_pre_filter=False)
+    return p
+
 class QuantumSniperV4:
     def __init__(self):
         self.features = [
@@ -25,7 +91,11 @@ class QuantumSniperV4:
             'capper_roi_std_30d', 'capper_win_rate_30d', 'v4_consensus_count_lag1'
         ]
         self.target = 'outcome'
+        # Cumulative counts grow by construction; they would always read as drift
+        self.drift_exempt = ['capper_experience']
         self.model = None
+        self.lineage = None     # Manifest fields of the last fit (written with the versioned artifact)
+        self.trained_ids = None
 
     def fetch_and_prepare(self):
         print("🔗 Fetching data and engineering v4 features...")
@@ -33,59 +103,283 @@ class QuantumSniperV4:
         raw_df = pipeline.fetch_data()
         engineer = FeatureEngineer(raw_df)
         df = engineer.process()
-        
-        # Filter for training (binary outcomes only)
+        return self.prepare(df)
+
+    def prepare(self, df):
+        """Filter an engineered frame for training (binary outcomes only)."""
+        if 'settled' in df.columns:
+            # FeatureEngineer fills pending outcomes with 0; never train on them as losses
+            df = df[df['settled'].astype(bool)]
         df = df[df['outcome'].isin([0.0, 1.0])].copy()
         df['outcome'] = df['outcome'].astype(int)
         df = df.dropna(subset=self.features).sort_values('pick_date')
         return df
 
-    def train_ensemble(self, df):
-        print(f"🚀 Training Quantum Sniper v4 Ensemble on {len(df)} rows...")
-        X = df[self.features]
-        y = df[self.target]
-        
+    def build_ensemble(self, n_jobs=-1, n_estimators=None, params=None):
+        """Unfitted soft-voting ensemble. n_jobs caps booster threads (walk-forward workers pass their budget).
+
+        n_estimators optionally overrides tree counts per member, e.g. {'xgb': 180, 'lgb': 240} from CV;
+        params overrides member hyperparameters and voting weights (see load_tuned_params).
+        """
+        n_estimators, params = n_estimators or {}, params or {}
+        xgb_params, lgb_params = {**XGB_PARAMS, **params.get('xgb', {})}, {**LGB_PARAMS, **params.get('lgb', {})}
         # Models
-        xgb_model = xgb.XGBClassifier(
-            n_estimators=500, learning_rate=0.02, max_depth=5, 
-            subsample=0.8, colsample_bytree=0.8, n_jobs=-1,
-            tree_method='hist', random_state=42
-        )
+        xgb_model = xgb.XGBClassifier(**{**xgb_params, 'n_estimators': n_estimators.get('xgb', xgb_params['n_estimators'])}, n_jobs=n_jobs)
+        lgb_model = lgb.LGBMClassifier(**{**lgb_params, 'n_estimators': n_estimators.get('lgb', lgb_params['n_estimators'])}, n_jobs=n_jobs)
         
-        lgb_model = lgb.LGBMClassifier(
-            n_estimators=500, learning_rate=0.02, num_leaves=31,
-            feature_fraction=0.8, bagging_fraction=0.8, n_jobs=-1,
-            random_state=42, verbose=-1
-        )
-        
-        # Voting (Soft)
-        self.model = VotingClassifier(
+        # Voting (Soft) - members fit in parallel only when the whole machine is ours
+        return VotingClassifier(
             estimators=[('xgb', xgb_model), ('lgb', lgb_model)],
             voting='soft',
-            n_jobs=-1
+            weights=params.get('weights'),
+            n_jobs=-1 if n_jobs == -1 else 1
         )
+
+    def train_ensemble(self, df, n_jobs=-1, params=None):
+        print(f"🚀 Training Quantum Sniper v4 Ensemble on {len(df)} rows...")
+        X = df[self.features]
+        y = df[self.target]
         
+        self.model = self.build_ensemble(n_jobs=n_jobs, params=params)
         self.model.fit(X, y)
+        self._full_lineage(df, params)
         print("✅ Voting Ensemble training complete.")
+        return self.model
+
+    def _full_lineage(self, df, params, reason=None):
+        self.trained_ids = df['id'].values if 'id' in df.columns else None
+        self.lineage = {
+            "mode": "full", "parent": None, "chain": 0, "reason": reason, "features": self.features,
+            "rows": len(df), "trained_through": str(df['pick_date'].max()) if len(df) else None,
+            "base_rate": float(df[self.target].mean()) if len(df) else None,
+            "profile": feature_profile(df, [f for f in self.features if f not in self.drift_exempt]), "params": params,
+        }
+
+    # --- INCREMENTAL RETRAINING ---
+    def drift(self, manifest, new):
+        """Drift of newly settled picks against the last full fit's reference."""
+        scores = psi(manifest['profile'], new)
+        worst = max(scores, key=scores.get) if scores else None
+        return {"psi": scores, "max_psi": scores.get(worst, 0.0), "worst_feature": worst,
+                "label_shift": abs(float(new[self.target].mean()) - manifest['base_rate']) if manifest.get('base_rate') is not None else 0.0}
+
+    def retrain_incremental(self, df, add_trees=50, psi_threshold=0.25, label_shift=0.10, max_chain=30,
+                            min_new_rows=50, n_jobs=-1, params=None, versions=None):
+        """Warm-start both boosters from the latest versioned artifact on picks it has not seen.
+
+        New picks are matched by id (not date), so late settlements of old picks are included.
+        XGBoost continues via xgb_model= and LightGBM via init_model=, each adding add_trees rounds.
+        A full refit on all rows runs instead when there is no usable previous version, when the
+        new picks drift from the last full fit (max feature PSI > psi_threshold, or win rate moved
+        by more than label_shift), or after max_chain warm starts in a row.
+        Returns the new lineage, or None when fewer than min_new_rows picks are new.
+        """
+        versions = versions or ModelVersions()
+        df = self.prepare(df)
+        latest, reason = versions.latest(), None
+        if latest is None:
+            reason = "no previous version"
+        elif latest.get('features') != self.features:
+            reason = "feature set changed"
+
+        if reason is None:
+            model, _, manifest, seen = versions.load(latest['version'])
+            new = df[~df['id'].isin(seen)]
+            if len(new) < min_new_rows:
+                print(f"⏭️ {len(new)} new settled picks since {latest['version']} (< {min_new_rows}); nothing to do.")
+                return None
+            drift = self.drift(manifest, new)
+            if drift['max_psi'] > psi_threshold:
+                reason = f"feature drift (PSI {drift['max_psi']:.3f} on {drift['worst_feature']})"
+            elif drift['label_shift'] > label_shift:
+                reason = f"win-rate shift ({drift['label_shift']:.3f})"
+            elif manifest.get('chain', 0) >= max_chain:
+                reason = f"{manifest['chain']} warm starts since the last full fit"
+
+        if reason is not None:
+            print(f"♻️ Full refit: {reason}.")
+            self.train_ensemble(df, n_jobs=n_jobs, params=params or (latest or {}).get('params'))
+            self.lineage.update(reason=reason, parent=latest['version'] if latest else None)
+            return self.lineage
+
+        print(f"🔁 Warm start from {latest['version']}: +{add_trees} trees per member on {len(new)} new picks "
+              f"(max PSI {drift['max_psi']:.3f})...")
+        X, y = new[self.features], new[self.target]
+        self.model = copy.deepcopy(model)
+        xgb_est, lgb_est = self.model.named_estimators_['xgb'], self.model.named_estimators_['lgb']
+        xgb_est.set_params(n_estimators=add_trees, n_jobs=n_jobs).fit(X, y, xgb_model=xgb_est.get_booster())
+        lgb_est.set_params(n_estimators=add_trees, n_jobs=n_jobs).fit(X, y, init_model=lgb_est.booster_)
+
+        self.trained_ids = np.concatenate([np.asarray(seen), new['id'].values])
+        self.lineage = {**manifest, "mode": "incremental", "parent": latest['version'], "chain": manifest.get('chain', 0) + 1,
+                        "reason": None, "rows": len(self.trained_ids), "new_rows": len(new),
+                        "trained_through": str(df['pick_date'].max()),
+                        "drift": {k: v for k, v in drift.items() if k != 'psi'}}
+        print("✅ Warm start complete.")
+        return self.lineage
+
+    # --- TIME-SERIES CV ---
+    def _fold_data(self, df, key, fold, tr, va, cache_dir):
+        """Binned data for one fold: XGBoost QuantileDMatrix (fit, stop) pair, LightGBM Dataset pair, raw X[va].
+
+        The stopping rows come from the tail of the training days (early_stopping_split), so
+        the validation rows never steer the fit. LightGBM Datasets are saved as binaries under
+        cache_dir/key, so reruns on unchanged data skip binning entirely; XGBoost matrices are
+        memoized in-process (cross-trial reuse while tuning).
+        """
+        X, y = df[self.features].to_numpy(dtype=np.float64), df[self.target].to_numpy()
+        fit, stop = early_stopping_split(df['pick_date'].to_numpy(), tr)
+        qkey = (key, fold)
+        if qkey in _QDM_CACHE:
+            _QDM_CACHE.move_to_end(qkey)
+        else:
+            dtrain = xgb.QuantileDMatrix(X[fit], y[fit])
+            _QDM_CACHE[qkey] = (dtrain, xgb.QuantileDMatrix(X[stop], y[stop], ref=dtrain))
+            while len(_QDM_CACHE) > QDM_CACHE_FOLDS:
+                _QDM_CACHE.popitem(last=False)
+
+        paths = [os.path.join(cache_dir, key, f'lgb_f{fold}_{part}.bin') for part in ('train', 'stop')]
+        params = {'verbose': -1, 'feature_pre_filter': False}
+        if all(os.path.exists(p) for p in paths):
+            ltrain, lstop = lgb.Dataset(paths[0], params=params), lgb.Dataset(paths[1], params=params)
+        else:
+            ltrain = lgb.Dataset(X[fit], y[fit], params=params, free_raw_data=False).construct()
+            lstop = lgb.Dataset(X[stop], y[stop], reference=ltrain, params=params, free_raw_data=False).construct()
+            os.makedirs(os.path.dirname(paths[0]), exist_ok=True)
+            ltrain.save_binary(paths[0])
+            lstop.save_binary(paths[1])
+        return _QDM_CACHE[qkey], (ltrain, lstop), X[va]
 
-    def save_model(self, path='models/v4_quantum_sniper.pkl'):
+    def fit_fold(self, df, key, fold, tr, va, cache_dir=CV_CACHE_DIR, n_jobs=-1, early_stopping_rounds=50,
+                 xgb_params=None, lgb_params=None, callbacks=None):
+        """Early-stopped native fit of both members on one fold -> (p_xgb, p_lgb, best tree counts) on va."""
+        xgb_params, lgb_params = {**XGB_PARAMS, **(xgb_params or {})}, {**LGB_PARAMS, **(lgb_params or {})}
+        (dtrain, dstop), (ltrain, lstop), X_va = self._fold_data(df, key, fold, tr, va, cache_dir)
+        xb = xgb.train(xgb_native_params(xgb_params, n_jobs), dtrain, num_boost_round=xgb_params['n_estimators'],
+                       evals=[(dstop, 'stop')], early_stopping_rounds=early_stopping_rounds, verbose_eval=False)
+        p_xgb = xb.predict(xgb.DMatrix(X_va), iteration_range=(0, xb.best_iteration + 1))
+        lb = lgb.train(lgb_native_params(lgb_params, n_jobs), ltrain, num_boost_round=lgb_params['n_estimators'],
+                       valid_sets=[lstop], callbacks=[lgb.early_stopping(early_stopping_rounds, verbose=False)] + (callbacks or []))
+        p_lgb = lb.predict(X_va, num_iteration=lb.best_iteration)
+        return p_xgb, p_lgb, {'xgb': xb.best_iteration + 1, 'lgb': lb.best_iteration or lb.current_iteration()}
+
+    def cv_key(self, df, n_splits):
+        """Cache key of a pick_date-sorted frame's fold data."""
+        return f"{data_hash(df, ['pick_date'] + self.features + [self.target])}_s{n_splits}_es{round(ES_FRACTION * 100)}"
+
+    def train_cv(self, df, n_splits=5, early_stopping_rounds=50, n_jobs=-1, cache_dir=CV_CACHE_DIR, refit=True, params=None):
+        """Time-series CV with early stopping per fold, then (optionally) a full refit.
+
+        Folds split the calendar (TimeSeriesSplit over pick_date days) and each fold early-stops on the
+        tail of its own training days, so validation rows are scored untouched. Out-of-fold predictions
+        and the fold report are written to cache_dir/<data hash>/; the final ensemble is refit on all
+        rows with each member's median best tree count, so it ships in the usual VotingClassifier form.
+        """
+        from sklearn.metrics import roc_auc_score, log_loss
+        params = params or {}
+        xgb_params, lgb_params = {**XGB_PARAMS, **params.get('xgb', {})}, {**LGB_PARAMS, **params.get('lgb', {})}
+        w = np.asarray(params.get('weights') or [1.0, 1.0], dtype=float)
+        df = df.sort_values('pick_date', kind='stable').reset_index(drop=True)
+        key = self.cv_key(df, n_splits)
+        folds = date_folds(df['pick_date'], n_splits)
+        if not folds:
+            print("❌ Not enough distinct days for time-series CV.")
+            return None
+        print(f"🧪 Time-series CV: {n_splits} folds over {df['pick_date'].nunique()} days ({len(df)} rows)...")
+
+        oof, rows = [], []
+        for fold, (tr, va) in enumerate(folds):
+            t0 = time.perf_counter()
+            cached = os.path.exists(os.path.join(cache_dir, key, f'lgb_f{fold}_stop.bin'))
+            p_xgb, p_lgb, best = self.fit_fold(df, key, fold, tr, va, cache_dir, n_jobs, early_stopping_rounds,
+                                               xgb_params=xgb_params, lgb_params=lgb_params)
+            p = (w[0] * p_xgb + w[1] * p_lgb) / w.sum()
+            y = df[self.target].values[va]
+            oof.append(pd.DataFrame({'id': df['id'].values[va] if 'id' in df.columns else va, 'pick_date': df['pick_date'].values[va],
+                                     'fold': fold, 'outcome': y, 'p_xgb': p_xgb, 'p_lgb': p_lgb, 'oof_prob': p}))
+            rows.append({'fold': fold, 'train_rows': len(tr), 'valid_rows': len(va),
+                         'best_xgb': best['xgb'], 'best_lgb': best['lgb'],
+                         'auc': round(roc_auc_score(y, p), 4) if len(np.unique(y)) > 1 else np.nan,
+                         'logloss': round(log_loss(y, np.clip(p, 1e-6, 1 - 1e-6), labels=[0, 1]), 4),
+                         'cached_bins': cached, 'wall_s': round(time.perf_counter() - t0, 2)})
+            print(f"   fold {fold}: auc {rows[-1]['auc']}, logloss {rows[-1]['logloss']}, "
+                  f"trees xgb {best['xgb']} / lgb {best['lgb']} ({rows[-1]['wall_s']}s)")
+
+        report = pd.DataFrame(rows)
+        oof = pd.concat(oof, ignore_index=True)
+        out_dir = os.path.join(cache_dir, key)
+        os.makedirs(out_dir, exist_ok=True)
+        oof.to_parquet(os.path.join(out_dir, 'oof_predictions.parquet'), index=False)
+        n_estimators = {m: int(report[f'best_{m}'].median()) for m in ('xgb', 'lgb')}
+        summary = {'key': key, 'folds': report.to_dict('records'), 'n_estimators': n_estimators,
+                   'oof_auc': round(roc_auc_score(oof['outcome'], oof['oof_prob']), 4) if oof['outcome'].nunique() > 1 else None,
+                   'oof_logloss': round(log_loss(oof['outcome'], oof['oof_prob'].clip(1e-6, 1 - 1e-6), labels=[0, 1]), 4)}
+        with open(os.path.join(out_dir, 'cv_report.json'), 'w') as f:
+            json.dump(summary, f, indent=4, default=str)
+        print(f"✅ OOF auc {summary['oof_auc']}, logloss {summary['oof_logloss']} -> {out_dir}")
+
+        if refit:
+            print(f"🚀 Refitting on {len(df)} rows with {n_estimators}...")
+            self.model = self.build_ensemble(n_jobs=n_jobs, n_estimators=n_estimators, params=params)
+            self.model.fit(df[self.features], df[self.target])
+            tuned = copy.deepcopy(params)
+            for m in ('xgb', 'lgb'):
+                tuned.setdefault(m, {})['n_estimators'] = n_estimators[m]
+            self._full_lineage(df, tuned)
+        return summary
+
+    def config(self):
+        return {
+            "features": self.features,
+            "Min_Exp": 10,
+            "Min_Edge": 0.05,
+            "Daily_Cap": 10,
+            "Kelly_Fraction": 0.20,
+            "Max_Daily_Risk": 10.0
+        }
+
+    def save_model(self, path='models/v4_quartz.pkl', versions=None):
+        """Ship the model under the names ModelSimulator.run_v4_quartz loads, config next to it.
+
+        Staking knobs already in the shipped config are kept; only the feature list is refreshed.
+        """
         os.makedirs(os.path.dirname(path), exist_ok=True)
         joblib.dump(self.model, path)
         print(f"📁 Model saved to {path}")
         
-        # Save features list for reference
-        with open('models/v4_config.json', 'w') as f:
-            json.dump({
-                "features": self.features,
-                "Min_Exp": 10,
-                "Min_Edge": 0.05,
-                "Daily_Cap": 10,
-                "Kelly_Fraction": 0.20,
-                "Max_Daily_Risk": 10.0
-            }, f, indent=4)
+        c_path = os.path.join(os.path.dirname(path), 'v4_quartz_config.json')
+        shipped = {}
+        if os.path.exists(c_path):
+            with open(c_path) as f:
+                shipped = json.load(f)
+        with open(c_path, 'w') as f:
+            json.dump({**self.config(), **shipped, "features": self.features}, f, indent=4)
+
+        # Versioned copy with lineage (the base for the next incremental retrain)
+        if self.lineage is not None and self.trained_ids is not None:
+            version = (versions or ModelVersions()).save(self.model, self.config(), self.lineage, self.trained_ids)
+            print(f"🏷️ Versioned as {version} ({self.lineage['mode']})")
+            return version
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the v4 Quantum Sniper ensemble")
+    parser.add_argument('--cv', action='store_true', help="Time-series CV with early stopping, then refit")
+    parser.add_argument('--splits', type=int, default=5)
+    parser.add_argument('--early-stopping', type=int, default=50)
+    parser.add_argument('--params', default=None, help="Tuned parameter file (e.g. models/v4_tuned_params.json)")
+    parser.add_argument('--incremental', action='store_true', help="Warm-start from the latest version on new picks only")
+    parser.add_argument('--add-trees', type=int, default=50)
+    parser.add_argument('--psi-threshold', type=float, default=0.25, help="Feature drift forcing a full refit")
+    args = parser.parse_args()
+
     qs = QuantumSniperV4()
     data = qs.fetch_and_prepare()
-    qs.train_ensemble(data)
+    params = load_tuned_params(args.params) if args.params else None
+    if args.incremental:
+        if qs.retrain_incremental(data, add_trees=args.add_trees, psi_threshold=args.psi_threshold, params=params) is None:
+            raise SystemExit(0)
+    elif args.cv:
+        qs.train_cv(data, n_splits=args.splits, early_stopping_rounds=args.early_stopping, params=params)
+    else:
+        qs.train_ensemble(data, params=params)
     qs.save_model()
@@ -0,0 +1,205 @@
+import os
+import time
+import json
+import hashlib
+import tempfile
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import joblib
+
+try:
+    from instrumentation import tracer
+except ModuleNotFoundError:
+    from src.instrumentation import tracer
+
+WALK_FORWARD_DIR = os.path.join('data', 'walk_forward')
+
+def make_folds(dates, test_days=7, mode='expanding', train_days=90, min_train_days=60, embargo_days=1, start=None, end=None):
+    """Calendar folds over the pick_date axis.
+
+    Each fold trains on [train_start, test_start - embargo_days) and scores [test_start, test_end).
+    'expanding' keeps every earlier day in the train window; 'sliding' keeps the last train_days.
+    The first test period opens once min_train_days of history exist (or at start, if later).
+    """
+    dates = pd.DatetimeIndex(pd.Series(dates).dropna().unique()).sort_values()
+    if dates.empty: return []
+    first, last = dates[0], dates[-1]
+    test_start = max(first + pd.Timedelta(days=min_train_days), pd.Timestamp(start) if start else first)
+    stop = pd.Timestamp(end) if end else last
+    folds = []
+    while test_start <= stop:
+        test_end = min(test_start + pd.Timedelta(days=test_days), stop + pd.Timedelta(days=1))
+        train_end = test_start - pd.Timedelta(days=embargo_days)
+        train_start = first if mode == 'expanding' else max(first, train_end - pd.Timedelta(days=train_days))
+        folds.append({"fold": len(folds), "train_start": train_start, "train_end": train_end,
+                      "test_start": test_start, "test_end": test_end})
+        test_start = test_end
+    return folds
+
+def _frame_digest(df, cols, h):
+    if len(df):
+        h.update(pd.util.hash_pandas_object(df[cols], index=False).values.tobytes())
+    h.update(str(len(df)).encode())
+
+def fold_key(train, test, features, code_hash):
+    """Content hash of everything a fold's model and predictions depend on."""
+    h = hashlib.sha256(code_hash.encode())
+    h.update(json.dumps(features).encode())
+    _frame_digest(train, ['id', 'pick_date'] + features + ['outcome'], h)
+    _frame_digest(test, ['id'] + features, h)
+    return h.hexdigest()[:20]
+
+def trainer_code_hash():
+    """Hyperparameters live in the trainer source, so editing it invalidates every cached fold."""
+    src = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'v4_quantum_sniper.py')
+    with open(src, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+# --- WORKER (shares runner's per-process frame state) ---
+def _fold_frames(df, fold, sniper):
+    dates = df['pick_date']
+    train = sniper.prepare(df[(dates >= fold["train_start"]) & (dates < fold["train_end"])])
+    test = df[(dates >= fold["test_start"]) & (dates < fold["test_end"])]
+    return train, test
+
+def _run_fold(fold, cache_dir, n_threads, df=None):
+    """Train (or reuse) one fold's ensemble and score its out-of-sample window."""
+    from runner import _WORKER as shared, _read_shared_frame
+    from v4_quantum_sniper import QuantumSniperV4
+    from inference import NativePredictor
+    t0, c0 = time.perf_counter(), time.process_time()
+    if df is None:
+        if 'df' not in shared:
+            shared['df'] = _read_shared_frame(shared['path'])
+        df = shared['df']
+
+    sniper = QuantumSniperV4()
+    train, test = _fold_frames(df, fold, sniper)
+    info = {**fold, "train_rows": len(train), "test_rows": len(test), "cached": False}
+    fold_dir = os.path.join(cache_dir, fold["key"])
+    pred_path = os.path.join(fold_dir, 'predictions.parquet')
+
+    if os.path.exists(pred_path):
+        preds = pd.read_parquet(pred_path)
+        info["cached"] = True
+    elif train.empty or test.empty or train['outcome'].nunique() < 2:
+        preds = pd.DataFrame({'id': test['id'].values, 'raw_prob': np.nan})
+    else:
+        try:
+            model = sniper.build_ensemble(n_jobs=n_threads).fit(train[sniper.features], train[sniper.target])
+            raw = NativePredictor(model, n_threads=n_threads).predict_positive(test[sniper.features])
+            preds = pd.DataFrame({'id': test['id'].values, 'raw_prob': raw})
+            os.makedirs(fold_dir, exist_ok=True)
+            # Model first: predictions.parquet marks the fold as cached, so it is written last
+            joblib.dump(model, os.path.join(fold_dir, 'model.pkl'))
+            preds.to_parquet(pred_path, index=False)
+        except Exception as e:
+            print(f"Error fold {fold['fold']}: {e}")
+            traceback.print_exc()
+            preds = pd.DataFrame({'id': test['id'].values, 'raw_prob': np.nan})
+
+    preds['fold'] = fold['fold']
+    info["wall_s"] = round(time.perf_counter() - t0, 3)
+    info["cpu_s"] = round(time.process_time() - c0, 3)
+    return info, preds
+
+def _fold_metrics(preds):
+    from sklearn.metrics import roc_auc_score, log_loss
+    settled = preds[preds['outcome'].isin([0.0, 1.0]) & preds['raw_prob'].notna()]
+    if settled['outcome'].nunique() < 2:
+        return {"auc": np.nan, "logloss": np.nan, "scored": len(settled)}
+    y, p = settled['outcome'].astype(int), settled['raw_prob'].clip(1e-6, 1 - 1e-6)
+    return {"auc": round(roc_auc_score(y, p), 4), "logloss": round(log_loss(y, p), 4), "scored": len(settled)}
+
+class WalkForwardEngine:
+    """Walk-forward backtest of the v4 ensemble.
+
+    Every fold retrains QuantumSniperV4 on its own train window and scores only the next
+    out-of-sample period. Folds are independent, so they run in a process pool over one
+    memory-mapped feature frame (see runner.SimulationRunner). Each fold's model and raw
+    predictions are cached under cache_dir, keyed by a hash of its train/test content, so
+    re-runs only train folds whose data changed (typically the newest one).
+    """
+    def __init__(self, df, test_days=7, mode='expanding', train_days=90, min_train_days=60, embargo_days=1,
+                 start=None, end=None, workers=None, cache_dir=WALK_FORWARD_DIR, config=None):
+        from runner import thread_budget
+        from v4_quantum_sniper import QuantumSniperV4
+        self.df = df
+        self.features = QuantumSniperV4().features
+        self.config = config
+        self.cache_dir = cache_dir
+        self.folds = make_folds(df['pick_date'], test_days=test_days, mode=mode, train_days=train_days,
+                                min_train_days=min_train_days, embargo_days=embargo_days, start=start, end=end)
+        cpus = os.cpu_count() or 1
+        self.workers = max(1, min(workers or cpus, len(self.folds) or 1))
+        self.n_threads = thread_budget(self.workers, cpus)
+
+    def _keyed_folds(self):
+        from v4_quantum_sniper import QuantumSniperV4
+        sniper, code_hash = QuantumSniperV4(), trainer_code_hash()
+        keyed = []
+        for fold in self.folds:
+            train, test = _fold_frames(self.df, fold, sniper)
+            keyed.append({**fold, "key": fold_key(train, test, self.features, code_hash)})
+        return keyed
+
+    def _run_parallel(self, folds):
+        from runner import _write_shared_frame, _init_worker
+        src_dir = os.path.dirname(os.path.abspath(__file__))
+        with tempfile.TemporaryDirectory(prefix='quarry_wf_') as tmp:
+            shared_path = os.path.join(tmp, 'features.arrow')
+            _write_shared_frame(self.df, shared_path)
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                     initargs=(shared_path, self.n_threads, src_dir)) as pool:
+                futures = [pool.submit(_run_fold, f, self.cache_dir, self.n_threads) for f in folds]
+                return [f.result() for f in futures]
+
+    def run(self):
+        """Returns {"folds": per-fold frame, "predictions": OOS pick frame, "bets": staked Quartz bets}."""
+        from models import ModelSimulator
+        if not self.folds:
+            print("❌ Not enough history for a single walk-forward fold.")
+            return {"folds": pd.DataFrame(), "predictions": pd.DataFrame(), "bets": pd.DataFrame()}
+
+        with tracer.span('walk_forward', rows_in=len(self.df)) as sp:
+            folds = self._keyed_folds()
+            todo = sum(not os.path.exists(os.path.join(self.cache_dir, f["key"], 'predictions.parquet')) for f in folds)
+            print(f"🧭 Walk-forward: {len(folds)} folds ({todo} to train, {len(folds) - todo} cached) "
+                  f"on {self.workers} worker(s) x {self.n_threads} thread(s)...")
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+            runs = None
+            if self.workers > 1 and todo > 1:
+                try:
+                    runs = self._run_parallel(folds)
+                except Exception as e:
+                    print(f"⚠️ Parallel folds unavailable ({e}). Falling back to sequential.")
+            if runs is None:
+                runs = [_run_fold(f, self.cache_dir, self.n_threads, df=self.df) for f in folds]
+
+            cols = [c for c in ['id', 'pick_date', 'outcome'] if c in self.df.columns]
+            preds = pd.concat([p for _, p in runs], ignore_index=True).merge(self.df[cols], on='id', how='left')
+            fold_rows = []
+            for info, p in runs:
+                tracer.record(f"fold_{info['fold']:03d}", info["wall_s"], info["cpu_s"], rows_out=len(p), cached=info["cached"])
+                fold_rows.append({**info, **_fold_metrics(p.merge(self.df[cols], on='id', how='left'))})
+
+            # Stake every OOS window at once: Quartz caps are per pick_date, so this equals per-fold staking
+            scored = preds.dropna(subset=['raw_prob'])
+            bets = pd.DataFrame()
+            if not scored.empty:
+                sim = ModelSimulator(self.df[self.df['id'].isin(scored['id'])])
+                temp = sim.df.merge(scored[['id', 'raw_prob', 'fold']], on='id', how='inner')
+                # Shipped Quartz staking rules; features come from the fold models, not the config
+                config = self.config or sim.load_v4_config(None)
+                bets = sim.stake_v4(temp, temp['raw_prob'].values, config)
+            sp.rows_out = len(bets)
+
+        return {"folds": pd.DataFrame(fold_rows), "predictions": preds, "bets": bets}
+
+def run_walk_forward(df, **kwargs):
+    """Convenience wrapper; kwargs are WalkForwardEngine options."""
+    return WalkForwardEngine(df, **kwargs).run()